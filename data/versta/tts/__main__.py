@@ -3,14 +3,21 @@ import os
 from argparse import ArgumentParser
 from pathlib import Path
 
-from .download import download_folder_from_git, download_folder_from_tarball
+from .catalog import bundle_packs, save_data_file, update_data_json
+from .download import checkout_from_git, download_folder_from_tarball
 from .metadata import generate_metadata
+from .packs import OPEN_JTALK_PACK, DataPack, pack_size, split_espeak_data
 from .utils import remove_folder
 from .espeak import build_data
 
 with open(Path(__file__).parent / ".." / "version.txt", "r") as version_file:
     version = version_file.read().strip()
 
+DATA_JSON = Path(__file__).parent.parent.parent / "data.json"
+
+ESPEAK_REPOSITORY = "https://github.com/espeak-ng/espeak-ng.git"
+ESPEAK_REVISION = "1.52.0"
+
 
 def parse_args():
     parser = ArgumentParser(
@@ -37,6 +44,56 @@ def parse_args():
         "If unspecified, the downloaded models will go into '/tmp' directory.",
     )
 
+    parser.add_argument(
+        "--cache_dir",
+        type=Path,
+        default=Path("cache"),
+        help="Provide a persistent directory for the Git checkouts and data builds, "
+        "which are reused between runs: checkouts are only fetched again when the pinned "
+        "revision changes, and builds are kept per source commit and toolchain. "
+        "If unspecified, they will go into the '/cache' directory.",
+    )
+
+    parser.add_argument(
+        "--espeak_repository",
+        type=str,
+        default=ESPEAK_REPOSITORY,
+        help="The espeak-ng Git repository to fetch, as an HTTPS or SSH URL or a local "
+        f"path (e.g. for offline builds). Defaults to '{ESPEAK_REPOSITORY}'.",
+    )
+
+    parser.add_argument(
+        "--espeak_revision",
+        type=str,
+        default=ESPEAK_REVISION,
+        help="The espeak-ng tag or commit to build the data from. "
+        f"Defaults to '{ESPEAK_REVISION}'.",
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of parallel jobs building the espeak-ng data. "
+        "If unspecified, one job per CPU is used.",
+    )
+
+    parser.add_argument(
+        "--link_prefix",
+        type=str,
+        default="https://models.versta.app/data/",
+        help="Provide the prefix for the links to the pack bundles; the version is appended. "
+        "This will be used to generate the links to the bundles in the output data file.",
+    )
+
+    parser.add_argument(
+        "--update_catalog",
+        action="store_true",
+        default=False,
+        help="Whether to sync the generated pack entries into the data.json catalog "
+        "(backed up to data.json.bak). This will default to False if not specified.",
+    )
+
     parser.add_argument(
         "--keep_intermediates",
         action="store_true",
@@ -60,6 +117,12 @@ def parse_args():
 def main(
     output_dir: Path,
     temp_dir: Path,
+    cache_dir: Path = Path("cache"),
+    espeak_repository: str = ESPEAK_REPOSITORY,
+    espeak_revision: str = ESPEAK_REVISION,
+    jobs: int = None,
+    link_prefix: str = "https://models.versta.app/data/",
+    update_catalog: bool = False,
     keep_intermediates: bool = False,
     keep_downloads: bool = False,
 ):
@@ -71,6 +134,13 @@ def main(
     Args:
         output_dir (Path): The directory where the output tarball will be saved.
         temp_dir (Path): The directory where temporary files will be stored.
+        cache_dir (Path): The persistent directory holding the Git checkouts and builds.
+        espeak_repository (str): The espeak-ng Git repository URL or local path.
+        espeak_revision (str): The espeak-ng tag or commit to build the data from.
+        jobs (int, optional): Number of parallel build jobs. Defaults to the CPU count.
+        link_prefix (str, optional): Prefix for the bundle links; the version is appended.
+        update_catalog (bool, optional): Whether to sync the pack entries into data.json.
+            Defaults to False.
         keep_intermediates (bool, optional): Whether to keep intermediate files. Defaults to False.
         keep_downloads (bool, optional): Whether to keep downloaded files. Defaults to False.
     """
@@ -80,35 +150,58 @@ def main(
 
     download_dir = temp_dir / "downloads"
     intermediates_dir = output_dir / name / "intermediates"
-    build_dir = intermediates_dir / "builds"
 
     download_dir.mkdir(parents=True, exist_ok=True)
     intermediates_dir.mkdir(parents=True, exist_ok=True)
-    build_dir.mkdir(parents=True, exist_ok=True)
 
     # Step 1: Download the data folders
-    espeak_path = download_folder_from_git(
-        export_path=build_dir,
-        download_path=download_dir,
-        repo_url="git@github.com:espeak-ng/espeak-ng.git",
+    espeak_path = checkout_from_git(
+        cache_path=cache_dir,
+        repo_url=espeak_repository,
+        revision=espeak_revision,
+    )
+    espeak_data_path = build_data(
+        espeak_path, cache_dir, intermediates_dir / "espeak-ng-data", jobs
     )
-    espeak_data_path = build_data(espeak_path, build_dir, export_dir / "espeak-ng-data")
     open_jtalk_data_path = download_folder_from_tarball(
-        export_path=export_dir,
+        export_path=export_dir / OPEN_JTALK_PACK,
         download_path=download_dir,
         tarball_url="http://downloads.sourceforge.net/open-jtalk/open_jtalk_dic_utf_8-1.11.tar.gz",
         folder_path="open-jtalk-data",
     )
 
-    # Step 3: Generate metadata for the model conversion process
-    generate_metadata(name, version, export_dir, espeak_data_path, open_jtalk_data_path)
+    # Step 2: Split the espeak-ng data into a core pack and a pack per language
+    packs = split_espeak_data(espeak_data_path, export_dir)
+    packs.append(
+        DataPack(
+            id=OPEN_JTALK_PACK,
+            phonemizer="open_jtalk",
+            directory=open_jtalk_data_path.name,
+            languages=["ja"],
+            requires=[],
+            size=pack_size(open_jtalk_data_path),
+        )
+    )
+
+    # Step 3: Generate metadata for every pack and the pack index
+    generate_metadata(name, version, export_dir, packs)
+
+    # Step 4: Bundle every pack and save the data file listing them
+    bundles = bundle_packs(export_dir, packs, output_dir / f"{name}-bundles")
+    generated = save_data_file(bundles, link_prefix, output_dir, version)
+
+    # Step 5: Sync the pack entries into the data catalog (backed up to .bak) if specified
+    if update_catalog:
+        update_data_json(DATA_JSON, generated)
+    else:
+        print(f"Generated {generated}; {DATA_JSON.name} is left untouched.")
 
-    # Step 4: Remove intermediate files if specified
+    # Step 6: Remove intermediate files if specified
     if not keep_intermediates:
         remove_folder(intermediates_dir)
         print("Intermediates files cleaned.")
 
-    # Step 5: Remove download files if specified
+    # Step 7: Remove download files if specified
     if not keep_downloads:
         remove_folder(download_dir)
         print("Downloads files cleaned.")
@@ -119,6 +212,12 @@ if __name__ == "__main__":
     main(
         output_dir=args.output_dir,
         temp_dir=args.temp_dir,
+        cache_dir=args.cache_dir,
+        espeak_repository=args.espeak_repository,
+        espeak_revision=args.espeak_revision,
+        jobs=args.jobs,
+        link_prefix=args.link_prefix,
+        update_catalog=args.update_catalog,
         keep_intermediates=args.keep_intermediates,
         keep_downloads=args.keep_downloads,
     )
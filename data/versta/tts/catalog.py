@@ -0,0 +1,134 @@
+import json
+import shutil
+
+from os.path import getsize
+from pathlib import Path
+from typing import List, TypedDict
+
+from ..bundle.bundle_tar import bundle_files, create_checksum
+from .packs import DataPack
+
+
+class PackBundle(TypedDict):
+    pack: DataPack
+    bundle: Path
+    checksum: Path
+
+
+def bundle_packs(
+    export_dir: Path, packs: List[DataPack], output_dir: Path
+) -> List[PackBundle]:
+    """
+    Bundles every data pack directory, with its metadata.json, into its own tarball.
+
+    Args:
+        export_dir (Path): The directory holding the pack directories.
+        packs (List[DataPack]): The data packs.
+        output_dir (Path): The directory where the tarballs will be saved.
+
+    Returns:
+        List[PackBundle]: The bundle and checksum file of every pack.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    bundles = []
+    for pack in packs:
+        bundle_file = bundle_files(
+            [export_dir / pack["id"]], output_dir / f"{pack['id']}-bundle.tar.gz"
+        )
+        bundles.append(
+            PackBundle(
+                pack=pack,
+                bundle=bundle_file,
+                checksum=create_checksum(bundle_file),
+            )
+        )
+
+    return bundles
+
+
+def save_data_file(
+    bundles: List[PackBundle], link_prefix: str, output_dir: Path, version: str
+) -> Path:
+    """
+    Save the generated data file describing the data packs, in the format of the Versta
+    data.json catalog. Besides the bundle links, every entry lists the phonemizer and
+    languages the pack provides and the packs it requires, which the text-to-speech export
+    uses to resolve the packs a voice needs.
+
+    Args:
+        bundles (List[PackBundle]): The bundled data packs.
+        link_prefix (str): Prefix for the bundle file links; the version is appended.
+        output_dir (Path): Directory where the data file will be saved.
+        version (str): The deployment version (from version.txt).
+
+    Returns:
+        Path: The path to the written data file.
+    """
+    file_path = output_dir / "data.json"
+    link_prefix = f"{link_prefix.rstrip('/')}/{version}/"
+
+    data_output = [
+        {
+            "id": bundle["pack"]["id"],
+            "size": getsize(bundle["bundle"]),
+            "type": "tts",
+            "version": version,
+            "phonemizer": bundle["pack"]["phonemizer"],
+            "languages": bundle["pack"]["languages"],
+            "requires": bundle["pack"]["requires"],
+            "bundle": link_prefix + bundle["bundle"].name,
+            "checksum": link_prefix + bundle["checksum"].name,
+        }
+        for bundle in bundles
+    ]
+
+    with open(file_path, "w") as f:
+        json.dump(data_output, f, indent=4)
+
+    return file_path
+
+
+def update_data_json(existing_path: Path, generated_path: Path) -> Path:
+    """
+    Merges the freshly generated data.json entries into the data catalog, replacing the
+    entry with the same id in place or appending it when the catalog has none. Entries
+    that were not generated, such as the single versta-tts-data bundle older app versions
+    install, are kept as they are.
+
+    Before overwriting, the existing catalog is backed up to "<input_name>.bak" (any prior
+    backup is overwritten).
+
+    Args:
+        existing_path (Path): Path to the data catalog to update in place.
+        generated_path (Path): Path to the generated data.json.
+
+    Returns:
+        Path: The path of the updated catalog (same as `existing_path`).
+    """
+    existing_path = Path(existing_path)
+    generated_path = Path(generated_path)
+
+    backup_path = existing_path.parent / (existing_path.name + ".bak")
+    shutil.copy2(existing_path, backup_path)
+
+    with open(existing_path, "r") as f:
+        catalog = json.load(f)
+    with open(generated_path, "r") as f:
+        generated = json.load(f)
+
+    for entry in generated:
+        index = next(
+            (i for i, existing in enumerate(catalog) if existing["id"] == entry["id"]),
+            None,
+        )
+        if index is None:
+            catalog.append(entry)
+        else:
+            catalog[index] = entry
+
+    with open(existing_path, "w") as f:
+        json.dump(catalog, f, indent=2)
+        f.write("\n")
+
+    return existing_path
@@ -1,63 +1,87 @@
-from os import environ, path, listdir
+from os import path, listdir
 from shutil import rmtree, move
-from subprocess import run
+from subprocess import PIPE, run
 from pathlib import Path
 from tarfile import open as taropen
+from typing import List
 from requests import get
 
-from .utils import copy_folder
+# Marks the remote and revision a cached checkout was fetched at.
+PIN_FILE = "versta-pin"
 
 
-def download_folder_from_git(
-    export_path: Path, download_path: Path, repo_url: str, folder_path: str = None
-) -> Path:
+def checkout_from_git(cache_path: Path, repo_url: str, revision: str) -> Path:
     """
-    Clones a Git repository using SSH and extracts a specific folder to an output directory.
+    Checks out a pinned revision of a Git repository into a persistent cache. The first
+    run initializes the cache with a shallow fetch of the revision alone; later runs reuse
+    the checkout as is while the pin is unchanged, and otherwise fetch the new revision
+    into the same repository.
 
     Args:
-        export_path (Path): The directory where the extracted folder will be saved.
-        download_path (Path): The directory where the repository will be cloned.
-        repo_url (str): The SSH URL of the Git repository.
-        folder_path (str): The name of the folder to extract from the repository.
+        cache_path (Path): The directory holding the cached checkouts.
+        repo_url (str): The HTTPS or SSH URL of the Git repository, or a local path to one.
+        revision (str): The tag or commit to check out.
 
     Returns:
-        Path: The path to the extracted folder.
+        Path: The path to the checkout.
     """
-    print("Downloading folder from Git repository...")
+    repo_name = repo_url.rstrip("/").split("/")[-1].replace(".git", "")
+    repo_path = cache_path / repo_name
 
-    repo_name = repo_url.split("/")[-1].replace(".git", "")
+    # Local remotes are fetched over file://, as git ignores --depth for plain paths.
+    if Path(repo_url).expanduser().exists():
+        repo_url = Path(repo_url).expanduser().resolve().as_uri()
 
-    clone_path = download_path / repo_name
-    if clone_path.exists():
-        rmtree(clone_path)
+    if not (repo_path / ".git").exists():
+        repo_path.mkdir(parents=True, exist_ok=True)
+        _git(["init", "--quiet"], repo_path)
+        _git(["remote", "add", "origin", repo_url], repo_path)
+    else:
+        _git(["remote", "set-url", "origin", repo_url], repo_path)
 
-    clone_path.mkdir(parents=True)
+    pin = f"{repo_url} {revision}"
+    pin_file = repo_path / ".git" / PIN_FILE
+    if pin_file.exists() and pin_file.read_text().strip() == pin:
+        print(f"Using cached {repo_name} checkout at {revision}.")
+        return repo_path
 
-    env = environ.copy()
-    run(["git", "clone", repo_url, clone_path], check=True, env=env)
+    print(f"Fetching {repo_name} at {revision}...")
+    _git(
+        ["fetch", "--quiet", "--depth", "1", "--no-tags", "origin", revision], repo_path
+    )
+    _git(["checkout", "--quiet", "--force", "--detach", "FETCH_HEAD"], repo_path)
+    _git(["clean", "--quiet", "-ffdx"], repo_path)
 
-    if folder_path is None:
-        source_path = clone_path
-    else:
-        source_path = clone_path / folder_path
-    if not path.exists(source_path):
-        raise FileNotFoundError(
-            f"The folder '{folder_path}' does not exist in the repository."
-        )
+    pin_file.write_text(pin)
+    return repo_path
 
-    if folder_path is None:
-        target_path = export_path
-    else:
-        target_path = export_path / folder_path
-    if target_path.exists():
-        rmtree(target_path)
 
-    copy_folder(source_path, export_path)
+def current_commit(repo_path: Path) -> str:
+    """
+    Gets the commit checked out in a Git repository.
 
-    if folder_path is None:
-        return export_path / repo_name
+    Args:
+        repo_path (Path): The path to the repository.
 
-    return target_path
+    Returns:
+        str: The full commit hash.
+    """
+    return _git(["rev-parse", "HEAD"], repo_path)
+
+
+def _git(args: List[str], repo_path: Path) -> str:
+    """
+    Runs a Git command in a repository.
+
+    Args:
+        args (List[str]): The Git arguments.
+        repo_path (Path): The path to the repository.
+
+    Returns:
+        str: The standard output, stripped.
+    """
+    result = run(["git", *args], cwd=repo_path, check=True, stdout=PIPE, text=True)
+    return result.stdout.strip()
 
 
 def download_folder_from_tarball(
@@ -1,30 +1,111 @@
-from shutil import move
-from subprocess import run
+import os
+import platform
+
+from hashlib import sha256
+from shutil import copytree, rmtree, which
+from subprocess import PIPE, run
 from pathlib import Path
+from typing import List
+
+from .download import current_commit
+
+# Written into a build directory once its data target built successfully.
+BUILD_STAMP = "versta-build-complete"
+
+
+def toolchain_key() -> str:
+    """
+    Identifies the toolchain the data is built with: the CMake and C compiler versions and
+    the machine architecture.
+
+    Returns:
+        str: A short hash of the toolchain description.
+    """
+    compiler = os.environ.get("CC") or which("cc") or "cc"
+    description = "\n".join(
+        [
+            _first_line(["cmake", "--version"]),
+            _first_line([compiler, "--version"]),
+            platform.machine(),
+        ]
+    )
+    return sha256(description.encode("utf-8")).hexdigest()[:12]
+
 
+def build_data(
+    source_dir: Path, cache_dir: Path, output_dir: Path, jobs: int = None
+) -> Path:
+    """
+    Builds the espeak-ng data from a checkout and copies it to the output directory. The
+    build directory is kept in the cache, keyed by the source commit and the toolchain,
+    so a rebuild of the same commit reuses the compiled data without running CMake, and
+    an interrupted build resumes where it stopped.
 
-def build_data(source_dir: Path, build_dir: Path, output_dir: Path) -> Path:
+    Args:
+        source_dir (Path): The espeak-ng checkout.
+        cache_dir (Path): The persistent directory holding the build directories.
+        output_dir (Path): The directory where the espeak-ng-data will be saved.
+        jobs (int): Number of parallel build jobs, defaulting to the CPU count.
+
+    Returns:
+        Path: The path to the espeak-ng data.
+    """
     if not source_dir.exists():
         raise FileNotFoundError(f"Directory {source_dir} does not exist.")
 
-    build_output_path = build_dir / "espeak-data"
+    commit = current_commit(source_dir)
+    build_output_path = (
+        cache_dir / "builds" / f"espeak-ng-{commit[:12]}-{toolchain_key()}"
+    )
 
-    configure_command = ["cmake", "-B" + build_output_path.as_posix(), source_dir]
+    if (build_output_path / BUILD_STAMP).exists():
+        print(f"Using cached espeak-ng data build for {commit[:12]}.")
+    else:
+        if not (build_output_path / "CMakeCache.txt").exists():
+            configure_command = [
+                "cmake",
+                "-B" + build_output_path.as_posix(),
+                source_dir,
+            ]
+            run(configure_command, check=True)
+            print("CMake configuration completed successfully.")
 
-    build_command = [
-        "cmake",
-        "--build",
-        build_output_path.as_posix(),
-        "--target",
-        "data",
-    ]
+        build_command = [
+            "cmake",
+            "--build",
+            build_output_path.as_posix(),
+            "--target",
+            "data",
+            "--parallel",
+            str(jobs or os.cpu_count() or 1),
+        ]
+        run(build_command, check=True)
+        print("CMake build completed successfully.")
 
-    run(configure_command, check=True)
-    print("CMake configuration completed successfully.")
+        (build_output_path / BUILD_STAMP).touch()
 
-    run(build_command, check=True)
-    print("CMake build completed successfully.")
+    if output_dir.exists():
+        rmtree(output_dir)
 
-    move(build_output_path / "espeak-ng-data", output_dir)
+    copytree(build_output_path / "espeak-ng-data", output_dir)
 
     return output_dir
+
+
+def _first_line(command: List[str]) -> str:
+    """
+    Gets the first line a version command prints, or an empty string when the tool is
+    missing.
+
+    Args:
+        command (List[str]): The command to run.
+
+    Returns:
+        str: The first line of the output.
+    """
+    try:
+        output = run(command, stdout=PIPE, text=True, check=False).stdout
+    except FileNotFoundError:
+        return ""
+
+    return next(iter(output.splitlines()), "")
@@ -1,33 +1,66 @@
 import json
 
 from pathlib import Path
+from typing import List
+
+from .packs import DataPack
+
+
+def generate_pack_metadata(version: str, output_dir: Path, pack: DataPack) -> Path:
+    """
+    Generates the metadata file of a data pack, in the pack directory.
+
+    Args:
+        version (str): Version of the data conversion process.
+        output_dir (Path): Path to the directory holding the pack directories.
+        pack (DataPack): The data pack.
+
+    Returns:
+        Path: The written metadata file.
+    """
+    metadata = {
+        "id": pack["id"],
+        "version": version,
+        "type": "tts",
+        "files": {pack["phonemizer"]: pack["directory"]},
+        "languages": pack["languages"],
+        "requires": pack["requires"],
+    }
+
+    # Define the path for the metadata.json file
+    metadata_file = output_dir / pack["id"] / "metadata.json"
+
+    # Write the metadata to a JSON file
+    with open(metadata_file, "w") as f:
+        json.dump(metadata, f, indent=4)
+
+    return metadata_file
 
 
 def generate_metadata(
     id: str,
     version: str,
     output_dir: Path,
-    espeak_data_path: Path,
-    open_jtalk_data_path: Path,
+    packs: List[DataPack],
 ) -> Path:
     """
-    Generates a metadata file for the model conversion process.
+    Generates the metadata file of every data pack, and an index of the packs listing the
+    languages each provides, so installs can resolve the packs a voice requires.
 
     Args:
-        id (str): Unique identifier for the model conversion process.
-        version (str): Version of the model conversion process.
+        id (str): Unique identifier for the data conversion process.
+        version (str): Version of the data conversion process.
         output_dir (Path): Path to the directory where the metadata file will be saved.
-        espeak_data_path (Path): Path to the directory containing the espeak data files.
-        open_jtalk_data_path (Path): Path to the directory containing the open_jtalk data files.
+        packs (List[DataPack]): The data packs.
     """
+    for pack in packs:
+        generate_pack_metadata(version, output_dir, pack)
+
     metadata = {
         "id": id,
         "version": version,
         "type": "tts",
-        "files": {
-            "espeak": espeak_data_path.name,
-            "open_jtalk": open_jtalk_data_path.name,
-        },
+        "packs": packs,
     }
 
     # Define the path for the metadata.json file
@@ -0,0 +1,145 @@
+from pathlib import Path
+from shutil import copy2
+from typing import Dict, List, TypedDict
+
+# Pack identifiers: the core espeak-ng data, one pack per espeak-ng dictionary and
+# open-jtalk. The text-to-speech export resolves the packs a voice needs from the languages
+# the data.json catalog lists per pack, so the identifiers are only defined here.
+CORE_PACK = "espeak-ng-core"
+OPEN_JTALK_PACK = "open-jtalk"
+
+DICTIONARY_SUFFIX = "_dict"
+
+
+class DataPack(TypedDict):
+    id: str
+    phonemizer: str
+    directory: str
+    languages: List[str]
+    requires: List[str]
+    size: int
+
+
+def language_pack(dictionary: str) -> str:
+    """
+    Gets the identifier of the pack holding an espeak-ng dictionary.
+
+    Args:
+        dictionary (str): The dictionary name (e.g., "nl" for "nl_dict").
+
+    Returns:
+        str: The pack identifier (e.g., "espeak-ng-nl").
+    """
+    return f"espeak-ng-{dictionary}"
+
+
+def dictionary_languages(data_dir: Path) -> Dict[str, List[str]]:
+    """
+    Maps the espeak-ng dictionaries to the language codes of the voices that use them,
+    from the voice files in "lang/". A voice uses the dictionary it names, or otherwise
+    the dictionary of its first language code without the region (e.g. "en" for "en-us").
+
+    Args:
+        data_dir (Path): The compiled espeak-ng-data directory.
+
+    Returns:
+        Dict[str, List[str]]: The language codes per dictionary name.
+    """
+    languages: Dict[str, List[str]] = {}
+
+    for voice_file in sorted((data_dir / "lang").rglob("*")):
+        if not voice_file.is_file():
+            continue
+
+        codes, dictionary = [], None
+        with open(voice_file, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                words = line.split("//")[0].split()
+                if len(words) < 2:
+                    continue
+                if words[0] == "language":
+                    codes.append(words[1].lower())
+                elif words[0] == "dictionary":
+                    dictionary = words[1]
+
+        if not codes:
+            continue
+
+        dictionary_codes = languages.setdefault(
+            dictionary or codes[0].split("-")[0], []
+        )
+        dictionary_codes.extend(code for code in codes if code not in dictionary_codes)
+
+    return languages
+
+
+def split_espeak_data(data_dir: Path, output_dir: Path) -> List[DataPack]:
+    """
+    Splits a compiled espeak-ng-data directory into a core pack, holding everything but
+    the dictionaries (phoneme tables, intonations, voice definitions), and one pack per
+    language dictionary. Each pack holds an "espeak-ng-data" directory, so installing
+    packs side by side rebuilds the data tree for the installed languages.
+
+    Args:
+        data_dir (Path): The compiled espeak-ng-data directory.
+        output_dir (Path): The directory where the pack directories will be saved.
+
+    Returns:
+        List[DataPack]: The core pack, followed by the language packs by dictionary name.
+    """
+    languages = dictionary_languages(data_dir)
+    dictionaries = sorted(data_dir.glob(f"*{DICTIONARY_SUFFIX}"))
+    excluded = set(dictionaries)
+
+    core_dir = output_dir / CORE_PACK / data_dir.name
+    for source_file in data_dir.rglob("*"):
+        if source_file.is_file() and source_file not in excluded:
+            target_file = core_dir / source_file.relative_to(data_dir)
+            target_file.parent.mkdir(parents=True, exist_ok=True)
+            copy2(source_file, target_file)
+
+    packs = [
+        DataPack(
+            id=CORE_PACK,
+            phonemizer="espeak",
+            directory=data_dir.name,
+            languages=[],
+            requires=[],
+            size=pack_size(core_dir),
+        )
+    ]
+
+    for dictionary_file in dictionaries:
+        dictionary = dictionary_file.name[: -len(DICTIONARY_SUFFIX)]
+        pack_dir = output_dir / language_pack(dictionary) / data_dir.name
+        pack_dir.mkdir(parents=True, exist_ok=True)
+        copy2(dictionary_file, pack_dir / dictionary_file.name)
+
+        packs.append(
+            DataPack(
+                id=language_pack(dictionary),
+                phonemizer="espeak",
+                directory=data_dir.name,
+                languages=languages.get(dictionary, [dictionary]),
+                requires=[CORE_PACK],
+                size=pack_size(pack_dir),
+            )
+        )
+
+    print(
+        f"Split {data_dir.name} into a core pack and {len(dictionaries)} language packs."
+    )
+    return packs
+
+
+def pack_size(directory: Path) -> int:
+    """
+    Gets the total size of the files in a directory.
+
+    Args:
+        directory (Path): The directory.
+
+    Returns:
+        int: The size in bytes.
+    """
+    return sum(file.stat().st_size for file in directory.rglob("*") if file.is_file())
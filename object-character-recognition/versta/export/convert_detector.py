@@ -0,0 +1,48 @@
+from pathlib import Path
+from typing import List
+
+from .convert_mnn import convert_to_mnn
+from .definitions import FOLD_VARIANTS, QUARTER_VARIANT_NOTE, mnn_filename
+from .fold_deconv import fold_variant_graph
+from .manifest import file_entry
+from .pipeline import convert_paddle_model
+from .typing import ManifestFile, ModelSpec
+
+DET_PRIORITIES = {"": 2, "half": 1, "quarter": 3}
+
+
+def convert_detector(
+    spec: ModelSpec,
+    work_dir: Path,
+    pack_dir: Path,
+    mnnconvert: Path,
+) -> List[ManifestFile]:
+    """
+    Converts a DBNet detector to MNN, along with the variants with its head deconvs
+    folded to 1/2 and 1/4 output resolution.
+
+    Args:
+        spec (ModelSpec): The model catalog entry.
+        work_dir (Path): Scratch directory for tars, extracted models and ONNX.
+        pack_dir (Path): The pack output directory.
+        mnnconvert (Path): The MNNConvert binary.
+
+    Returns:
+        List[ManifestFile]: Manifest entries of the detector and its variants.
+    """
+    _, onnx_path, mnn_path = convert_paddle_model(spec, work_dir, pack_dir, mnnconvert)
+
+    entries = [file_entry(mnn_path, "detector", DET_PRIORITIES[""])]
+    for variant, deconvs in FOLD_VARIANTS.items():
+        folded_onnx = work_dir / "onnx" / f"{spec['stem']}_{variant}.onnx"
+        fold_variant_graph(onnx_path, deconvs, folded_onnx)
+        folded_mnn = convert_to_mnn(
+            mnnconvert, folded_onnx, pack_dir / mnn_filename(spec, variant)
+        )
+        note = QUARTER_VARIANT_NOTE if variant == "quarter" else None
+        entries.append(
+            file_entry(folded_mnn, "detector", DET_PRIORITIES[variant], note=note)
+        )
+        print(folded_mnn)
+
+    return entries
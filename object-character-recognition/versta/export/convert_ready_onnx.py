@@ -0,0 +1,63 @@
+from pathlib import Path
+from typing import List
+
+from huggingface_hub import hf_hub_download
+
+from .convert_mnn import convert_to_mnn
+from .definitions import mnn_filename
+from .download import download_file
+from .manifest import file_entry
+from .typing import HfSource, ManifestFile, ModelSpec
+
+
+def fetch_hf_onnx(source: HfSource, dest_dir: Path) -> Path:
+    """Fetches a ready ONNX from the HF hub (etag-cached downloads).
+
+    Args:
+        source (HfSource): The HF repo + filename pair.
+        dest_dir (Path): Local dir mirroring the repo layout.
+
+    Returns:
+        Path: The downloaded ONNX path.
+    """
+    return Path(
+        hf_hub_download(
+            repo_id=source["repo_id"],
+            filename=source["filename"],
+            local_dir=dest_dir / "hf" / source["repo_id"].replace("/", "--"),
+        )
+    )
+
+
+def convert_ready_onnx(
+    spec: ModelSpec,
+    work_dir: Path,
+    pack_dir: Path,
+    mnnconvert: Path,
+) -> List[ManifestFile]:
+    """
+    Converts a model that ships as ready ONNX to MNN: no tar extraction or paddle2onnx
+    step. Glyphmatte is fetched via huggingface_hub from the published HF repo; the
+    docaligner comes from a plain HTTP mirror.
+
+    Args:
+        spec (ModelSpec): The model catalog entry.
+        work_dir (Path): Scratch directory for downloads.
+        pack_dir (Path): The pack output directory.
+        mnnconvert (Path): The MNNConvert binary.
+
+    Returns:
+        List[ManifestFile]: The manifest entry of the model.
+    """
+    downloads = work_dir / "downloads"
+
+    if "hf" in spec:
+        onnx_path = fetch_hf_onnx(spec["hf"], downloads)
+    elif "url" in spec:
+        onnx_path = download_file(spec["url"], downloads / f"{spec['stem']}.onnx")
+    else:  # pragma: no cover - catalogue invariant
+        raise ValueError(f"{spec['stem']}: spec needs a url or hf source")
+
+    mnn_path = convert_to_mnn(mnnconvert, onnx_path, pack_dir / mnn_filename(spec))
+    print(mnn_path)
+    return [file_entry(mnn_path, spec["kind"], 1, note=spec.get("note"))]
@@ -0,0 +1,38 @@
+from pathlib import Path
+from typing import List
+
+from .definitions import keys_filename
+from .keys import write_keys
+from .manifest import file_entry
+from .pipeline import convert_paddle_model
+from .typing import ManifestFile, ModelSpec
+
+
+def convert_recognizer(
+    spec: ModelSpec,
+    work_dir: Path,
+    pack_dir: Path,
+    mnnconvert: Path,
+) -> List[ManifestFile]:
+    """
+    Converts a recognizer tier to MNN and writes its character dictionary.
+
+    Args:
+        spec (ModelSpec): The model catalog entry.
+        work_dir (Path): Scratch directory for tars, extracted models and ONNX.
+        pack_dir (Path): The pack output directory.
+        mnnconvert (Path): The MNNConvert binary.
+
+    Returns:
+        List[ManifestFile]: Manifest entries of the recognizer and its keys.
+    """
+    model_dir, _, mnn_path = convert_paddle_model(spec, work_dir, pack_dir, mnnconvert)
+
+    keys_path = pack_dir / keys_filename(spec)
+    count = write_keys(model_dir / "inference.yml", keys_path)
+    print(f"{keys_path} ({count} entries)")
+
+    return [
+        file_entry(mnn_path, "recognizer", 1, script=spec["script"] or None),
+        file_entry(keys_path, "keys", 1, script=spec["script"]),
+    ]
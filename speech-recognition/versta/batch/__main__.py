@@ -0,0 +1,150 @@
+import os
+
+from argparse import ArgumentParser
+from pathlib import Path
+
+from ..version import VERSION
+from .export import export_models
+from .model_file import (
+    load_model_file,
+    save_data_file,
+    save_model_file,
+    update_data_json,
+    update_models_json,
+)
+
+MODELS_JSON = Path(__file__).parent.parent.parent / "models.json"
+DATA_JSON = Path(__file__).parent.parent.parent / "data.json"
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Batch download and bundle multiple whisper.cpp speech recognition models
+        and generate an output definition, which can be used to deploy the models in the Versta
+        application. Models are downloaded concurrently into a shared cache and bundled on a
+        process pool, after which the models.json catalog is refreshed. The shared Silero-VAD
+        data bundle referenced by every model is bundled once and recorded in data.json.
+        """,
+    )
+
+    parser.add_argument(
+        "--input_file",
+        type=Path,
+        default=MODELS_JSON,
+        help="Provide the JSON file listing the model types to build, either as bare model "
+        "types or as objects with an 'id' and 'base_model'. "
+        "Defaults to the models.json catalog, rebuilding every published model.",
+    )
+
+    parser.add_argument(
+        "--model_types",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Only build these model types from the input file. Defaults to all.",
+    )
+
+    parser.add_argument(
+        "--output_dir",
+        type=Path,
+        default=Path("output/batch"),
+        help="Provide an output directory for the downloaded models, bundles and "
+        "configuration file. If unspecified, 'output/batch' is used.",
+    )
+
+    parser.add_argument(
+        "--cache_dir",
+        type=Path,
+        default=Path("cache"),
+        help="Shared download cache directory. Verified downloads are kept here across "
+        "runs, so unchanged models are not downloaded again.",
+    )
+
+    parser.add_argument(
+        "--link_prefix",
+        type=str,
+        default="https://models.versta.app/speech-recognition/",
+        help="Provide the prefix for the links to the models; the version is appended. "
+        "This will be used to generate the links to the models in the output definition file.",
+    )
+
+    parser.add_argument(
+        "--download_workers",
+        type=int,
+        default=4,
+        help="Number of models downloaded concurrently. Defaults to 4.",
+    )
+
+    parser.add_argument(
+        "--bundle_workers",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of bundling processes. Defaults to the number of CPUs.",
+    )
+
+    parser.add_argument(
+        "--keep_intermediates",
+        action="store_true",
+        default=False,
+        help="Whether to remove intermediate files created during the bundling process."
+        "This will default to False if not specified.",
+    )
+
+    parsed_args = parser.parse_args()
+    return parsed_args
+
+
+def main(
+    input_file: Path,
+    output_dir: Path,
+    cache_dir: Path,
+    link_prefix: str,
+    model_types: list = None,
+    download_workers: int = 4,
+    bundle_workers: int = None,
+    keep_intermediates: bool = False,
+):
+    # Step 1: Load the model file
+    models = load_model_file(input_file, model_types)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Step 2: Download all models concurrently and bundle them on a process pool, together
+    # with the shared VAD data bundle
+    bundles, vad_bundle = export_models(
+        models,
+        output_dir,
+        cache_dir,
+        download_workers,
+        bundle_workers or os.cpu_count(),
+        keep_intermediates,
+    )
+
+    # Step 3: Save the model and data files
+    generated = save_model_file(bundles, link_prefix, output_dir, VERSION)
+    generated_data = save_data_file(vad_bundle, "vad", link_prefix, output_dir, VERSION)
+
+    # Step 4: Sync the freshly computed fields back into the catalogs (backed up to .bak),
+    # when the batch was built from the catalog rather than a scratch model list
+    if input_file.resolve() == MODELS_JSON.resolve():
+        update_models_json(MODELS_JSON, generated)
+        update_data_json(DATA_JSON, generated_data)
+    else:
+        print(
+            f"Built from {input_file}; {MODELS_JSON.name} and {DATA_JSON.name} are left untouched."
+        )
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(
+        input_file=args.input_file,
+        output_dir=args.output_dir,
+        cache_dir=args.cache_dir,
+        link_prefix=args.link_prefix,
+        model_types=args.model_types,
+        download_workers=args.download_workers,
+        bundle_workers=args.bundle_workers,
+        keep_intermediates=args.keep_intermediates,
+    )
@@ -0,0 +1,175 @@
+import json
+
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from ..bundle import __main__ as bundle
+from ..export.download import DEFAULT_VAD_REPO, download_model, download_vad
+from ..version import VERSION
+
+from .typing import ExportedBundle, ExportedModel, ModelFile
+
+
+def bundle_name(model_id: str) -> str:
+    """
+    Builds the batch bundle identifier for a model. Unlike the single-model bundle CLI,
+    which names bundles after the model size only, the batch names them after the full
+    model id so several quantizations of the same size never overwrite each other.
+
+    Args:
+        model_id (str): The model id (e.g. "large-v3-turbo-q8_0").
+
+    Returns:
+        str: The bundle identifier (e.g. "whisper.large-v3-turbo-q8_0").
+    """
+    return f"whisper.{model_id}"
+
+
+def export_models(
+    models: List[ModelFile],
+    output_dir: Path,
+    cache_dir: Path,
+    download_workers: int,
+    bundle_workers: int,
+    keep_intermediates: bool = False,
+) -> Tuple[List[ExportedBundle], ExportedBundle]:
+    """
+    Download the whisper.cpp models and bundle each of them into its own tarball, together
+    with the shared VAD data bundle every model references.
+
+    Downloads run concurrently on a thread pool and share one verified download cache. Each
+    download is handed to a process pool for bundling as soon as it completes, so
+    compression of finished models overlaps with the remaining downloads.
+
+    Args:
+        models (List[ModelFile]): The models to download and bundle.
+        output_dir (Path): The directory where the models will be downloaded and bundled.
+        cache_dir (Path): The shared download cache directory.
+        download_workers (int): Number of concurrent downloads.
+        bundle_workers (int): Number of bundling processes.
+        keep_intermediates (bool): Whether to keep intermediate bundling files.
+
+    Returns:
+        Tuple[List[ExportedBundle], ExportedBundle]: The model bundle output details, in
+        the order of ``models``, and the VAD data bundle output details.
+    """
+    models_dir = output_dir / "models"
+    bundles_dir = output_dir / "bundles"
+
+    bundled: Dict[int, Future] = {}
+
+    with (
+        ThreadPoolExecutor(max_workers=download_workers) as downloads,
+        ProcessPoolExecutor(
+            max_workers=bundle_workers, mp_context=get_context("spawn")
+        ) as bundles,
+    ):
+        vad = downloads.submit(_export_vad, models_dir, cache_dir)
+        pending = {
+            downloads.submit(_export_model, model, models_dir, cache_dir): index
+            for index, model in enumerate(models)
+        }
+
+        vad_bundle = bundles.submit(
+            _export_bundle, vad.result(), bundles_dir, keep_intermediates, None
+        )
+
+        for future in as_completed(pending):
+            model = future.result()
+            bundled[pending[future]] = bundles.submit(
+                _export_bundle,
+                model,
+                bundles_dir,
+                keep_intermediates,
+                bundle_name(model["id"]),
+            )
+
+        return (
+            [bundled[index].result() for index in range(len(models))],
+            vad_bundle.result(),
+        )
+
+
+def _export_model(model: ModelFile, output_dir: Path, cache_dir: Path) -> ExportedModel:
+    """
+    Download a single whisper.cpp model.
+
+    Args:
+        model (ModelFile): The model to download.
+        output_dir (Path): The directory where the model will be downloaded.
+        cache_dir (Path): The shared download cache directory.
+
+    Returns:
+        ExportedModel: The downloaded model details.
+    """
+    path = download_model(
+        repo_id=model["base_model"],
+        model_type=model["id"],
+        output_dir=output_dir,
+        cache_dir=cache_dir,
+    )
+
+    return ExportedModel(path=path, id=model["id"], base_model=model["base_model"])
+
+
+def _export_vad(output_dir: Path, cache_dir: Path) -> ExportedModel:
+    """
+    Download the Silero-VAD model as the shared VAD data bundle folder.
+
+    Args:
+        output_dir (Path): The directory where the data bundle folder will be written.
+        cache_dir (Path): The shared download cache directory.
+
+    Returns:
+        ExportedModel: The downloaded data bundle details.
+    """
+    path = download_vad(output_dir=output_dir, cache_dir=cache_dir)
+
+    return ExportedModel(path=path, id=path.name, base_model=DEFAULT_VAD_REPO)
+
+
+def _export_bundle(
+    model: ExportedModel,
+    output_dir: Path,
+    keep_intermediates: bool,
+    unique_id: str = None,
+) -> ExportedBundle:
+    """
+    Bundle a downloaded model (or data bundle folder) into a single tarball. Each bundle is
+    written into its own subdirectory, so concurrent bundles never share intermediates.
+
+    Args:
+        model (ExportedModel): The downloaded model to be bundled.
+        output_dir (Path): The directory where the model will be bundled.
+        keep_intermediates (bool): Whether to keep intermediate files.
+        unique_id (str): The bundle identifier, or None for the bundle module default.
+
+    Returns:
+        ExportedBundle: The bundle output details, including the estimated runtime memory
+        of the model (None for data bundles).
+    """
+    with open(model["path"] / "metadata.json", "r", encoding="utf-8") as handle:
+        memory = json.load(handle).get("memory", {}).get("total_bytes")
+
+    exported = bundle.main(
+        input_dir=model["path"],
+        output_dir=output_dir / model["id"],
+        keep_intermediates=keep_intermediates,
+        unique_id=unique_id,
+    )
+
+    return ExportedBundle(
+        path=exported["bundle"],
+        checksum=exported["checksum"],
+        id=model["id"],
+        base_model=model["base_model"],
+        version=VERSION,
+        memory=memory,
+    )
@@ -0,0 +1,233 @@
+import json
+import shutil
+from json import load
+from os.path import getsize
+from pathlib import Path
+from typing import Dict, List
+
+from .typing import ExportedBundle, ModelFile
+
+DEFAULT_REPO = "ggerganov/whisper.cpp"
+
+# Fields copied verbatim from the generated models.json into the catalog.
+COPIED_FIELDS = ("size", "memory", "version", "bundle", "checksum")
+
+
+def load_model_file(file_path: Path, model_types: List[str] = None) -> List[ModelFile]:
+    """
+    Load the list of whisper.cpp models to build from the specified path.
+
+    The file is a JSON list whose entries are either a bare model type (e.g. "base-q8_0",
+    downloaded from 'ggerganov/whisper.cpp') or an object with an ``id`` (the model type)
+    and an optional ``base_model`` repository. The models.json catalog itself has this
+    shape, so it can be passed directly to rebuild every published model.
+
+    Args:
+        file_path (Path): Path to the model file.
+        model_types (List[str]): Only keep these model types. Defaults to all.
+
+    Returns:
+        List[ModelFile]: The models to build, in file order.
+    """
+    if not file_path.exists():
+        raise FileNotFoundError(f"Model file not found: {file_path}")
+
+    model_files: List[ModelFile] = list()
+
+    with open(file_path, "r") as f:
+        models = load(f)
+
+    for model in models:
+        if isinstance(model, str):
+            model = {"id": model}
+
+        if model_types is not None and model["id"] not in model_types:
+            continue
+
+        model_files.append(
+            ModelFile(
+                id=model["id"],
+                base_model=model.get("base_model") or DEFAULT_REPO,
+            )
+        )
+
+    return model_files
+
+
+def save_model_file(
+    bundles: List[ExportedBundle],
+    link_prefix: str,
+    output_dir: Path,
+    version: str,
+) -> Path:
+    """
+    Save the generated model file to the specified path.
+
+    Args:
+        bundles (List[ExportedBundle]): List of model bundles to be saved.
+        link_prefix (str): Prefix for the model file links; the version is appended.
+        output_dir (Path): Directory where the model file will be saved.
+        version (str): The deployment version (from version.txt).
+
+    Returns:
+        Path: The path to the written model file.
+    """
+    file_path = output_dir / "models.json"
+    link_prefix = f"{link_prefix.rstrip('/')}/{version}/"
+
+    model_output: List[dict] = list()
+    for bundle in bundles:
+        model_output.append(
+            {
+                "id": bundle["id"],
+                "base_model": bundle["base_model"],
+                "size": getsize(bundle["path"]),
+                "memory": bundle["memory"],
+                "version": bundle["version"],
+                "bundle": link_prefix + bundle["path"].name,
+                "checksum": link_prefix + bundle["checksum"].name,
+            }
+        )
+
+    with open(file_path, "w") as f:
+        json.dump(model_output, f, indent=4)
+
+    return file_path
+
+
+def update_models_json(existing_path: Path, generated_path: Path) -> Path:
+    """
+    Refreshes the computed fields of the catalog models.json from the freshly generated
+    models.json, matching entries by id.
+
+    The size, memory (estimated runtime bytes), version, bundle and checksum fields are
+    copied verbatim from the generated file. Descriptive fields (name, base_model,
+    architectures, languages) and the order of the catalog are preserved, so rebuilding
+    the same models always yields the same catalog. Generated models without a catalog
+    entry are reported, not added, as their descriptive fields cannot be derived.
+
+    Before overwriting, the existing catalog is backed up to "<input_name>.bak" (any
+    prior backup is overwritten).
+
+    Args:
+        existing_path (Path): Path to the catalog models.json to update in place.
+        generated_path (Path): Path to the generated models.json with the computed
+            fields.
+
+    Returns:
+        Path: The path of the updated catalog (same as `existing_path`).
+    """
+    existing_path = Path(existing_path)
+    generated_path = Path(generated_path)
+
+    backup_path = existing_path.parent / (existing_path.name + ".bak")
+    shutil.copy2(existing_path, backup_path)
+
+    with open(existing_path, "r") as f:
+        catalog = load(f)
+    with open(generated_path, "r") as f:
+        generated = load(f)
+
+    computed_by_id: Dict[str, dict] = {entry["id"]: entry for entry in generated}
+
+    for entry in catalog:
+        match = computed_by_id.pop(entry["id"], None)
+        if match is None:
+            continue
+
+        for field in COPIED_FIELDS:
+            entry[field] = match[field]
+
+    for model_id in computed_by_id:
+        print(f"No catalog entry for '{model_id}'; add it to {existing_path} manually.")
+
+    with open(existing_path, "w") as f:
+        json.dump(catalog, f, indent=2)
+        f.write("\n")
+
+    return existing_path
+
+
+def save_data_file(
+    bundle: ExportedBundle,
+    data_type: str,
+    link_prefix: str,
+    output_dir: Path,
+    version: str,
+) -> Path:
+    """
+    Save the generated data file describing the shared data bundle (such as the Silero-VAD
+    data bundle), in the format of the Versta data.json catalogs.
+
+    Args:
+        bundle (ExportedBundle): The data bundle to be saved.
+        data_type (str): The data bundle type (e.g. "vad").
+        link_prefix (str): Prefix for the bundle file links; the version is appended.
+        output_dir (Path): Directory where the data file will be saved.
+        version (str): The deployment version (from version.txt).
+
+    Returns:
+        Path: The path to the written data file.
+    """
+    file_path = output_dir / "data.json"
+    link_prefix = f"{link_prefix.rstrip('/')}/{version}/"
+
+    data_output = [
+        {
+            "id": bundle["id"],
+            "size": getsize(bundle["path"]),
+            "type": data_type,
+            "version": bundle["version"],
+            "bundle": link_prefix + bundle["path"].name,
+            "checksum": link_prefix + bundle["checksum"].name,
+        }
+    ]
+
+    with open(file_path, "w") as f:
+        json.dump(data_output, f, indent=4)
+
+    return file_path
+
+
+def update_data_json(existing_path: Path, generated_path: Path) -> Path:
+    """
+    Merges the freshly generated data.json entries into the data catalog, replacing the
+    entry with the same id in place or appending it when the catalog has none. Data bundle
+    entries are fully generated, so new entries can be added without manual edits.
+
+    Before overwriting, the existing catalog is backed up to "<input_name>.bak" (any prior
+    backup is overwritten).
+
+    Args:
+        existing_path (Path): Path to the data catalog to update in place.
+        generated_path (Path): Path to the generated data.json.
+
+    Returns:
+        Path: The path of the updated catalog (same as `existing_path`).
+    """
+    existing_path = Path(existing_path)
+    generated_path = Path(generated_path)
+
+    backup_path = existing_path.parent / (existing_path.name + ".bak")
+    shutil.copy2(existing_path, backup_path)
+
+    with open(existing_path, "r") as f:
+        catalog = load(f)
+    with open(generated_path, "r") as f:
+        generated = load(f)
+
+    for entry in generated:
+        index = next(
+            (i for i, existing in enumerate(catalog) if existing["id"] == entry["id"]),
+            None,
+        )
+        if index is None:
+            catalog.append(entry)
+        else:
+            catalog[index] = entry
+
+    with open(existing_path, "w") as f:
+        json.dump(catalog, f, indent=2)
+        f.write("\n")
+
+    return existing_path
@@ -0,0 +1,22 @@
+from pathlib import Path
+from typing import TypedDict
+
+
+class ModelFile(TypedDict):
+    id: str
+    base_model: str
+
+
+class ExportedModel(TypedDict):
+    path: Path
+    id: str
+    base_model: str
+
+
+class ExportedBundle(TypedDict):
+    path: Path
+    checksum: Path
+    id: str
+    base_model: str
+    version: str
+    memory: int
@@ -0,0 +1,194 @@
+import json
+import os
+
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import List, Tuple
+
+from ..export.metadata import VAD_DATA_ID
+from .benchmark import benchmark_model, format_table, write_benchmark_metadata
+from .typing import BenchmarkModel
+from .whisper_cpp import resolve_whisper_cli, whisper_cpp_version
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Benchmark exported whisper.cpp (ggml) models offline with whisper-cli and
+        the shared Silero-VAD model on a fixed set of local audio clips. Load time, real-time
+        factor and peak RSS are measured per thread count, recorded in each model's
+        metadata.json and summarized in a comparison table. whisper-cli is built from a
+        pinned whisper.cpp release in vendor/ on first use.
+        """,
+    )
+
+    parser.add_argument(
+        "--models_dir",
+        type=Path,
+        default=Path("output"),
+        help="Directory holding the exported model folders and the VAD data bundle folder, "
+        "as written by the export module. Defaults to 'output'.",
+    )
+
+    parser.add_argument(
+        "--model_types",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Only benchmark these model types. Defaults to every model in --models_dir.",
+    )
+
+    parser.add_argument(
+        "--clips_dir",
+        type=Path,
+        required=True,
+        help="Directory of 16 kHz WAV clips to transcribe. Use the same clips for every "
+        "run, so results are comparable.",
+    )
+
+    parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4],
+        help="Thread counts to measure. Defaults to 1, 2 and 4.",
+    )
+
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=3,
+        help="Repetitions per clip and thread count; the median is reported. Defaults to 3.",
+    )
+
+    parser.add_argument(
+        "--language",
+        type=str,
+        default="auto",
+        help="Spoken language of the clips, or 'auto' to detect it. Defaults to 'auto'.",
+    )
+
+    parser.add_argument(
+        "--whisper_cli",
+        type=Path,
+        default=None,
+        help="Path to a whisper-cli binary. If unspecified, the vendored build is used "
+        "(built on first use), falling back to whisper-cli on PATH.",
+    )
+
+    parser.add_argument(
+        "--output_dir",
+        type=Path,
+        default=Path("output/benchmark"),
+        help="Directory where the full results and the comparison table are written. "
+        "Defaults to 'output/benchmark'.",
+    )
+
+    return parser.parse_args()
+
+
+def find_models(
+    models_dir: Path, model_types: List[str] = None
+) -> Tuple[List[BenchmarkModel], Path]:
+    """
+    Finds the exported models and the VAD model in an export output directory.
+
+    Args:
+        models_dir (Path): The export output directory.
+        model_types (List[str]): Only keep these model types. Defaults to all.
+
+    Returns:
+        Tuple[List[BenchmarkModel], Path]: The models, sorted by id, and the VAD model.
+
+    Raises:
+        FileNotFoundError: If the VAD data bundle folder or a requested model is missing.
+    """
+    models: List[BenchmarkModel] = []
+    vad_model = None
+
+    for metadata_file in sorted(models_dir.glob("*/metadata.json")):
+        with open(metadata_file, "r", encoding="utf-8") as handle:
+            metadata = json.load(handle)
+
+        if metadata["id"] == VAD_DATA_ID:
+            vad_model = metadata_file.parent / metadata["files"]["vad"]
+            continue
+
+        if model_types is not None and metadata["id"] not in model_types:
+            continue
+
+        models.append(
+            BenchmarkModel(
+                path=metadata_file.parent,
+                id=metadata["id"],
+                model=metadata_file.parent / metadata["files"]["inference"]["model"],
+            )
+        )
+
+    if vad_model is None:
+        raise FileNotFoundError(
+            f"No {VAD_DATA_ID} folder in {models_dir}; run the export module first."
+        )
+
+    missing = set(model_types or []) - {model["id"] for model in models}
+    if missing:
+        raise FileNotFoundError(f"Models not found in {models_dir}: {sorted(missing)}")
+
+    return models, vad_model
+
+
+def main(
+    models_dir: Path,
+    clips_dir: Path,
+    output_dir: Path,
+    threads: List[int],
+    runs: int = 3,
+    language: str = "auto",
+    model_types: List[str] = None,
+    whisper_cli: Path = None,
+) -> Path:
+    # Step 1: Resolve whisper-cli, the models and the clips
+    whisper_cli = resolve_whisper_cli(whisper_cli)
+    models, vad_model = find_models(models_dir, model_types)
+
+    clips = sorted(clips_dir.glob("*.wav"))
+    if not clips:
+        raise FileNotFoundError(f"No WAV clips found in {clips_dir}")
+
+    # Step 2: Benchmark every model; models run one after another so they never compete
+    # for cores or memory
+    version = whisper_cpp_version(whisper_cli)
+    benchmarks = []
+    for model in models:
+        benchmark = benchmark_model(
+            whisper_cli, model, vad_model, clips, threads, runs, language, version
+        )
+        write_benchmark_metadata(model, benchmark)
+        benchmarks.append(benchmark)
+
+    # Step 3: Write the full results and the comparison table
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(output_dir / "benchmark.json", "w", encoding="utf-8") as handle:
+        json.dump(benchmarks, handle, indent=4)
+
+    table = format_table(benchmarks)
+    table_file = output_dir / "benchmark.md"
+    table_file.write_text(table, encoding="utf-8")
+
+    print(table)
+    return table_file
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(
+        models_dir=args.models_dir,
+        clips_dir=args.clips_dir,
+        output_dir=args.output_dir,
+        threads=args.threads,
+        runs=args.runs,
+        language=args.language,
+        model_types=args.model_types,
+        whisper_cli=args.whisper_cli,
+    )
@@ -0,0 +1,249 @@
+import json
+import os
+import platform
+import re
+import subprocess
+import time
+import wave
+
+from pathlib import Path
+from statistics import median
+from typing import List
+
+from .typing import BenchmarkModel, ModelBenchmark, RunResult, ThreadResult
+
+LOAD_TIME_PATTERN = re.compile(r"load time =\s*([\d.]+) ms")
+
+
+def clip_duration(path: Path) -> float:
+    """
+    Reads the duration of a WAV clip.
+
+    Args:
+        path (Path): The WAV file (whisper-cli expects 16 kHz audio).
+
+    Returns:
+        float: The clip duration in seconds.
+    """
+    with wave.open(str(path), "rb") as handle:
+        return handle.getnframes() / handle.getframerate()
+
+
+def device_name() -> str:
+    """
+    Describes the machine the benchmark runs on.
+
+    Returns:
+        str: The OS, architecture, processor and CPU count.
+    """
+    processor = platform.processor() or platform.machine()
+    return (
+        f"{platform.system()} {platform.machine()} {processor} ({os.cpu_count()} CPUs)"
+    )
+
+
+def run_whisper(
+    whisper_cli: Path,
+    model: Path,
+    vad_model: Path,
+    clip: Path,
+    threads: int,
+    language: str,
+) -> RunResult:
+    """
+    Transcribes a single clip with whisper-cli and measures it. The load time is parsed
+    from the whisper.cpp timings; the peak RSS is the maximum resident set size of the
+    finished process, as reported by ``wait4``.
+
+    Args:
+        whisper_cli (Path): The whisper-cli binary.
+        model (Path): The ggml model.
+        vad_model (Path): The Silero-VAD ggml model from the shared data bundle.
+        clip (Path): The WAV clip.
+        threads (int): Number of inference threads.
+        language (str): Spoken language of the clip, or "auto".
+
+    Returns:
+        RunResult: The load time, wall time and peak RSS of the run.
+
+    Raises:
+        RuntimeError: If whisper-cli fails.
+    """
+    command = [
+        str(whisper_cli),
+        "--model",
+        str(model),
+        "--file",
+        str(clip),
+        "--threads",
+        str(threads),
+        "--language",
+        language,
+        "--vad",
+        "--vad-model",
+        str(vad_model),
+        "--no-timestamps",
+    ]
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    stderr = process.stderr.read()
+    process.stderr.close()
+
+    # Reap the process ourselves: unlike Popen.wait, wait4 returns the resource usage of
+    # this child alone.
+    _, status, usage = os.wait4(process.pid, 0)
+    wall_seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"whisper-cli failed on {clip.name} ({process.returncode}): {stderr[-2000:]}"
+        )
+
+    match = LOAD_TIME_PATTERN.search(stderr)
+
+    return RunResult(
+        clip=clip.name,
+        audio_seconds=clip_duration(clip),
+        load_ms=float(match.group(1)) if match else 0.0,
+        wall_seconds=wall_seconds,
+        # ru_maxrss is reported in KiB on Linux.
+        peak_rss_bytes=usage.ru_maxrss * 1024,
+    )
+
+
+def benchmark_model(
+    whisper_cli: Path,
+    model: BenchmarkModel,
+    vad_model: Path,
+    clips: List[Path],
+    threads: List[int],
+    runs: int,
+    language: str,
+    whisper_cpp: str,
+) -> ModelBenchmark:
+    """
+    Benchmarks a model on every clip for each thread count. Each clip is transcribed
+    ``runs`` times; per thread count, the median load time is reported, the real-time
+    factor is the median processing time (wall time minus load time) summed over the clips
+    divided by the total audio duration, and the peak RSS is the maximum over all runs.
+
+    Args:
+        whisper_cli (Path): The whisper-cli binary.
+        model (BenchmarkModel): The model to benchmark.
+        vad_model (Path): The Silero-VAD ggml model from the shared data bundle.
+        clips (List[Path]): The WAV clips.
+        threads (List[int]): The thread counts to measure.
+        runs (int): Repetitions per clip and thread count.
+        language (str): Spoken language of the clips, or "auto".
+        whisper_cpp (str): The whisper.cpp version the runs use.
+
+    Returns:
+        ModelBenchmark: The per thread count results.
+    """
+    results: List[ThreadResult] = []
+
+    for thread_count in threads:
+        thread_runs: List[RunResult] = []
+        processing_seconds = 0.0
+        audio_seconds = 0.0
+
+        for clip in clips:
+            clip_runs = [
+                run_whisper(
+                    whisper_cli, model["model"], vad_model, clip, thread_count, language
+                )
+                for _ in range(runs)
+            ]
+            thread_runs.extend(clip_runs)
+
+            processing_seconds += median(
+                run["wall_seconds"] - run["load_ms"] / 1000 for run in clip_runs
+            )
+            audio_seconds += clip_runs[0]["audio_seconds"]
+
+        result = ThreadResult(
+            threads=thread_count,
+            load_ms=median(run["load_ms"] for run in thread_runs),
+            rtf=processing_seconds / audio_seconds,
+            peak_rss_bytes=max(run["peak_rss_bytes"] for run in thread_runs),
+            runs=thread_runs,
+        )
+        results.append(result)
+
+        print(
+            f"{model['id']} @ {thread_count} threads: RTF {result['rtf']:.3f}, "
+            f"load {result['load_ms']:.0f} ms, "
+            f"peak RSS {result['peak_rss_bytes'] >> 20} MiB"
+        )
+
+    return ModelBenchmark(
+        id=model["id"],
+        whisper_cpp=whisper_cpp,
+        device=device_name(),
+        clips=len(clips),
+        runs=runs,
+        results=results,
+    )
+
+
+def write_benchmark_metadata(model: BenchmarkModel, benchmark: ModelBenchmark) -> Path:
+    """
+    Records the benchmark summary (without the individual runs) in the model metadata,
+    so it travels with the model into its bundle.
+
+    Args:
+        model (BenchmarkModel): The benchmarked model.
+        benchmark (ModelBenchmark): The benchmark results.
+
+    Returns:
+        Path: The updated metadata file.
+    """
+    metadata_file = model["path"] / "metadata.json"
+
+    with open(metadata_file, "r", encoding="utf-8") as handle:
+        metadata = json.load(handle)
+
+    metadata["benchmark"] = {
+        "whisper_cpp": benchmark["whisper_cpp"],
+        "device": benchmark["device"],
+        "clips": benchmark["clips"],
+        "runs": benchmark["runs"],
+        "results": [
+            {key: value for key, value in result.items() if key != "runs"}
+            for result in benchmark["results"]
+        ],
+    }
+
+    with open(metadata_file, "w", encoding="utf-8") as handle:
+        json.dump(metadata, handle, indent=4)
+
+    return metadata_file
+
+
+def format_table(benchmarks: List[ModelBenchmark]) -> str:
+    """
+    Formats the benchmark results as a Markdown comparison table, one row per model and
+    thread count.
+
+    Args:
+        benchmarks (List[ModelBenchmark]): The benchmark results.
+
+    Returns:
+        str: The Markdown table.
+    """
+    lines = [
+        "| Model | Threads | Load (ms) | RTF | Peak RSS (MiB) |",
+        "| --- | ---: | ---: | ---: | ---: |",
+    ]
+    for benchmark in benchmarks:
+        for result in benchmark["results"]:
+            lines.append(
+                f"| {benchmark['id']} | {result['threads']} | {result['load_ms']:.0f} "
+                f"| {result['rtf']:.3f} | {result['peak_rss_bytes'] / (1 << 20):.0f} |"
+            )
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,33 @@
+from pathlib import Path
+from typing import List, TypedDict
+
+
+class BenchmarkModel(TypedDict):
+    path: Path
+    id: str
+    model: Path
+
+
+class RunResult(TypedDict):
+    clip: str
+    audio_seconds: float
+    load_ms: float
+    wall_seconds: float
+    peak_rss_bytes: int
+
+
+class ThreadResult(TypedDict):
+    threads: int
+    load_ms: float
+    rtf: float
+    peak_rss_bytes: int
+    runs: List[RunResult]
+
+
+class ModelBenchmark(TypedDict):
+    id: str
+    whisper_cpp: str
+    device: str
+    clips: int
+    runs: int
+    results: List[ThreadResult]
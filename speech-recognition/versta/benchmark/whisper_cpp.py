@@ -0,0 +1,134 @@
+import subprocess
+
+from pathlib import Path
+from shutil import which
+
+MODULE_ROOT = Path(__file__).resolve().parents[2]
+
+# whisper.cpp release the benchmark builds against. The checkout lives in vendor/, like
+# the vendored MNN of the OCR module.
+WHISPER_CPP_REPO = "https://github.com/ggml-org/whisper.cpp"
+WHISPER_CPP_TAG = "v1.7.6"
+WHISPER_CPP_SOURCE_DIR = MODULE_ROOT / "vendor" / "whisper.cpp"
+WHISPER_CLI_BINARY = WHISPER_CPP_SOURCE_DIR / "build" / "bin" / "whisper-cli"
+
+
+def checkout_whisper_cpp(tag: str = WHISPER_CPP_TAG) -> Path:
+    """
+    Clones the pinned whisper.cpp release into vendor/whisper.cpp, unless it is already
+    checked out.
+
+    Args:
+        tag (str): The whisper.cpp release tag.
+
+    Returns:
+        Path: The whisper.cpp source directory.
+    """
+    if (WHISPER_CPP_SOURCE_DIR / "CMakeLists.txt").exists():
+        return WHISPER_CPP_SOURCE_DIR
+
+    WHISPER_CPP_SOURCE_DIR.parent.mkdir(parents=True, exist_ok=True)
+    subprocess.run(
+        [
+            "git",
+            "clone",
+            "--depth",
+            "1",
+            "--branch",
+            tag,
+            WHISPER_CPP_REPO,
+            str(WHISPER_CPP_SOURCE_DIR),
+        ],
+        check=True,
+    )
+    return WHISPER_CPP_SOURCE_DIR
+
+
+def build_whisper_cli(jobs: int = 8) -> Path:
+    """
+    Builds whisper-cli from the vendored whisper.cpp source tree, as a static Release
+    build for the host CPU.
+
+    Args:
+        jobs (int): Parallel build jobs.
+
+    Returns:
+        Path: The built whisper-cli binary path.
+
+    Raises:
+        RuntimeError: If the build does not produce the binary.
+    """
+    source_dir = checkout_whisper_cpp()
+    build_dir = source_dir / "build"
+    subprocess.run(
+        [
+            "cmake",
+            "-S",
+            str(source_dir),
+            "-B",
+            str(build_dir),
+            "-DCMAKE_BUILD_TYPE=Release",
+            "-DBUILD_SHARED_LIBS=OFF",
+            "-DWHISPER_BUILD_TESTS=OFF",
+        ],
+        check=True,
+    )
+    subprocess.run(
+        [
+            "cmake",
+            "--build",
+            str(build_dir),
+            "--target",
+            "whisper-cli",
+            "-j",
+            str(jobs),
+        ],
+        check=True,
+    )
+    if not WHISPER_CLI_BINARY.exists():
+        raise RuntimeError(f"whisper.cpp build did not produce {WHISPER_CLI_BINARY}")
+    return WHISPER_CLI_BINARY
+
+
+def resolve_whisper_cli(override: Path = None) -> Path:
+    """
+    Resolves the whisper-cli binary: an explicit override, the vendored build, or a binary
+    already on PATH — building it from the pinned release on first use.
+
+    Args:
+        override (Path): Explicit whisper-cli path, or None.
+
+    Returns:
+        Path: The whisper-cli binary path.
+
+    Raises:
+        FileNotFoundError: If the override does not exist.
+    """
+    if override is not None:
+        if not override.exists():
+            raise FileNotFoundError(f"whisper-cli not found at {override}")
+        return override
+    if WHISPER_CLI_BINARY.exists():
+        return WHISPER_CLI_BINARY
+    on_path = which("whisper-cli")
+    if on_path is not None:
+        return Path(on_path)
+    print(
+        "whisper-cli not found; building from vendor/whisper.cpp (first run takes a while)"
+    )
+    return build_whisper_cli()
+
+
+def whisper_cpp_version(whisper_cli: Path) -> str:
+    """
+    Describes the whisper.cpp build a benchmark ran against.
+
+    Args:
+        whisper_cli (Path): The whisper-cli binary.
+
+    Returns:
+        str: The pinned tag for the vendored build, otherwise the binary path.
+    """
+    if Path(whisper_cli).resolve() == WHISPER_CLI_BINARY.resolve():
+        return WHISPER_CPP_TAG
+    return str(whisper_cli)
@@ -6,7 +6,7 @@ from pathlib import Path
 from typing import TypedDict
 
 from .bundle_tar import bundle_files, create_checksum
-from .metadata import generate_bundle_metadata
+from .metadata import generate_bundle_metadata, generate_data_bundle_metadata
 from .utils import copy_contents, remove_folder
 
 
@@ -24,18 +24,28 @@ def parse_args():
         os.path.basename(__file__),
         description="""Bundle a previously downloaded whisper.cpp model into a single tarball file.
         The tarball is directly deployable to the Versta application for speech recognition.
-        The model should first have been downloaded using the 'export' module.
+        The model should first have been downloaded using the 'export' module. The shared
+        VAD data folder written by the export module is bundled the same way, producing the
+        data bundle every whisper model references.
         """,
     )
 
     parser.add_argument(
         "--input_dir",
         type=Path,
-        help="Directory containing the downloaded model, VAD model and metadata.json. "
-        "The model id is read from metadata.json.",
+        help="Directory containing the downloaded model (or the shared VAD data) and its "
+        "metadata.json. The model id is read from metadata.json.",
         required=True,
     )
 
+    parser.add_argument(
+        "--unique_id",
+        type=str,
+        default=None,
+        help="Provide a unique identifier for the bundle. This is used for the bundle metadata "
+        "and the tarball name. Defaults to 'whisper.<size>' derived from the model id.",
+    )
+
     parser.add_argument(
         "--output_dir",
         type=Path,
@@ -68,6 +78,7 @@ def main(
     output_dir: Path,
     keep_intermediates: bool = False,
     keep_input: bool = False,
+    unique_id: str = None,
 ):
     # Step 1: Load the per-model metadata written by the export module. The model id is
     # read from this file, so the bundle step does not need it passed in explicitly.
@@ -79,7 +90,8 @@ def main(
         model_metadata = json.load(handle)
 
     model_id = model_metadata.get("id") or input_dir.name
-    name = bundle_id(model_id)
+    is_data = model_metadata.get("type") == "vad"
+    name = unique_id or (model_id if is_data else bundle_id(model_id))
 
     intermediates_dir = output_dir / "intermediates"
 
@@ -89,11 +101,15 @@ def main(
     # so the tarball layout matches the ``directory`` referenced by the bundle metadata.
     copy_contents(input_dir, intermediates_dir / model_id)
 
-    # Step 3: Generate the bundle-level metadata (SpeechRecognitionBundleMetadata schema).
-    # Languages are taken automatically from the bundled model metadata.
-    generate_bundle_metadata(
-        name, model_metadata, intermediates_dir, directory=model_id
-    )
+    # Step 3: Generate the bundle-level metadata. Data bundles follow the shared data bundle
+    # schema; models follow the SpeechRecognitionBundleMetadata schema, with languages and
+    # data bundle references taken automatically from the bundled model metadata.
+    if is_data:
+        generate_data_bundle_metadata(name, intermediates_dir, directory=model_id)
+    else:
+        generate_bundle_metadata(
+            name, model_metadata, intermediates_dir, directory=model_id
+        )
 
     # Step 4: Bundle the folders into a single .tar.gz file
     output_archive = output_dir / f"{name}-bundle.tar.gz"
@@ -125,4 +141,5 @@ if __name__ == "__main__":
         output_dir=args.output_dir,
         keep_intermediates=args.keep_intermediates,
         keep_input=args.keep_input,
+        unique_id=args.unique_id,
     )
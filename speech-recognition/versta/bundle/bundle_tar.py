@@ -16,7 +16,7 @@ def bundle_files(files: List[Path], output_file: Path) -> Path:
     print(f"Bundling files into {output_file}")
 
     with tarfile.open(output_file, "w:gz") as tar:
-        for file in files:
+        for file in sorted(files, key=lambda f: f.name):
             tar.add(file, arcname=file.name)
 
     return output_file
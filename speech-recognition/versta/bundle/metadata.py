@@ -15,8 +15,9 @@ def generate_bundle_metadata(
     Generates the bundle-level metadata.json following the SpeechRecognitionBundleMetadata
     schema consumed by the Versta Android application.
 
-    The supported languages are taken directly from the bundled model metadata, so the
-    bundle automatically inherits every language the model supports.
+    The supported languages, the shared data bundles the model requires (such as the
+    Silero-VAD data bundle, referenced by id and version) and the estimated runtime memory
+    are taken directly from the bundled model metadata.
 
     Args:
         id (str): Unique bundle identifier (e.g. "whisper.base-q8_0").
@@ -29,12 +30,14 @@ def generate_bundle_metadata(
         Path: The path to the written bundle metadata file.
     """
     languages = model_metadata.get("languages", [])
+    data = model_metadata.get("data", [])
 
     bundle_metadata = {
         "id": id,
         "version": VERSION,
         "languages": languages,
         "modules": ["recognition"],
+        "data": data,
         "metadata": [
             {
                 "directory": directory,
@@ -44,6 +47,43 @@ def generate_bundle_metadata(
         ],
     }
 
+    if "memory" in model_metadata:
+        bundle_metadata["memory"] = model_metadata["memory"]
+
+    metadata_file = output_dir / "metadata.json"
+
+    with open(metadata_file, "w") as f:
+        json.dump(bundle_metadata, f, indent=4)
+
+    return metadata_file
+
+
+def generate_data_bundle_metadata(
+    id: str,
+    output_dir: Path,
+    directory: str,
+) -> Path:
+    """
+    Generates the bundle-level metadata.json of a shared data bundle (such as the
+    Silero-VAD data bundle), following the layout of the other Versta data bundles.
+
+    Args:
+        id (str): Unique bundle identifier (e.g. "versta-vad-data").
+        output_dir (Path): Directory where the bundle metadata file will be written.
+        directory (str): Subdirectory (within the bundle) holding the data files and their
+            metadata.
+
+    Returns:
+        Path: The path to the written bundle metadata file.
+    """
+    bundle_metadata = {
+        "id": id,
+        "version": VERSION,
+        "metadata": {
+            "directory": directory,
+        },
+    }
+
     metadata_file = output_dir / "metadata.json"
 
     with open(metadata_file, "w") as f:
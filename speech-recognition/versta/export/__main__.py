@@ -2,8 +2,10 @@ import os
 
 from argparse import ArgumentParser
 from pathlib import Path
+from shutil import rmtree
 
-from .download import download_model
+from .download import download_model, download_vad
+from .quantize import QUANTIZATION_TYPES, quantize_model
 
 
 def parse_args():
@@ -11,8 +13,10 @@ def parse_args():
         os.path.basename(__file__),
         description="""Download a whisper.cpp (ggml) speech recognition model from a Hugging Face
         repository and prepare it for bundling. The model file is already in the native
-        whisper.cpp format and requires no conversion. A Silero-VAD model is downloaded
-        alongside it, as required by the speech-recognition module.
+        whisper.cpp format and requires no conversion. The Silero-VAD model required by the
+        speech-recognition module is prepared alongside it as a separate, shared data bundle
+        folder, which is bundled once and referenced by every whisper model. With
+        --quantize, an f16 model is re-quantized locally to a variant not published upstream.
         """,
     )
 
@@ -47,6 +51,34 @@ def parse_args():
         help="Directory where the downloaded model will be written.",
     )
 
+    parser.add_argument(
+        "--cache_dir",
+        type=Path,
+        default=None,
+        help="Shared download cache directory. Verified downloads are kept here and "
+        "linked into the output directory, so later exports reuse them. If unspecified, "
+        "files are downloaded directly into the output directory.",
+    )
+
+    parser.add_argument(
+        "--quantize",
+        type=str,
+        default=None,
+        choices=list(QUANTIZATION_TYPES),
+        help="Re-quantize the downloaded model locally (requires an f16/f32 --model-type, "
+        "e.g. 'small'). The result is written as '<model-type>-<quantize>', replacing the "
+        "source model directory. If unspecified, the model is exported as published.",
+    )
+
+    parser.add_argument(
+        "--keep",
+        type=str,
+        nargs="*",
+        default=None,
+        help="Regular expressions of tensor names kept in source precision when using "
+        "--quantize. Defaults to the conv biases and positional embeddings, like whisper.cpp.",
+    )
+
     return parser.parse_args()
 
 
@@ -55,27 +87,44 @@ def main(
     model_type: str,
     languages: list,
     output_dir: Path,
+    cache_dir: Path = None,
+    quantize: str = None,
+    keep: list = None,
 ) -> Path:
     """
-    Downloads a single whisper.cpp model (and its VAD model) and writes it to `output_dir`.
+    Downloads a single whisper.cpp model and writes it to `output_dir`, next to the shared
+    VAD data bundle folder.
 
     Args:
         model (str): Hugging Face repository id holding the whisper model.
         model_type (str): Whisper model variant.
-        revision (str): Hugging Face repository revision.
         languages (list): Supported language codes (None => default per variant).
         output_dir (Path): Directory where the model will be written.
+        cache_dir (Path): Shared download cache directory, or None.
+        quantize (str): Quantization type to re-quantize the model to, or None.
+        keep (list): Regular expressions of tensors kept in source precision.
 
     Returns:
         Path: The directory containing the downloaded model and its metadata.
     """
-    return download_model(
+    download_vad(output_dir=output_dir, cache_dir=cache_dir)
+
+    model_dir = download_model(
         repo_id=model,
         model_type=model_type,
         output_dir=output_dir,
         languages=languages,
+        cache_dir=cache_dir,
     )
 
+    if quantize is None:
+        return model_dir
+
+    quantized_dir = quantize_model(model_dir, quantize, keep)
+    rmtree(model_dir)
+
+    return quantized_dir
+
 
 if __name__ == "__main__":
     args = parse_args()
@@ -84,4 +133,7 @@ if __name__ == "__main__":
         model_type=args.model_type,
         languages=args.languages,
         output_dir=args.output_dir,
+        cache_dir=args.cache_dir,
+        quantize=args.quantize,
+        keep=args.keep,
     )
@@ -0,0 +1,296 @@
+import os
+import struct
+
+from argparse import ArgumentParser
+from pathlib import Path
+from shutil import rmtree
+
+import numpy as np
+import torch
+
+from transformers import (
+    WhisperFeatureExtractor,
+    WhisperForConditionalGeneration,
+    WhisperTokenizer,
+)
+
+from .download import build_filename, sha256_file
+from .ggml import GGML_MAGIC, GGMLType, write_tensor
+from .inspect_ggml import inspect_model
+from .metadata import generate_metadata
+from .quantize import QUANTIZATION_TYPES, quantize_model
+
+# Transformers parameter names -> whisper.cpp tensor names, for everything outside the
+# encoder/decoder layers.
+TENSOR_NAMES = {
+    "encoder.embed_positions.weight": "encoder.positional_embedding",
+    "encoder.layer_norm.weight": "encoder.ln_post.weight",
+    "encoder.layer_norm.bias": "encoder.ln_post.bias",
+    "decoder.embed_positions.weight": "decoder.positional_embedding",
+    "decoder.embed_tokens.weight": "decoder.token_embedding.weight",
+    "decoder.layer_norm.weight": "decoder.ln.weight",
+    "decoder.layer_norm.bias": "decoder.ln.bias",
+}
+
+# Transformers layer modules -> whisper.cpp block modules.
+LAYER_NAMES = {
+    "self_attn.q_proj": "attn.query",
+    "self_attn.k_proj": "attn.key",
+    "self_attn.v_proj": "attn.value",
+    "self_attn.out_proj": "attn.out",
+    "self_attn_layer_norm": "attn_ln",
+    "encoder_attn.q_proj": "cross_attn.query",
+    "encoder_attn.k_proj": "cross_attn.key",
+    "encoder_attn.v_proj": "cross_attn.value",
+    "encoder_attn.out_proj": "cross_attn.out",
+    "encoder_attn_layer_norm": "cross_attn_ln",
+    "fc1": "mlp.0",
+    "fc2": "mlp.2",
+    "final_layer_norm": "mlp_ln",
+}
+
+# Tensors whisper.cpp expects in f32 even in an f16 model, besides all 1D tensors.
+F32_TENSORS = {
+    "encoder.conv1.bias",
+    "encoder.conv2.bias",
+    "encoder.positional_embedding",
+    "decoder.positional_embedding",
+}
+
+# Vocabulary size of the multilingual whisper models; English-only models have fewer.
+MULTILINGUAL_VOCAB_SIZE = 51865
+
+
+def ggml_tensor_name(name: str) -> str:
+    """
+    Maps a transformers whisper parameter name to its whisper.cpp tensor name
+    (e.g. "model.decoder.layers.3.encoder_attn.k_proj.weight" to
+    "decoder.blocks.3.cross_attn.key.weight").
+
+    Args:
+        name (str): The transformers parameter name.
+
+    Returns:
+        str: The whisper.cpp tensor name.
+    """
+    name = name.removeprefix("model.")
+    parts = name.split(".")
+
+    if len(parts) > 3 and parts[1] == "layers":
+        module = LAYER_NAMES[".".join(parts[3:-1])]
+        return ".".join([parts[0], "blocks", parts[2], module, parts[-1]])
+
+    return TENSOR_NAMES.get(name, name)
+
+
+def _write_vocab(handle, tokenizer: WhisperTokenizer) -> None:
+    # whisper.cpp stores the byte-level BPE tokens as raw bytes, in id order; the special
+    # tokens beyond the vocabulary are generated by whisper.cpp from n_vocab.
+    tokens = sorted(tokenizer.encoder.items(), key=lambda item: item[1])
+
+    handle.write(struct.pack("<i", len(tokens)))
+    for token, _ in tokens:
+        data = bytes(tokenizer.byte_decoder[char] for char in token)
+        handle.write(struct.pack("<i", len(data)))
+        handle.write(data)
+
+
+def convert_checkpoint(
+    checkpoint: str, output_path: Path, use_f16: bool = True
+) -> Path:
+    """
+    Converts a Hugging Face transformers whisper checkpoint (safetensors or PyTorch
+    weights, such as a distilled or language-specialized fine-tune) to a whisper.cpp ggml
+    model, following whisper.cpp's own conversion script.
+
+    The mel filters are taken from the checkpoint's feature extractor and the vocabulary
+    from its tokenizer, so no openai-whisper checkout is needed. The tied output projection
+    is skipped, as whisper.cpp reuses the token embedding.
+
+    Args:
+        checkpoint (str): Hugging Face repository id or local directory of the checkpoint.
+        output_path (Path): The ggml model file to write.
+        use_f16 (bool): Whether to store the weights in f16 (biases, norms and the
+            positional embeddings stay f32). Otherwise every tensor is written as f32.
+
+    Returns:
+        Path: The written ggml model.
+    """
+    print(f"Loading {checkpoint}...")
+    model = WhisperForConditionalGeneration.from_pretrained(
+        checkpoint, torch_dtype=torch.float32
+    )
+    tokenizer = WhisperTokenizer.from_pretrained(checkpoint)
+    feature_extractor = WhisperFeatureExtractor.from_pretrained(checkpoint)
+    config = model.config
+
+    hparams = (
+        config.vocab_size,
+        config.max_source_positions,
+        config.d_model,
+        config.encoder_attention_heads,
+        config.encoder_layers,
+        config.max_target_positions,
+        config.d_model,
+        config.decoder_attention_heads,
+        config.decoder_layers,
+        config.num_mel_bins,
+        int(use_f16),
+    )
+
+    # The feature extractor stores the filters as (n_fft // 2 + 1, n_mels).
+    filters = np.ascontiguousarray(feature_extractor.mel_filters.T, dtype="<f4")
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    partial = output_path.with_name(output_path.name + ".part")
+
+    with open(partial, "wb") as handle:
+        handle.write(struct.pack("<I", GGML_MAGIC))
+        handle.write(struct.pack(f"<{len(hparams)}i", *hparams))
+        handle.write(struct.pack("<2i", *filters.shape))
+        handle.write(filters.tobytes())
+        _write_vocab(handle, tokenizer)
+
+        for name, tensor in model.state_dict().items():
+            if name == "proj_out.weight":
+                continue
+
+            name = ggml_tensor_name(name)
+            data = tensor.detach().numpy().squeeze()
+
+            if name in ("encoder.conv1.bias", "encoder.conv2.bias"):
+                data = data.reshape(data.shape[0], 1)
+
+            if use_f16 and data.ndim > 1 and name not in F32_TENSORS:
+                type, data = GGMLType.F16, data.astype("<f2")
+            else:
+                type, data = GGMLType.F32, data.astype("<f4")
+
+            # ggml stores dimensions innermost first.
+            write_tensor(
+                handle, name, type, tuple(reversed(data.shape)), data.tobytes()
+            )
+
+    os.replace(partial, output_path)
+    print(f"Wrote {output_path}")
+
+    return output_path
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Convert a Hugging Face transformers whisper checkpoint (e.g. a distilled
+        or language-specialized fine-tune) to a whisper.cpp (ggml) model, optionally
+        quantized, and prepare it for bundling with the same metadata as downloaded models.
+        Requires the 'convert' extra (torch and transformers).
+        """,
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        required=True,
+        help="Hugging Face repository id or local directory of the transformers whisper "
+        "checkpoint (e.g. 'distil-whisper/distil-small.en').",
+    )
+
+    parser.add_argument(
+        "--model-type",
+        type=str,
+        required=True,
+        help="Model id of the converted model, used for the model directory and the "
+        "filename 'ggml-<model-type>.bin' (e.g. 'distil-small.en'). With --quantize, the "
+        "quantization is appended.",
+    )
+
+    parser.add_argument(
+        "--languages",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Supported language codes written to the metadata. Defaults to the full "
+        "Whisper set for multilingual checkpoints, or ['en'] for English-only ones.",
+    )
+
+    parser.add_argument(
+        "--quantize",
+        type=str,
+        default=None,
+        choices=list(QUANTIZATION_TYPES),
+        help="Quantize the converted model. If unspecified, the model is kept in f16.",
+    )
+
+    parser.add_argument(
+        "--output_dir",
+        type=Path,
+        default=Path("output"),
+        help="Directory where the converted model will be written.",
+    )
+
+    return parser.parse_args()
+
+
+def main(
+    checkpoint: str,
+    model_type: str,
+    languages: list,
+    output_dir: Path,
+    quantize: str = None,
+) -> Path:
+    """
+    Converts a transformers whisper checkpoint into a model directory under `output_dir`,
+    laid out like the directories written by ``download_model``, so it is bundled with the
+    regular bundle module.
+
+    Args:
+        checkpoint (str): Hugging Face repository id or local directory of the checkpoint.
+        model_type (str): Model id of the converted model.
+        languages (list): Supported language codes (None => default per vocabulary).
+        output_dir (Path): Directory where the model will be written.
+        quantize (str): Quantization type to apply after conversion, or None.
+
+    Returns:
+        Path: The directory containing the converted model and its metadata.
+    """
+    # Step 1: Convert the checkpoint to an f16 ggml model
+    model_dir = Path(output_dir) / model_type
+    model_filename = build_filename(model_type)
+    model_path = convert_checkpoint(checkpoint, model_dir / model_filename)
+
+    # Step 2: Describe the model with the same metadata as the downloaded models
+    info = inspect_model(model_path)
+    if languages is None and info.hparams["n_vocab"] < MULTILINGUAL_VOCAB_SIZE:
+        languages = ["en"]
+
+    generate_metadata(
+        model_dir,
+        model_type,
+        checkpoint,
+        model_filename,
+        languages,
+        checksums={"model": sha256_file(model_path)},
+        hparams=info.hparams,
+        memory=info.memory,
+    )
+
+    if quantize is None:
+        return model_dir
+
+    # Step 3: Quantize into '<model_type>-<quantize>' and drop the f16 model
+    quantized_dir = quantize_model(model_dir, quantize)
+    rmtree(model_dir)
+
+    return quantized_dir
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(
+        checkpoint=args.checkpoint,
+        model_type=args.model_type,
+        languages=args.languages,
+        output_dir=args.output_dir,
+        quantize=args.quantize,
+    )
@@ -1,15 +1,33 @@
 import json
 import os
-import shutil
+from collections import defaultdict
+from hashlib import sha256
 from pathlib import Path
+from shutil import copy2
+from threading import Lock
+from typing import Dict, TypedDict
+from urllib.request import Request, urlopen
 
-from huggingface_hub import HfApi, hf_hub_download, list_repo_files
+from huggingface_hub import HfApi, hf_hub_url, list_repo_files
 
-from .metadata import generate_metadata
+from .inspect_ggml import inspect_model
+from .metadata import VAD_DATA_ID, generate_metadata, generate_vad_metadata
 
 DEFAULT_VAD_REPO = "ggml-org/whisper-vad"
 DEFAULT_VAD_FILENAME = "ggml-silero-v6.2.0.bin"
 
+CHUNK_SIZE = 1 << 20
+
+# Serializes concurrent downloads of the same file into a shared cache directory (the
+# batch module downloads several models in parallel, all needing the same VAD model).
+_download_locks: Dict[Path, Lock] = defaultdict(Lock)
+_download_locks_guard = Lock()
+
+
+class RemoteFile(TypedDict):
+    size: int
+    sha256: str
+
 
 def build_filename(model_type: str) -> str:
     """
@@ -34,7 +52,6 @@ def resolve_filename(repo_id: str, filename: str) -> str:
     Args:
         repo_id (str): Hugging Face repository id (e.g. "ggerganov/whisper.cpp").
         filename (str): File to look for in the repository.
-        revision (str): Repository revision (branch, tag or commit).
 
     Returns:
         str: The validated filename.
@@ -52,72 +69,206 @@ def resolve_filename(repo_id: str, filename: str) -> str:
     return filename
 
 
-def get_file_size(repo_id: str, filename: str) -> int:
+def get_remote_file(repo_id: str, filename: str) -> RemoteFile:
     """
-    Resolves the size (in bytes) of a repository file using the Hugging Face API.
+    Resolves the size and LFS SHA-256 of a repository file from the repo tree.
+
+    whisper.cpp models and VAD models are stored with Git LFS, so the tree entry carries
+    the SHA-256 of the file contents, which is used to verify the download.
 
     Args:
         repo_id (str): Hugging Face repository id.
         filename (str): File to inspect.
-        revision (str): Repository revision.
 
     Returns:
-        int: File size in bytes, or 0 if it cannot be determined.
+        RemoteFile: The remote file size (in bytes) and its SHA-256 hex digest.
+
+    Raises:
+        ValueError: If the file is missing from the repository or is not stored with LFS.
     """
-    try:
-        api = HfApi()
-        info = api.get_paths_info(repo_id=repo_id, paths=[filename])
-        if info and getattr(info[0], "size", None):
-            return int(info[0].size)
-    except Exception:
-        pass
-    return 0
+    info = HfApi().get_paths_info(repo_id=repo_id, paths=[filename])
+    if not info:
+        resolve_filename(repo_id, filename)
+        raise ValueError(f"'{filename}' not found in '{repo_id}'.")
+
+    lfs = getattr(info[0], "lfs", None)
+    if lfs is None:
+        raise ValueError(
+            f"'{repo_id}/{filename}' is not stored with LFS; no SHA-256 to verify against."
+        )
+
+    return RemoteFile(size=int(lfs.size), sha256=lfs.sha256)
+
+
+def sha256_file(path: Path) -> str:
+    """
+    Computes the hex SHA-256 of a file, streaming in 1 MiB chunks.
+
+    Args:
+        path (Path): File to hash.
+
+    Returns:
+        str: The lowercase hex digest.
+    """
+    digest = sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_up_to_date(path: Path, remote: RemoteFile) -> bool:
+    """
+    Checks whether a local file already matches the remote file. The size is compared
+    first, so a mismatching file is rejected without hashing it.
+
+    Args:
+        path (Path): Local file path.
+        remote (RemoteFile): The remote file size and SHA-256.
+
+    Returns:
+        bool: True if the local file has the remote size and SHA-256.
+    """
+    if not path.is_file() or path.stat().st_size != remote["size"]:
+        return False
+    return sha256_file(path) == remote["sha256"]
 
 
 def download_file(
     repo_id: str,
     filename: str,
     output_dir: Path,
+    remote: RemoteFile,
 ) -> Path:
     """
-    Downloads a single file from a Hugging Face repository into ``output_dir``.
+    Downloads a single file from a Hugging Face repository into ``output_dir``, verifying
+    its SHA-256 while streaming. A local file that already matches the remote size and
+    SHA-256 is reused without any network transfer.
+
+    The download is written to a ``.part`` file first and only moved into place once the
+    hash matches, so an interrupted or corrupted download never shadows a valid file.
 
     Args:
         repo_id (str): Hugging Face repository id.
         filename (str): File to download.
         output_dir (Path): Directory where the file will be written.
+        remote (RemoteFile): The expected remote size and SHA-256.
 
     Returns:
         Path: The local path of the downloaded file.
+
+    Raises:
+        ValueError: If the downloaded file does not match the expected size or SHA-256.
     """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    target = output_dir / Path(filename).name
+    with _download_locks_guard:
+        lock = _download_locks[target.resolve()]
+
+    with lock:
+        return _download_verified(repo_id, filename, target, remote)
+
+
+def _download_verified(
+    repo_id: str, filename: str, target: Path, remote: RemoteFile
+) -> Path:
+    if is_up_to_date(target, remote):
+        print(f"Reusing verified {target} ({remote['size']} bytes)")
+        return target
+
+    url = hf_hub_url(repo_id=repo_id, filename=filename)
+    partial = target.with_name(target.name + ".part")
+
     print(f"Downloading {repo_id}/{filename}")
-    return Path(
-        hf_hub_download(
-            repo_id=repo_id,
-            filename=filename,
-            local_dir=str(output_dir),
-        )
+    digest = sha256()
+    size = 0
+    try:
+        with urlopen(Request(url, method="GET"), timeout=600) as response:
+            with open(partial, "wb") as out:
+                while chunk := response.read(CHUNK_SIZE):
+                    out.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+
+        actual = digest.hexdigest()
+        if size != remote["size"] or actual != remote["sha256"]:
+            raise ValueError(
+                f"Verification failed for {repo_id}/{filename}: expected "
+                f"{remote['size']} bytes with sha256 {remote['sha256']}, "
+                f"got {size} bytes with sha256 {actual}."
+            )
+    except BaseException:
+        # Failed, timed out or interrupted downloads leave no partial file behind
+        partial.unlink(missing_ok=True)
+        raise
+
+    os.replace(partial, target)
+    return target
+
+
+def fetch_file(
+    repo_id: str,
+    filename: str,
+    output_dir: Path,
+    remote: RemoteFile,
+    cache_dir: Path = None,
+) -> Path:
+    """
+    Places a verified copy of a repository file in ``output_dir``. Without a cache the
+    file is downloaded straight into ``output_dir``; with a cache it is downloaded once
+    into ``cache_dir`` (mirroring the repository id) and hard-linked into ``output_dir``,
+    falling back to a copy across filesystems.
+
+    Args:
+        repo_id (str): Hugging Face repository id.
+        filename (str): File to fetch.
+        output_dir (Path): Directory where the file will be placed.
+        remote (RemoteFile): The expected remote size and SHA-256.
+        cache_dir (Path): Shared download cache directory, or None.
+
+    Returns:
+        Path: The local path of the file in ``output_dir``.
+    """
+    if cache_dir is None:
+        return download_file(repo_id, filename, output_dir, remote)
+
+    cached = download_file(
+        repo_id, filename, Path(cache_dir) / repo_id.replace("/", "--"), remote
     )
 
+    target = Path(output_dir) / cached.name
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.unlink(missing_ok=True)
+    try:
+        os.link(cached, target)
+    except OSError:
+        copy2(cached, target)
+
+    return target
+
 
 def download_model(
     repo_id: str,
     model_type: str,
     output_dir: Path,
     languages: list = None,
-    vad_repo: str = DEFAULT_VAD_REPO,
-    vad_filename: str = DEFAULT_VAD_FILENAME,
+    cache_dir: Path = None,
 ) -> Path:
     """
-    Downloads a whisper.cpp ggml model (and its required Silero-VAD model) from Hugging Face
-    and writes a metadata.json describing the model in the format expected by the Versta
-    speech-recognition module.
+    Downloads a whisper.cpp ggml model from Hugging Face and writes a metadata.json describing
+    the model in the format expected by the Versta speech-recognition module.
+
+    The Silero-VAD model is not included; it ships once as the shared data bundle produced
+    by ``download_vad``, which the model metadata references by id and version.
 
-    No integrity verification is performed; sizes are recorded best-effort from the
-    Hugging Face API.
+    The model is verified against the LFS SHA-256 from the repository tree. A file already
+    present in the model directory with a matching size and hash is reused, so re-running
+    the export for the same model type does not download anything. The verified hash is
+    recorded in the metadata, together with the ggml hyperparameters and the estimated
+    runtime memory of the model. With a ``cache_dir``, files are downloaded once into the
+    shared cache and linked into the model directory, so several exports share one download.
 
     Args:
         repo_id (str): Hugging Face repository id holding the whisper model.
@@ -125,11 +276,11 @@ def download_model(
         output_dir (Path): Directory where the model and metadata will be written.
         languages (list): Supported language codes. Defaults to the full Whisper set,
             or ``["en"]`` for English-only (".en") model variants.
-        vad_repo (str): Hugging Face repository id holding the VAD model.
-        vad_filename (str): VAD model filename.
+        cache_dir (Path): Shared download cache directory, or None to download directly
+            into the model directory.
 
     Returns:
-        Path: The output directory containing the downloaded models and metadata.
+        Path: The output directory containing the downloaded model and metadata.
     """
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -138,29 +289,64 @@ def download_model(
     model_dir.mkdir(parents=True, exist_ok=True)
 
     model_filename = build_filename(model_type)
-    resolve_filename(repo_id, model_filename)
-    resolve_filename(vad_repo, vad_filename)
-
-    model_path = download_file(repo_id, model_filename, model_dir)
-    vad_path = download_file(vad_repo, vad_filename, model_dir)
+    model_remote = get_remote_file(repo_id, model_filename)
 
-    model_size = get_file_size(repo_id, model_filename) or os.path.getsize(model_path)
-    vad_size = get_file_size(vad_repo, vad_filename) or os.path.getsize(vad_path)
+    model_path = fetch_file(repo_id, model_filename, model_dir, model_remote, cache_dir)
+    info = inspect_model(model_path)
 
     metadata_file = generate_metadata(
-        model_dir, model_type, repo_id, model_filename, vad_filename, languages
+        model_dir,
+        model_type,
+        repo_id,
+        model_filename,
+        languages,
+        checksums={"model": model_remote["sha256"]},
+        hparams=info.hparams,
+        memory=info.memory,
     )
 
     with open(metadata_file, "r", encoding="utf-8") as handle:
         language_count = len(json.load(handle).get("languages", []))
 
-    cache_dir = model_dir / ".cache"
-    if cache_dir.exists() and cache_dir.is_dir():
-        shutil.rmtree(cache_dir)
-
     print(
-        f"Prepared '{model_filename}' ({model_size} bytes) + "
-        f"'{vad_filename}' ({vad_size} bytes) with {language_count} languages."
+        f"Prepared '{model_filename}' ({model_remote['size']} bytes) "
+        f"with {language_count} languages, "
+        f"~{info.memory['total_bytes'] >> 20} MiB at runtime."
     )
 
     return model_dir
+
+
+def download_vad(
+    output_dir: Path,
+    vad_repo: str = DEFAULT_VAD_REPO,
+    vad_filename: str = DEFAULT_VAD_FILENAME,
+    cache_dir: Path = None,
+) -> Path:
+    """
+    Downloads the Silero-VAD model required by the speech-recognition module and prepares
+    it as the shared VAD data bundle, with a metadata.json in the format of the Versta data
+    bundles. Every whisper model references this bundle instead of embedding its own copy.
+
+    The file is verified and reused exactly like the whisper model (see ``download_model``).
+
+    Args:
+        output_dir (Path): Directory where the data bundle folder will be written.
+        vad_repo (str): Hugging Face repository id holding the VAD model.
+        vad_filename (str): VAD model filename.
+        cache_dir (Path): Shared download cache directory, or None.
+
+    Returns:
+        Path: The directory containing the VAD model and its metadata.
+    """
+    data_dir = Path(output_dir) / VAD_DATA_ID
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    vad_remote = get_remote_file(vad_repo, vad_filename)
+    fetch_file(vad_repo, vad_filename, data_dir, vad_remote, cache_dir)
+
+    generate_vad_metadata(data_dir, vad_repo, vad_filename, vad_remote["sha256"])
+
+    print(f"Prepared '{vad_filename}' ({vad_remote['size']} bytes) as {VAD_DATA_ID}.")
+
+    return data_dir
@@ -0,0 +1,254 @@
+import struct
+
+from enum import IntEnum
+from pathlib import Path
+from typing import BinaryIO, Dict, List, NamedTuple, Tuple
+
+# Magic number at the start of every legacy whisper.cpp ggml file ("ggml").
+GGML_MAGIC = 0x67676D6C
+
+# Quantized files store `GGML_QNT_VERSION * GGML_QNT_VERSION_FACTOR + ftype` as ftype.
+GGML_QNT_VERSION = 2
+GGML_QNT_VERSION_FACTOR = 1000
+
+# Whisper hyperparameters, in file order (int32 each) right after the magic.
+HPARAM_NAMES = (
+    "n_vocab",
+    "n_audio_ctx",
+    "n_audio_state",
+    "n_audio_head",
+    "n_audio_layer",
+    "n_text_ctx",
+    "n_text_state",
+    "n_text_head",
+    "n_text_layer",
+    "n_mels",
+    "ftype",
+)
+
+# Byte offset of the ftype hyperparameter (the last one), patched when re-quantizing.
+FTYPE_OFFSET = 4 + 4 * (len(HPARAM_NAMES) - 1)
+
+
+class GGMLType(IntEnum):
+    F32 = 0
+    F16 = 1
+    Q4_0 = 2
+    Q4_1 = 3
+    Q5_0 = 6
+    Q5_1 = 7
+    Q8_0 = 8
+    Q8_1 = 9
+    Q2_K = 10
+    Q3_K = 11
+    Q4_K = 12
+    Q5_K = 13
+    Q6_K = 14
+    Q8_K = 15
+
+
+# (elements per block, bytes per block) for every tensor type found in whisper.cpp files.
+BLOCK_SIZES: Dict[GGMLType, Tuple[int, int]] = {
+    GGMLType.F32: (1, 4),
+    GGMLType.F16: (1, 2),
+    GGMLType.Q4_0: (32, 18),
+    GGMLType.Q4_1: (32, 20),
+    GGMLType.Q5_0: (32, 22),
+    GGMLType.Q5_1: (32, 24),
+    GGMLType.Q8_0: (32, 34),
+    GGMLType.Q8_1: (32, 36),
+    GGMLType.Q2_K: (256, 84),
+    GGMLType.Q3_K: (256, 110),
+    GGMLType.Q4_K: (256, 144),
+    GGMLType.Q5_K: (256, 176),
+    GGMLType.Q6_K: (256, 210),
+    GGMLType.Q8_K: (256, 292),
+}
+
+
+class GGMLTensor(NamedTuple):
+    """A tensor table entry.
+
+    shape: ggml ``ne`` order (innermost dimension first); offset: absolute file offset of
+    the tensor data; nbytes: size of the tensor data.
+    """
+
+    name: str
+    type: GGMLType
+    shape: Tuple[int, ...]
+    offset: int
+    nbytes: int
+
+
+class GGMLModel(NamedTuple):
+    """A parsed whisper.cpp ggml file.
+
+    header_size: byte length of everything before the tensor table (magic, hparams, mel
+    filters and vocabulary), copied verbatim when the file is rewritten.
+    """
+
+    hparams: Dict[str, int]
+    n_mel: int
+    n_fft: int
+    vocab_size: int
+    header_size: int
+    tensors: List[GGMLTensor]
+
+
+def tensor_nbytes(type: GGMLType, shape: Tuple[int, ...]) -> int:
+    """
+    Computes the data size of a tensor of the given type and shape.
+
+    Args:
+        type (GGMLType): The tensor type.
+        shape (Tuple[int, ...]): The tensor shape in ggml ``ne`` order.
+
+    Returns:
+        int: The tensor data size in bytes.
+
+    Raises:
+        ValueError: If the innermost dimension is not a multiple of the block size.
+    """
+    block_elements, block_bytes = BLOCK_SIZES[type]
+    if shape[0] % block_elements:
+        raise ValueError(
+            f"Row length {shape[0]} is not a multiple of the {type.name} block size "
+            f"{block_elements}."
+        )
+
+    elements = 1
+    for dim in shape:
+        elements *= dim
+
+    return elements // block_elements * block_bytes
+
+
+def _read(handle: BinaryIO, fmt: str) -> tuple:
+    size = struct.calcsize(fmt)
+    data = handle.read(size)
+    if len(data) != size:
+        raise ValueError("Unexpected end of ggml file.")
+    return struct.unpack(fmt, data)
+
+
+def read_ggml(path: Path) -> GGMLModel:
+    """
+    Parses the header and tensor table of a whisper.cpp ggml model file. Tensor data is not
+    loaded; each tensor records its file offset so it can be read on demand.
+
+    Layout: magic, 11 int32 hparams, mel filters (n_mel, n_fft, float32 data), vocabulary
+    (count, then length-prefixed tokens), then tensors until EOF, each as n_dims, name
+    length and type (int32), ``ne`` (n_dims int32), the name and the raw data.
+
+    Args:
+        path (Path): The ggml model file.
+
+    Returns:
+        GGMLModel: The parsed hyperparameters and tensor table.
+
+    Raises:
+        ValueError: If the file is not a whisper.cpp ggml file or is truncated.
+    """
+    file_size = Path(path).stat().st_size
+
+    with open(path, "rb") as handle:
+        (magic,) = _read(handle, "<I")
+        if magic != GGML_MAGIC:
+            raise ValueError(f"{path} is not a ggml file (magic 0x{magic:08x}).")
+
+        hparams = dict(zip(HPARAM_NAMES, _read(handle, f"<{len(HPARAM_NAMES)}i")))
+
+        n_mel, n_fft = _read(handle, "<2i")
+        handle.seek(n_mel * n_fft * 4, 1)
+
+        (vocab_size,) = _read(handle, "<i")
+        for _ in range(vocab_size):
+            (length,) = _read(handle, "<I")
+            handle.seek(length, 1)
+
+        header_size = handle.tell()
+
+        tensors: List[GGMLTensor] = []
+        while handle.tell() < file_size:
+            n_dims, name_length, ttype = _read(handle, "<3i")
+            shape = _read(handle, f"<{n_dims}i")
+            name = handle.read(name_length).decode("utf-8")
+
+            tensor_type = GGMLType(ttype)
+            nbytes = tensor_nbytes(tensor_type, shape)
+            offset = handle.tell()
+
+            if offset + nbytes > file_size:
+                raise ValueError(f"Tensor '{name}' is truncated in {path}.")
+
+            tensors.append(GGMLTensor(name, tensor_type, shape, offset, nbytes))
+            handle.seek(nbytes, 1)
+
+    return GGMLModel(hparams, n_mel, n_fft, vocab_size, header_size, tensors)
+
+
+def read_tensor_data(handle: BinaryIO, tensor: GGMLTensor) -> bytes:
+    """
+    Reads the raw data of a tensor from an open ggml file.
+
+    Args:
+        handle (BinaryIO): The ggml file, opened in binary mode.
+        tensor (GGMLTensor): The tensor table entry.
+
+    Returns:
+        bytes: The raw tensor data.
+    """
+    handle.seek(tensor.offset)
+    return handle.read(tensor.nbytes)
+
+
+def write_header(
+    source: BinaryIO, target: BinaryIO, model: GGMLModel, ftype: int
+) -> None:
+    """
+    Copies the header (magic, hparams, mel filters and vocabulary) of a ggml file verbatim,
+    replacing only the file type.
+
+    Args:
+        source (BinaryIO): The source ggml file, opened in binary mode.
+        target (BinaryIO): The target ggml file, opened for binary writing.
+        model (GGMLModel): The parsed source model.
+        ftype (int): The file type stored in the target header.
+    """
+    source.seek(0)
+    header = bytearray(source.read(model.header_size))
+    struct.pack_into("<i", header, FTYPE_OFFSET, ftype)
+    target.write(header)
+
+
+def write_tensor(
+    target: BinaryIO,
+    name: str,
+    type: GGMLType,
+    shape: Tuple[int, ...],
+    data: bytes,
+) -> None:
+    """
+    Writes a single tensor table entry followed by its data.
+
+    Args:
+        target (BinaryIO): The target ggml file, opened for binary writing.
+        name (str): The tensor name.
+        type (GGMLType): The tensor type.
+        shape (Tuple[int, ...]): The tensor shape in ggml ``ne`` order.
+        data (bytes): The raw tensor data.
+
+    Raises:
+        ValueError: If the data size does not match the type and shape.
+    """
+    expected = tensor_nbytes(type, shape)
+    if len(data) != expected:
+        raise ValueError(
+            f"Tensor '{name}' has {len(data)} bytes of data, expected {expected}."
+        )
+
+    encoded = name.encode("utf-8")
+    target.write(struct.pack("<3i", len(shape), len(encoded), int(type)))
+    target.write(struct.pack(f"<{len(shape)}i", *shape))
+    target.write(encoded)
+    target.write(data)
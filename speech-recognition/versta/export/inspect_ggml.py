@@ -0,0 +1,194 @@
+import json
+import os
+
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Dict, NamedTuple, TypedDict
+
+from .ggml import GGMLModel, read_ggml
+
+# whisper.cpp pads the KV cache contexts to a multiple of 256 and stores them in f16.
+KV_CACHE_PADDING = 256
+KV_CACHE_TYPE_SIZE = 2
+
+
+class MemoryEstimate(TypedDict):
+    weights: Dict[str, int]
+    weight_bytes: int
+    kv_self_bytes: int
+    kv_cross_bytes: int
+    total_bytes: int
+
+
+class ModelInfo(NamedTuple):
+    hparams: Dict[str, int]
+    memory: MemoryEstimate
+
+
+def weight_bytes_by_type(model: GGMLModel) -> Dict[str, int]:
+    """
+    Sums the tensor data size of a ggml model per tensor type.
+
+    Args:
+        model (GGMLModel): The parsed ggml model.
+
+    Returns:
+        Dict[str, int]: Weight bytes keyed by lowercase tensor type (e.g. "q5_0", "f32").
+    """
+    weights: Dict[str, int] = {}
+    for tensor in model.tensors:
+        key = tensor.type.name.lower()
+        weights[key] = weights.get(key, 0) + tensor.nbytes
+
+    return dict(sorted(weights.items()))
+
+
+def kv_cache_bytes(n_state: int, n_layer: int, n_ctx: int) -> int:
+    """
+    Computes the size of a whisper.cpp KV cache (keys and values for every layer).
+
+    Args:
+        n_state (int): The attention width.
+        n_layer (int): The number of decoder layers.
+        n_ctx (int): The cache context length, before padding.
+
+    Returns:
+        int: The KV cache size in bytes.
+    """
+    n_ctx = -(-n_ctx // KV_CACHE_PADDING) * KV_CACHE_PADDING
+    return 2 * n_state * n_layer * n_ctx * KV_CACHE_TYPE_SIZE
+
+
+def estimate_memory(model: GGMLModel) -> MemoryEstimate:
+    """
+    Estimates the runtime memory of a whisper.cpp model at the default context: the
+    weights, the decoder self-attention cache over the text context and the
+    cross-attention cache over the audio context. Compute buffers are not included; they
+    depend on the backend and are small next to the weights for the larger models.
+
+    Args:
+        model (GGMLModel): The parsed ggml model.
+
+    Returns:
+        MemoryEstimate: The weight bytes per type, the KV cache sizes and their total.
+    """
+    hparams = model.hparams
+    weights = weight_bytes_by_type(model)
+    weight_bytes = sum(weights.values())
+
+    kv_self = kv_cache_bytes(
+        hparams["n_text_state"], hparams["n_text_layer"], hparams["n_text_ctx"]
+    )
+    kv_cross = kv_cache_bytes(
+        hparams["n_text_state"], hparams["n_text_layer"], hparams["n_audio_ctx"]
+    )
+
+    return MemoryEstimate(
+        weights=weights,
+        weight_bytes=weight_bytes,
+        kv_self_bytes=kv_self,
+        kv_cross_bytes=kv_cross,
+        total_bytes=weight_bytes + kv_self + kv_cross,
+    )
+
+
+def inspect_model(path: Path) -> ModelInfo:
+    """
+    Reads the hyperparameters and tensor table of a whisper.cpp ggml model and estimates
+    its runtime memory, for the model metadata.
+
+    Args:
+        path (Path): The ggml model file.
+
+    Returns:
+        ModelInfo: The hyperparameters (including the vocabulary size read from the file)
+        and the memory estimate.
+    """
+    model = read_ggml(path)
+    hparams = {**model.hparams, "vocab_size": model.vocab_size}
+
+    return ModelInfo(hparams=hparams, memory=estimate_memory(model))
+
+
+def _format_bytes(size: int) -> str:
+    return f"{size / (1 << 20):.1f} MiB"
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Inspect a whisper.cpp (ggml) model: print its hyperparameters, the
+        tensor table and the estimated runtime memory (weights + KV cache).
+        """,
+    )
+
+    parser.add_argument(
+        "--input",
+        type=Path,
+        required=True,
+        help="Path to the ggml model (e.g. 'ggml-small-q5_0.bin').",
+    )
+
+    parser.add_argument(
+        "--tensors",
+        action="store_true",
+        default=False,
+        help="Also print every tensor with its type, shape and size.",
+    )
+
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        default=False,
+        help="Print the hyperparameters and memory estimate as JSON.",
+    )
+
+    return parser.parse_args()
+
+
+def main(input: Path, tensors: bool = False, as_json: bool = False) -> ModelInfo:
+    """
+    Prints the hyperparameters, optionally the tensor table, and the memory estimate of a
+    ggml model.
+
+    Args:
+        input (Path): The ggml model file.
+        tensors (bool): Whether to print every tensor.
+        as_json (bool): Whether to print JSON instead of a readable summary.
+
+    Returns:
+        ModelInfo: The hyperparameters and memory estimate.
+    """
+    info = inspect_model(input)
+
+    if as_json:
+        print(json.dumps(info._asdict(), indent=4))
+        return info
+
+    for name, value in info.hparams.items():
+        print(f"{name:>14}: {value}")
+
+    if tensors:
+        print()
+        for tensor in read_ggml(input).tensors:
+            shape = "x".join(str(dim) for dim in tensor.shape)
+            print(
+                f"{tensor.name:<48} {tensor.type.name:<5} {shape:>12} "
+                f"{_format_bytes(tensor.nbytes):>12}"
+            )
+
+    memory = info.memory
+    print()
+    for type, size in memory["weights"].items():
+        print(f"{type:>14}: {_format_bytes(size)}")
+    print(f"{'weights':>14}: {_format_bytes(memory['weight_bytes'])}")
+    print(f"{'kv self':>14}: {_format_bytes(memory['kv_self_bytes'])}")
+    print(f"{'kv cross':>14}: {_format_bytes(memory['kv_cross_bytes'])}")
+    print(f"{'total':>14}: {_format_bytes(memory['total_bytes'])}")
+
+    return info
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(input=args.input, tensors=args.tensors, as_json=args.json)
@@ -1,21 +1,28 @@
 import json
 
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 from .definitions import languages as SUPPORTED_LANGUAGES
 from ..version import VERSION
 
 DEFAULT_VAD_FILENAME = "ggml-silero-v6.2.0.bin"
 
+# Identifier of the shared Silero-VAD data bundle. Whisper models reference it by id and
+# version rather than embedding the VAD model in every bundle.
+VAD_DATA_ID = "versta-vad-data"
+
 
 def generate_metadata(
     output_dir: Path,
     model_type: str,
     repo_id: str,
     model_filename: str,
-    vad_filename: str,
     languages: List[str] = None,
+    checksums: Dict[str, str] = None,
+    quantization: dict = None,
+    hparams: Dict[str, int] = None,
+    memory: dict = None,
 ) -> Path:
     """
     Generates the per-model metadata.json describing a whisper.cpp (ggml) model, in the
@@ -26,9 +33,16 @@ def generate_metadata(
         model_type (str): Whisper model variant (e.g. "base-q8_0", "small.en").
         repo_id (str): Hugging Face repository id holding the whisper model.
         model_filename (str): Downloaded whisper model filename.
-        vad_filename (str): Downloaded Silero-VAD model filename.
         languages (List[str]): Supported language codes. Defaults to the full Whisper
             set, or ``["en"]`` for English-only (".en") model variants.
+        checksums (Dict[str, str]): Verified SHA-256 hex digests of the inference files,
+            keyed like ``files.inference`` ("model").
+        quantization (dict): Summary of a local re-quantization (see
+            ``quantize.summarize_stats``), or None for models published upstream.
+        hparams (Dict[str, int]): Hyperparameters read from the ggml header (see
+            ``inspect_ggml.inspect_model``), or None.
+        memory (dict): Weight bytes per tensor type and the estimated runtime memory
+            (weights + KV cache), so the app can pick a model that fits the device.
 
     Returns:
         Path: The path to the written metadata file.
@@ -45,9 +59,72 @@ def generate_metadata(
         "files": {
             "inference": {
                 "model": model_filename,
-                "vad": vad_filename,
             }
         },
+        "checksums": checksums or {},
+        "data": [data_reference(VAD_DATA_ID)],
+    }
+
+    if quantization is not None:
+        metadata["quantization"] = quantization
+
+    if hparams is not None:
+        metadata["hparams"] = hparams
+
+    if memory is not None:
+        metadata["memory"] = memory
+
+    metadata_file = output_dir / "metadata.json"
+
+    with open(metadata_file, "w", encoding="utf-8") as handle:
+        json.dump(metadata, handle, indent=4)
+
+    return metadata_file
+
+
+def data_reference(id: str) -> Dict[str, str]:
+    """
+    Builds a reference to a shared data bundle required by a model.
+
+    Args:
+        id (str): Identifier of the data bundle (e.g. "versta-vad-data").
+
+    Returns:
+        Dict[str, str]: The data bundle id and the version it was published with.
+    """
+    return {"id": id, "version": VERSION}
+
+
+def generate_vad_metadata(
+    output_dir: Path,
+    repo_id: str,
+    vad_filename: str,
+    checksum: str,
+) -> Path:
+    """
+    Generates the metadata.json of the shared Silero-VAD data bundle, following the
+    layout of the other Versta data bundles (id, version, type and files).
+
+    Args:
+        output_dir (Path): Directory where the metadata file will be written.
+        repo_id (str): Hugging Face repository id holding the VAD model.
+        vad_filename (str): Downloaded Silero-VAD model filename.
+        checksum (str): Verified SHA-256 hex digest of the VAD model.
+
+    Returns:
+        Path: The path to the written metadata file.
+    """
+    metadata = {
+        "id": VAD_DATA_ID,
+        "version": VERSION,
+        "type": "vad",
+        "base_model": repo_id,
+        "files": {
+            "vad": vad_filename,
+        },
+        "checksums": {
+            "vad": checksum,
+        },
     }
 
     metadata_file = output_dir / "metadata.json"
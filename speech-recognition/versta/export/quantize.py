@@ -0,0 +1,507 @@
+import json
+import os
+import re
+
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, TypedDict
+
+import numpy as np
+
+from .download import build_filename, sha256_file
+from .ggml import (
+    GGML_QNT_VERSION,
+    GGML_QNT_VERSION_FACTOR,
+    GGMLType,
+    read_ggml,
+    read_tensor_data,
+    write_header,
+    write_tensor,
+)
+from .inspect_ggml import inspect_model
+from .metadata import generate_metadata
+
+QK = 32
+
+# Quantization name -> (tensor type, whisper.cpp file type).
+QUANTIZATION_TYPES: Dict[str, Tuple[GGMLType, int]] = {
+    "q4_0": (GGMLType.Q4_0, 2),
+    "q8_0": (GGMLType.Q8_0, 7),
+    "q5_0": (GGMLType.Q5_0, 8),
+    "q5_1": (GGMLType.Q5_1, 9),
+}
+
+# Tensors kept in their source precision, matching whisper.cpp's own quantize tool: the
+# conv biases and the positional embeddings are small but quality-sensitive. Only 2D
+# weights are quantized at all, so the conv kernels and norms are kept implicitly.
+SENSITIVE_TENSORS = [
+    r"encoder\.conv1\.bias",
+    r"encoder\.conv2\.bias",
+    r"encoder\.positional_embedding",
+    r"decoder\.positional_embedding",
+]
+
+# Rows quantized per step, bounding memory use on the large-v3 token embedding.
+CHUNK_ELEMENTS = 1 << 22
+
+
+class TensorStats(TypedDict):
+    name: str
+    type: str
+    shape: List[int]
+    quantized: bool
+    source_bytes: int
+    bytes: int
+    rmse: float
+    max_abs_error: float
+    relative_rmse: float
+
+
+def _fp16_bytes(values: np.ndarray) -> np.ndarray:
+    return values.astype(np.float16).reshape(-1, 1).view(np.uint8)
+
+
+def _pack_nibbles(low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    return (low & 0x0F) | ((high & 0x0F) << 4)
+
+
+def _pack_high_bits(quants: np.ndarray) -> np.ndarray:
+    """Packs bit 4 of each of the 32 5-bit quants of a block into a little-endian uint32."""
+    bits = ((quants >> 4) & 1).astype(np.uint32)
+    qh = (bits << np.arange(QK, dtype=np.uint32)).sum(axis=1, dtype=np.uint32)
+    return qh.astype("<u4").reshape(-1, 1).view(np.uint8)
+
+
+def _unpack_high_bits(qh: np.ndarray) -> np.ndarray:
+    words = qh.copy().view("<u4").astype(np.uint32)
+    return ((words >> np.arange(QK, dtype=np.uint32)) & 1).astype(np.uint8) << 4
+
+
+def _signed_absmax(blocks: np.ndarray) -> np.ndarray:
+    """The signed value with the largest magnitude of each block (first one on ties)."""
+    index = np.abs(blocks).argmax(axis=1)
+    return np.take_along_axis(blocks, index[:, None], axis=1)[:, 0]
+
+
+def _inverse(d: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore"):
+        return np.where(d != 0, np.float32(1) / d, np.float32(0)).astype(np.float32)
+
+
+def quantize_q8_0(blocks: np.ndarray) -> np.ndarray:
+    """
+    Quantizes float32 blocks of 32 values to Q8_0 (fp16 scale + 32 int8), following the
+    ggml reference implementation.
+
+    Args:
+        blocks (np.ndarray): float32 array of shape (n_blocks, 32).
+
+    Returns:
+        np.ndarray: uint8 array of shape (n_blocks, 34).
+    """
+    d = np.abs(blocks).max(axis=1) / np.float32(127)
+    scaled = blocks * _inverse(d)[:, None]
+    qs = (np.sign(scaled) * np.floor(np.abs(scaled) + np.float32(0.5))).astype(np.int8)
+    return np.hstack([_fp16_bytes(d), qs.view(np.uint8)])
+
+
+def dequantize_q8_0(data: np.ndarray) -> np.ndarray:
+    d = data[:, :2].copy().view(np.float16).astype(np.float32)
+    return data[:, 2:].view(np.int8).astype(np.float32) * d
+
+
+def quantize_q4_0(blocks: np.ndarray) -> np.ndarray:
+    """
+    Quantizes float32 blocks of 32 values to Q4_0 (fp16 scale + 16 bytes of nibbles),
+    following the ggml reference implementation.
+
+    Args:
+        blocks (np.ndarray): float32 array of shape (n_blocks, 32).
+
+    Returns:
+        np.ndarray: uint8 array of shape (n_blocks, 18).
+    """
+    d = _signed_absmax(blocks) / np.float32(-8)
+    scaled = blocks * _inverse(d)[:, None]
+    quants = np.minimum(15, np.trunc(scaled + np.float32(8.5))).astype(np.uint8)
+    qs = _pack_nibbles(quants[:, : QK // 2], quants[:, QK // 2 :])
+    return np.hstack([_fp16_bytes(d), qs])
+
+
+def dequantize_q4_0(data: np.ndarray) -> np.ndarray:
+    d = data[:, :2].copy().view(np.float16).astype(np.float32)
+    qs = data[:, 2:]
+    quants = np.hstack([qs & 0x0F, qs >> 4]).astype(np.float32) - 8
+    return quants * d
+
+
+def quantize_q5_0(blocks: np.ndarray) -> np.ndarray:
+    """
+    Quantizes float32 blocks of 32 values to Q5_0 (fp16 scale + 32 high bits + 16 bytes of
+    nibbles), following the ggml reference implementation.
+
+    Args:
+        blocks (np.ndarray): float32 array of shape (n_blocks, 32).
+
+    Returns:
+        np.ndarray: uint8 array of shape (n_blocks, 22).
+    """
+    d = _signed_absmax(blocks) / np.float32(-16)
+    scaled = blocks * _inverse(d)[:, None]
+    quants = np.minimum(31, np.trunc(scaled + np.float32(16.5))).astype(np.uint8)
+    qs = _pack_nibbles(quants[:, : QK // 2], quants[:, QK // 2 :])
+    return np.hstack([_fp16_bytes(d), _pack_high_bits(quants), qs])
+
+
+def dequantize_q5_0(data: np.ndarray) -> np.ndarray:
+    d = data[:, :2].copy().view(np.float16).astype(np.float32)
+    high = _unpack_high_bits(data[:, 2:6])
+    qs = data[:, 6:]
+    quants = np.hstack([qs & 0x0F, qs >> 4]) | high
+    return (quants.astype(np.float32) - 16) * d
+
+
+def quantize_q5_1(blocks: np.ndarray) -> np.ndarray:
+    """
+    Quantizes float32 blocks of 32 values to Q5_1 (fp16 scale and minimum + 32 high bits +
+    16 bytes of nibbles), following the ggml reference implementation.
+
+    Args:
+        blocks (np.ndarray): float32 array of shape (n_blocks, 32).
+
+    Returns:
+        np.ndarray: uint8 array of shape (n_blocks, 24).
+    """
+    low = blocks.min(axis=1)
+    d = (blocks.max(axis=1) - low) / np.float32(31)
+    scaled = (blocks - low[:, None]) * _inverse(d)[:, None]
+    quants = np.trunc(scaled + np.float32(0.5)).astype(np.uint8)
+    qs = _pack_nibbles(quants[:, : QK // 2], quants[:, QK // 2 :])
+    return np.hstack([_fp16_bytes(d), _fp16_bytes(low), _pack_high_bits(quants), qs])
+
+
+def dequantize_q5_1(data: np.ndarray) -> np.ndarray:
+    d = data[:, :2].copy().view(np.float16).astype(np.float32)
+    low = data[:, 2:4].copy().view(np.float16).astype(np.float32)
+    high = _unpack_high_bits(data[:, 4:8])
+    qs = data[:, 8:]
+    quants = np.hstack([qs & 0x0F, qs >> 4]) | high
+    return quants.astype(np.float32) * d + low
+
+
+QUANTIZERS: Dict[
+    GGMLType,
+    Tuple[Callable[[np.ndarray], np.ndarray], Callable[[np.ndarray], np.ndarray]],
+] = {
+    GGMLType.Q8_0: (quantize_q8_0, dequantize_q8_0),
+    GGMLType.Q4_0: (quantize_q4_0, dequantize_q4_0),
+    GGMLType.Q5_0: (quantize_q5_0, dequantize_q5_0),
+    GGMLType.Q5_1: (quantize_q5_1, dequantize_q5_1),
+}
+
+
+def _to_float32(data: bytes, type: GGMLType) -> np.ndarray:
+    if type == GGMLType.F32:
+        return np.frombuffer(data, dtype="<f4")
+    if type == GGMLType.F16:
+        return np.frombuffer(data, dtype="<f2").astype(np.float32)
+    raise ValueError(f"Cannot re-quantize a {type.name} tensor; use an f16/f32 model.")
+
+
+def should_quantize(name: str, shape: Tuple[int, ...], keep: List[str]) -> bool:
+    """
+    Decides whether a tensor is quantized: only 2D weights whose rows split into whole
+    blocks, and whose name matches none of the ``keep`` patterns.
+
+    Args:
+        name (str): The tensor name.
+        shape (Tuple[int, ...]): The tensor shape in ggml ``ne`` order.
+        keep (List[str]): Regular expressions of tensors kept in source precision.
+
+    Returns:
+        bool: True if the tensor should be quantized.
+    """
+    if len(shape) != 2 or shape[0] % QK:
+        return False
+    return not any(re.fullmatch(pattern, name) for pattern in keep)
+
+
+def quantize_tensor(
+    values: np.ndarray, type: GGMLType
+) -> Tuple[bytes, float, float, float]:
+    """
+    Quantizes a flat float32 tensor, chunk by chunk, and measures the error of the
+    round-tripped values against the source.
+
+    Args:
+        values (np.ndarray): The float32 tensor values; the length must be a multiple of 32.
+        type (GGMLType): The target quantization type.
+
+    Returns:
+        Tuple[bytes, float, float, float]: The quantized data, the RMSE, the maximum
+        absolute error and the RMSE relative to the RMS of the source values.
+    """
+    quantize, dequantize = QUANTIZERS[type]
+    blocks = values.reshape(-1, QK)
+    step = CHUNK_ELEMENTS // QK
+
+    chunks: List[bytes] = []
+    squared_error = 0.0
+    squared_values = 0.0
+    max_abs_error = 0.0
+
+    for start in range(0, len(blocks), step):
+        chunk = blocks[start : start + step]
+        quantized = quantize(chunk)
+        error = dequantize(quantized) - chunk
+
+        chunks.append(quantized.tobytes())
+        squared_error += float(np.square(error, dtype=np.float64).sum())
+        squared_values += float(np.square(chunk, dtype=np.float64).sum())
+        max_abs_error = max(max_abs_error, float(np.abs(error).max()))
+
+    rmse = (squared_error / values.size) ** 0.5
+    rms = (squared_values / values.size) ** 0.5
+
+    return b"".join(chunks), rmse, max_abs_error, rmse / rms if rms else 0.0
+
+
+def quantize_ggml(
+    input_path: Path,
+    output_path: Path,
+    quantization: str,
+    keep: List[str] = None,
+) -> List[TensorStats]:
+    """
+    Re-quantizes an f16/f32 whisper.cpp ggml model to the given quantization type and
+    writes a valid ggml file, streaming one tensor at a time.
+
+    Only 2D weights are quantized; tensors matching ``keep`` (by default the sensitive
+    tensors whisper.cpp also keeps) stay in their source precision. The header is copied
+    verbatim apart from the file type.
+
+    Args:
+        input_path (Path): The f16/f32 ggml model.
+        output_path (Path): The quantized ggml model to write.
+        quantization (str): One of "q8_0", "q5_0", "q5_1" or "q4_0".
+        keep (List[str]): Regular expressions of tensors kept in source precision.
+            Defaults to ``SENSITIVE_TENSORS``.
+
+    Returns:
+        List[TensorStats]: Per-tensor sizes and quantization error statistics, for every
+        tensor in the model (kept tensors report zero error).
+
+    Raises:
+        ValueError: If the quantization is unsupported or the model is already quantized.
+    """
+    if quantization not in QUANTIZATION_TYPES:
+        raise ValueError(
+            f"Unsupported quantization '{quantization}'. "
+            f"Choose one of {', '.join(QUANTIZATION_TYPES)}."
+        )
+
+    tensor_type, ftype = QUANTIZATION_TYPES[quantization]
+    keep = SENSITIVE_TENSORS if keep is None else keep
+
+    model = read_ggml(input_path)
+    source_ftype = model.hparams["ftype"] % GGML_QNT_VERSION_FACTOR
+    if source_ftype not in (0, 1):
+        raise ValueError(f"{input_path} is already quantized (ftype {source_ftype}).")
+
+    print(f"Quantizing {input_path.name} to {quantization}...")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    partial = output_path.with_name(output_path.name + ".part")
+    stats: List[TensorStats] = []
+
+    with open(input_path, "rb") as source, open(partial, "wb") as target:
+        write_header(
+            source, target, model, GGML_QNT_VERSION * GGML_QNT_VERSION_FACTOR + ftype
+        )
+
+        for tensor in model.tensors:
+            data = read_tensor_data(source, tensor)
+
+            if should_quantize(tensor.name, tensor.shape, keep):
+                values = _to_float32(data, tensor.type)
+                data, rmse, max_abs_error, relative_rmse = quantize_tensor(
+                    values, tensor_type
+                )
+                output_type = tensor_type
+            else:
+                rmse, max_abs_error, relative_rmse = 0.0, 0.0, 0.0
+                output_type = tensor.type
+
+            write_tensor(target, tensor.name, output_type, tensor.shape, data)
+
+            stats.append(
+                TensorStats(
+                    name=tensor.name,
+                    type=output_type.name.lower(),
+                    shape=list(tensor.shape),
+                    quantized=output_type != tensor.type,
+                    source_bytes=tensor.nbytes,
+                    bytes=len(data),
+                    rmse=rmse,
+                    max_abs_error=max_abs_error,
+                    relative_rmse=relative_rmse,
+                )
+            )
+
+    os.replace(partial, output_path)
+
+    source_bytes = sum(entry["source_bytes"] for entry in stats)
+    output_bytes = sum(entry["bytes"] for entry in stats)
+    worst = max(stats, key=lambda entry: entry["relative_rmse"])
+    print(
+        f"Wrote {output_path} ({source_bytes} -> {output_bytes} tensor bytes); "
+        f"worst relative RMSE {worst['relative_rmse']:.4f} in '{worst['name']}'."
+    )
+
+    return stats
+
+
+def summarize_stats(quantization: str, stats: List[TensorStats]) -> dict:
+    """
+    Summarizes per-tensor quantization statistics for the model metadata.
+
+    Args:
+        quantization (str): The quantization type.
+        stats (List[TensorStats]): The per-tensor statistics from ``quantize_ggml``.
+
+    Returns:
+        dict: The quantization type, kept tensors and the mean and worst relative RMSE
+        of the quantized tensors.
+    """
+    quantized = [entry for entry in stats if entry["quantized"]]
+    kept = [entry["name"] for entry in stats if not entry["quantized"]]
+    errors = [entry["relative_rmse"] for entry in quantized]
+
+    return {
+        "type": quantization,
+        "quantized_tensors": len(quantized),
+        "kept_tensors": kept,
+        "mean_relative_rmse": sum(errors) / len(errors) if errors else 0.0,
+        "max_relative_rmse": max(errors, default=0.0),
+    }
+
+
+def write_report(stats: List[TensorStats], report_path: Path) -> Path:
+    """
+    Writes the per-tensor quantization statistics to a JSON report.
+
+    Args:
+        stats (List[TensorStats]): The per-tensor statistics from ``quantize_ggml``.
+        report_path (Path): The report file to write.
+
+    Returns:
+        Path: The written report path.
+    """
+    with open(report_path, "w", encoding="utf-8") as handle:
+        json.dump(stats, handle, indent=4)
+
+    return report_path
+
+
+def quantize_model(
+    model_dir: Path,
+    quantization: str,
+    keep: List[str] = None,
+) -> Path:
+    """
+    Re-quantizes a downloaded f16/f32 model directory (see ``download_model``) into a new
+    model directory named ``<model_type>-<quantization>``, next to the source, with its own
+    metadata.json. The quantization summary is recorded in the metadata and the per-tensor
+    report is written next to the new model directory, so it is not bundled.
+
+    Args:
+        model_dir (Path): The downloaded source model directory.
+        quantization (str): One of "q8_0", "q5_0", "q5_1" or "q4_0".
+        keep (List[str]): Regular expressions of tensors kept in source precision.
+            Defaults to ``SENSITIVE_TENSORS``.
+
+    Returns:
+        Path: The quantized model directory.
+    """
+    model_dir = Path(model_dir)
+    with open(model_dir / "metadata.json", "r", encoding="utf-8") as handle:
+        source = json.load(handle)
+
+    model_type = f"{source['id']}-{quantization}"
+    model_filename = build_filename(model_type)
+
+    output_dir = model_dir.parent / model_type
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    stats = quantize_ggml(
+        model_dir / source["files"]["inference"]["model"],
+        output_dir / model_filename,
+        quantization,
+        keep,
+    )
+
+    info = inspect_model(output_dir / model_filename)
+
+    generate_metadata(
+        output_dir,
+        model_type,
+        source["base_model"],
+        model_filename,
+        source["languages"],
+        checksums={"model": sha256_file(output_dir / model_filename)},
+        quantization=summarize_stats(quantization, stats),
+        hparams=info.hparams,
+        memory=info.memory,
+    )
+    write_report(stats, model_dir.parent / f"{model_type}.quantization.json")
+
+    return output_dir
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Re-quantize a local f16/f32 whisper.cpp (ggml) model to q8_0, q5_0, q5_1
+        or q4_0. Sensitive tensors stay in their source precision and a per-tensor error
+        report is written next to the output model.
+        """,
+    )
+
+    parser.add_argument(
+        "--input",
+        type=Path,
+        required=True,
+        help="Path to the f16/f32 ggml model (e.g. 'ggml-small.bin').",
+    )
+
+    parser.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="Path of the quantized ggml model to write.",
+    )
+
+    parser.add_argument(
+        "--quantization",
+        type=str,
+        default="q5_0",
+        choices=list(QUANTIZATION_TYPES),
+        help="Target quantization type. Defaults to 'q5_0'.",
+    )
+
+    parser.add_argument(
+        "--keep",
+        type=str,
+        nargs="*",
+        default=None,
+        help="Regular expressions of tensor names kept in source precision. Defaults to "
+        "the conv biases and positional embeddings, like whisper.cpp.",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    stats = quantize_ggml(args.input, args.output, args.quantization, args.keep)
+    print(write_report(stats, args.output.with_suffix(".json")))
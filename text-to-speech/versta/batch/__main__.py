@@ -3,56 +3,89 @@ import os
 from argparse import ArgumentParser
 from pathlib import Path
 
-from .model_file import load_model_file, save_model_file
+from .model_file import load_model_file, save_model_file, update_models_json
 from .export import export_models
+from ..export.operators import aggregate_operator_configs
+
+MODELS_JSON = Path(__file__).parent.parent.parent / "models.json"
+
+# Voices exported concurrently by default: the timings of each export share the CPU with
+# the conversions of the others, so more workers make the recorded latencies noisier.
+WORKERS = 2
+
+with open(Path(__file__).parent / ".." / "version.txt", "r") as version_file:
+    version = version_file.read().strip()
 
 
 def parse_args():
     parser = ArgumentParser(
         os.path.basename(__file__),
-        description="""Batch convert and bundle multiple language models together and generate an output definition,
-        which can be used to deploy the models in the Versta application. This will allow the app to easily download
-        the models from the cloud object storage.
+        description="""Batch convert and bundle multiple Piper and Kokoro voices and generate an
+        output definition, which can be used to deploy the voices in the Versta application.
+        Voices are exported and bundled on a process pool sharing one HuggingFace cache,
+        after which the models.json catalog is refreshed.
         """,
     )
 
     parser.add_argument(
         "--input_file",
         type=Path,
-        help="Provie the file containing the HuggingFace model names to convert. "
-        "This JSON file will be used to download the models from HuggingFace and convert them to ONNX format.",
-        required=True,
+        default=MODELS_JSON,
+        help="Provide the JSON file listing the voices to build, either as bare Piper voice "
+        "paths (e.g. 'nl/nl_NL/mls/medium') or as objects with an 'id' and optionally a "
+        "'base_model', 'model_format' and Piper 'voice' path. "
+        "Defaults to the models.json catalog, rebuilding every published voice.",
+    )
+
+    parser.add_argument(
+        "--model_ids",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Only build these ids or Piper voice paths from the input file. "
+        "Defaults to all.",
     )
 
     parser.add_argument(
         "--output_dir",
         type=Path,
-        default=Path("output"),
-        help="Provide an output directory for the converted model's and configuration file. "
-        "If unspecified, the converted ORT format model's will be in the '/output' directory.",
+        default=Path("output/batch"),
+        help="Provide an output directory for the converted voices, bundles and "
+        "configuration file. If unspecified, 'output/batch' is used.",
+    )
+
+    parser.add_argument(
+        "--cache_dir",
+        type=Path,
+        default=None,
+        help="HuggingFace cache directory shared by all workers. "
+        "Defaults to the HuggingFace default cache.",
     )
 
     parser.add_argument(
         "--link_prefix",
         type=str,
-        default="https://models.versta.app/translation/",
-        help="Provide the prefix for the links to the models. "
+        default="https://models.versta.app/text-to-speech/",
+        help="Provide the prefix for the links to the models; the version is appended. "
         "This will be used to generate the links to the models in the output definition file.",
     )
 
     parser.add_argument(
-        "--keep_intermediates",
-        action="store_true",
-        default=False,
-        help="Whether to remove intermediate files created during the conversion process."
-        "This will default to False if not specified.",
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help="Number of voices exported concurrently. The latency timings that choose "
+        "the ORT optimization style and are recorded in metadata.json are serialized "
+        "across workers, but still run alongside the other workers' conversions: more "
+        "workers build faster but time less reliably. Use 1 for publishable latency "
+        f"figures. Defaults to {WORKERS}.",
     )
 
     parser.add_argument(
-        "--clear_cache",
+        "--keep_intermediates",
         action="store_true",
         default=False,
-        help="Whether to remove the downloaded files from HuggingFace cache."
+        help="Whether to remove intermediate files created during the conversion process."
         "This will default to False if not specified.",
     )
 
@@ -64,17 +97,34 @@ def main(
     input_file: Path,
     output_dir: Path,
     link_prefix: str,
+    model_ids: list = None,
+    cache_dir: Path = None,
+    workers: int = None,
     keep_intermediates: bool = False,
-    clear_cache: bool = False,
 ):
     # Step 1: Load the model file
-    models = load_model_file(input_file)
+    models = load_model_file(input_file, model_ids)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Step 2: Point every worker at the same HuggingFace cache; spawned workers inherit
+    # the environment and resolve the cache when they import huggingface_hub
+    if cache_dir is not None:
+        os.environ["HF_HUB_CACHE"] = str(cache_dir.resolve())
+
+    # Step 3: Export and bundle all voices on a process pool
+    bundles = export_models(models, output_dir, workers or WORKERS, keep_intermediates)
 
-    # Step 2: Export all models to ONNX format and bundles them together
-    bundles = export_models(models, output_dir, keep_intermediates, clear_cache)
+    # Step 4: Save the model file and sync it back into the catalog (backed up to .bak),
+    # when the batch was built from the catalog rather than a scratch model list
+    generated = save_model_file(bundles, link_prefix, output_dir, version)
+    if input_file.resolve() == MODELS_JSON.resolve():
+        update_models_json(MODELS_JSON, generated)
+    else:
+        print(f"Built from {input_file}; {MODELS_JSON.name} is left untouched.")
 
-    # Step 3: Save the model file
-    save_model_file(bundles, link_prefix, output_dir)
+    # Step 5: Aggregate the required operators of every voice for the reduced runtime
+    aggregate_operator_configs(output_dir, version)
 
 
 if __name__ == "__main__":
@@ -83,6 +133,8 @@ if __name__ == "__main__":
         input_file=args.input_file,
         output_dir=args.output_dir,
         link_prefix=args.link_prefix,
+        model_ids=args.model_ids,
+        cache_dir=args.cache_dir,
+        workers=args.workers,
         keep_intermediates=args.keep_intermediates,
-        clear_cache=args.clear_cache,
     )
@@ -1,106 +1,134 @@
+import json
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 from pathlib import Path
 from typing import List
-from json import load
 
-from ..export import __main__ as export
 from ..bundle import __main__ as bundle
+from ..export import __main__ as export
+
+from .typing import ExportedBundle, ModelFile
+
+
+def voice_id(model: ModelFile) -> str:
+    """
+    Builds the identifier of a voice: the catalog id when given, otherwise
+    "piper-<language family>-<model name>" for Piper voices (e.g.
+    "piper-nl-nl_NL-mls-medium"). Every voice is exported into a folder named after its
+    identifier.
+
+    Args:
+        model (ModelFile): The voice to build.
+
+    Returns:
+        str: The voice identifier.
+    """
+    if model["id"] is not None:
+        return model["id"]
+
+    # Imported here: huggingface_hub is only needed to look up Piper voice configs
+    from ..export.convert_piper_to_onnx import get_language_from_config, get_model_name
 
-from .typing import ModelFile, ExportedBundle, ExportedModel
+    language = get_language_from_config(model["base_model"], model["voice"])
+    return f"piper-{language['family']}-{get_model_name(model['voice'])}"
 
 
 def export_models(
-    model: List[List[ModelFile]],
+    models: List[ModelFile],
     output_dir: Path,
-    keep_intermediates: bool,
-    clear_cache: bool,
-) -> List[List[ExportedBundle]]:
+    workers: int,
+    keep_intermediates: bool = False,
+) -> List[ExportedBundle]:
     """
-    Export the models to a specified directory.
+    Export and bundle every voice on a process pool. Each worker converts, quantizes and
+    bundles one voice end to end; all workers download through the same HuggingFace
+    cache, so shared files are fetched once. The single-thread timings that pick the ORT
+    optimization style and are recorded in the metadata are serialized across workers;
+    they still share the CPU with the conversions of the other workers, so the worker
+    count trades batch throughput for timing accuracy.
 
     Args:
-        model (List[List[ModelFile]]): A list of model pairs to be exported.
-        output_dir (Path): The directory where the models will be exported.
+        models (List[ModelFile]): The voices to build.
+        output_dir (Path): The directory where the voices will be exported and bundled.
+        workers (int): Number of voices built concurrently.
         keep_intermediates (bool): Whether to keep intermediate files.
-        clear_cache (bool): Whether to clear the cache after exporting.
 
     Returns:
-        List[List[ExportedBundle]]: A list of dictionaries containing the export output details.
+        List[ExportedBundle]: The bundle output details, in the order of ``models``.
     """
-    exported_bundles: List[List[ExportedBundle]] = []
-
-    for pair in model:
-        exported_pair: List[ExportedModel] = []
-
-        for entry in pair:
-            exported = export.main(
-                model=entry["base_model"],
-                output_dir=output_dir,
-                score=entry["score"],
-                keep_intermediates=keep_intermediates,
-                clear_cache=clear_cache,
-            )
-
-            with open(exported["metadata"], "r") as f:
-                metadata = load(f)
-
-            exported_pair.append(
-                ExportedModel(
-                    path=exported["path"],
-                    base_model=entry["base_model"],
-                    source_language=metadata["source_language"],
-                    target_language=metadata["target_language"],
-                    architectures=metadata["architectures"],
-                    score=entry["score"],
-                    version=metadata["version"],
-                )
-            )
-
-        exported_bundles.append(
-            _export_bundle(exported_pair, output_dir, keep_intermediates)
-        )
-
-    return exported_bundles
-
-
-def _export_bundle(
-    model: List[ExportedModel], output_dir: Path, keep_intermediates: bool
-) -> List[ExportedBundle]:
+    # Imported here: onnxruntime is only needed once voices are exported
+    from ..export.convert_ort import set_timing_lock
+
+    context = get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=set_timing_lock,
+        initargs=(context.Lock(),),
+    ) as executor:
+        futures = [
+            executor.submit(_export_voice, model, output_dir, keep_intermediates)
+            for model in models
+        ]
+
+        return [future.result() for future in futures]
+
+
+def _export_voice(
+    model: ModelFile, output_dir: Path, keep_intermediates: bool
+) -> ExportedBundle:
     """
-    Export the models to a specified directory.
+    Export a single voice and bundle it into its own tarball. The voice is exported into
+    "<output_dir>/<voice id>" as is: the export's Piper folder renaming would send voices
+    of the same language family, built concurrently, into one folder.
+
     Args:
-        model (List[ExportedModel]): A list of exported models to be bundled.
-        output_dir (Path): The directory where the models will be bundled.
+        model (ModelFile): The voice to build.
+        output_dir (Path): The directory where the voice will be exported and bundled.
         keep_intermediates (bool): Whether to keep intermediate files.
 
     Returns:
-        List[ExportedBundle]: A List of dictionaries containing the bundle output details.
+        ExportedBundle: The bundle output details.
     """
-    exported_bundles: List[ExportedBundle] = list()
+    model_id = voice_id(model)
 
-    input_dirs: List[Path] = list()
-    for entry in model:
-        input_dirs.append(entry["path"])
+    model_dir = export.main(
+        model=model["base_model"],
+        output_dir=output_dir / model_id,
+        keep_intermediates=keep_intermediates,
+        model_format=model["model_format"],
+        voice=model["voice"],
+        rename_output=False,
+    )
+
+    with open(model_dir / "metadata.json", "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    language = None
+    if model["model_format"] == "piper":
+        from ..export.convert_piper_to_onnx import get_language_from_config
+
+        language = get_language_from_config(model["base_model"], model["voice"])
+        language = language.get("family")
 
     exported = bundle.main(
-        input_dirs=input_dirs,
-        output_dir=output_dir,
-        bidirectional=len(input_dirs) > 1,
+        unique_id=model_id,
+        input_dir=model_dir,
+        output_dir=output_dir / "bundles" / model_id,
         keep_intermediates=keep_intermediates,
+        keep_input=keep_intermediates,
     )
 
-    for entry in model:
-        exported_bundles.append(
-            ExportedBundle(
-                path=exported["bundle"],
-                checksum=exported["checksum"],
-                base_model=entry["base_model"],
-                bidirectional=len(input_dirs) > 1,
-                architectures=entry["architectures"],
-                source_language=entry["source_language"],
-                target_language=entry["target_language"],
-                score=entry["score"],
-                version=entry["version"],
-            )
-        )
-
-    return exported_bundles
+    return ExportedBundle(
+        path=exported["bundle"],
+        checksum=exported["checksum"],
+        id=model_id,
+        base_model=model["base_model"],
+        model_format=model["model_format"],
+        voice=model["voice"],
+        language=language,
+        architectures=metadata["architectures"],
+        data_packs=metadata.get("data_packs", []),
+        version=metadata["version"],
+    )
@@ -1,85 +1,188 @@
 import json
+import shutil
+from json import load
 from os.path import getsize
 from pathlib import Path
-from typing import List
-from json import load
+from typing import Dict, List
 
 from .typing import ExportedBundle, ModelFile
 
+DEFAULT_REPOS = {"kokoro": "hexgrad/Kokoro-82M", "piper": "rhasspy/piper-voices"}
+
+# Fields copied verbatim from the generated models.json into the catalog.
+COPIED_FIELDS = ("size", "version", "data_packs", "bundle", "checksum")
+
 
-def load_model_file(file_path: Path) -> List[List[ModelFile]]:
+def load_model_file(file_path: Path, model_ids: List[str] = None) -> List[ModelFile]:
     """
-    Load a model file from the specified path and return its models as a dictionary.
+    Load the list of voices to build from the specified path.
+
+    The file is a JSON list whose entries are either a bare Piper voice path (e.g.
+    "nl/nl_NL/mls/medium", downloaded from 'rhasspy/piper-voices') or an object with an
+    ``id``, and optionally a ``base_model``, ``model_format`` and Piper ``voice`` path.
+    Objects with a ``voice`` are Piper voices, others Kokoro. The models.json catalog
+    itself has this shape, so it can be passed directly to rebuild every published voice.
 
     Args:
-        file_path (str): Path to the model file.
+        file_path (Path): Path to the model file.
+        model_ids (List[str]): Only keep these ids (or Piper voice paths). Defaults to all.
 
     Returns:
-        List[List[ModelFile]]: A dictionary containing the model name and its score.
+        List[ModelFile]: The voices to build, in file order.
     """
     if not file_path.exists():
         raise FileNotFoundError(f"Model file not found: {file_path}")
 
-    model_files: List[List[ModelFile]] = list()
+    model_files: List[ModelFile] = list()
 
     with open(file_path, "r") as f:
         models = load(f)
 
-        for pairs in models:
-            model_pairs: List[ModelFile] = list()
-
-            for model in pairs:
-                model_pairs.append(
-                    ModelFile(
-                        base_model=model["base_model"], score=float(model["score"])
-                    )
-                )
-
-            model_files.append(model_pairs)
+    for model in models:
+        if isinstance(model, str):
+            model = {"voice": model}
+
+        if model_ids is not None and not {model.get("id"), model.get("voice")} & set(
+            model_ids
+        ):
+            continue
+
+        model_format = model.get("model_format") or (
+            "piper" if model.get("voice") else "kokoro"
+        )
+
+        model_files.append(
+            ModelFile(
+                id=model.get("id"),
+                base_model=model.get("base_model") or DEFAULT_REPOS[model_format],
+                model_format=model_format,
+                voice=model.get("voice"),
+            )
+        )
 
     return model_files
 
 
 def save_model_file(
-    bundles: List[List[ExportedBundle]], link_prefix: str, output_dir: Path
+    bundles: List[ExportedBundle],
+    link_prefix: str,
+    output_dir: Path,
+    version: str,
 ) -> Path:
     """
-    Save the model file to the specified path.
+    Save the generated model file to the specified path.
 
     Args:
-        bundles (List[List[ExportedBundle]]): List of model bundles to be saved.
-        link_prefix (str): Prefix for the model file links.
+        bundles (List[ExportedBundle]): List of voice bundles to be saved.
+        link_prefix (str): Prefix for the model file links; the version is appended.
         output_dir (Path): Directory where the model file will be saved.
+        version (str): The deployment version (from version.txt).
 
     Returns:
-        None
+        Path: The path to the written model file.
     """
-
     file_path = output_dir / "models.json"
-
-    model_output: List[List[ModelFile]] = list()
-    for pairs in bundles:
-        model_pairs: List[ModelFile] = list()
-
-        for bundle in pairs:
-            model_pairs.append(
-                ModelFile(
-                    base_model=bundle["base_model"],
-                    source_language=bundle["source_language"],
-                    target_language=bundle["target_language"],
-                    bidirectional=bundle["bidirectional"],
-                    architectures=bundle["architectures"],
-                    score=bundle["score"],
-                    version=bundle["version"],
-                    size=getsize(bundle["path"]),
-                    bundle=link_prefix + bundle["path"].name,
-                    checksum=link_prefix + bundle["checksum"].name,
-                )
-            )
-
-        model_output.append(model_pairs)
+    link_prefix = f"{link_prefix.rstrip('/')}/{version}/"
+
+    model_output: List[dict] = list()
+    for bundle in bundles:
+        entry = {
+            "id": bundle["id"],
+            "base_model": bundle["base_model"],
+            "model_format": bundle["model_format"],
+        }
+        if bundle["voice"] is not None:
+            entry["voice"] = bundle["voice"]
+        if bundle["language"] is not None:
+            entry["language"] = bundle["language"]
+
+        entry.update(
+            {
+                "architectures": bundle["architectures"],
+                "data_packs": bundle["data_packs"],
+                "size": getsize(bundle["path"]),
+                "version": bundle["version"],
+                "bundle": link_prefix + bundle["path"].name,
+                "checksum": link_prefix + bundle["checksum"].name,
+            }
+        )
+        model_output.append(entry)
 
     with open(file_path, "w") as f:
         json.dump(model_output, f, indent=4)
 
     return file_path
+
+
+def update_models_json(existing_path: Path, generated_path: Path) -> Path:
+    """
+    Refreshes the catalog models.json from the freshly generated models.json, matching
+    entries by id.
+
+    The size, version, data packs, bundle and checksum fields of existing entries are
+    copied verbatim from the generated file; their descriptive fields (name, voices) and
+    the order of the catalog are preserved. Generated Piper voices without a catalog entry
+    are appended, with a name and voice language derived from the voice path and config,
+    so a batch over new Piper voices needs no manual catalog edits.
+
+    Before overwriting, the existing catalog is backed up to "<input_name>.bak" (any prior
+    backup is overwritten).
+
+    Args:
+        existing_path (Path): Path to the catalog models.json to update in place.
+        generated_path (Path): Path to the generated models.json with the computed fields.
+
+    Returns:
+        Path: The path of the updated catalog (same as `existing_path`).
+    """
+    existing_path = Path(existing_path)
+    generated_path = Path(generated_path)
+
+    backup_path = existing_path.parent / (existing_path.name + ".bak")
+    shutil.copy2(existing_path, backup_path)
+
+    with open(existing_path, "r") as f:
+        catalog = load(f)
+    with open(generated_path, "r") as f:
+        generated = load(f)
+
+    computed_by_id: Dict[str, dict] = {entry["id"]: entry for entry in generated}
+
+    for entry in catalog:
+        match = computed_by_id.pop(entry["id"], None)
+        if match is None:
+            continue
+
+        for field in COPIED_FIELDS:
+            entry[field] = match[field]
+
+    for model_id, match in computed_by_id.items():
+        if match["model_format"] != "piper":
+            print(
+                f"No catalog entry for '{model_id}'; add it to {existing_path} manually."
+            )
+            continue
+
+        _, locale, dataset, *quality = match["voice"].strip("/").split("/")
+        quality = quality[0] if quality else "medium"
+        catalog.append(
+            {
+                "id": model_id,
+                "name": f"Piper {locale} {dataset} ({quality})",
+                "base_model": match["base_model"],
+                "voice": match["voice"],
+                "size": match["size"],
+                "version": match["version"],
+                "voices": [{"language": match["language"]}],
+                "architectures": match["architectures"],
+                "data_packs": match["data_packs"],
+                "bundle": match["bundle"],
+                "checksum": match["checksum"],
+            }
+        )
+
+    with open(existing_path, "w") as f:
+        json.dump(catalog, f, indent=2)
+        f.write("\n")
+
+    return existing_path
@@ -1,37 +1,22 @@
 from pathlib import Path
-from typing import TypedDict, List
+from typing import List, Optional, TypedDict
 
 
 class ModelFile(TypedDict):
+    id: Optional[str]
     base_model: str
-    source_language: str
-    target_language: str
-    bidirectional: bool
-    architectures: List[str]
-    score: float
-    version: str
-    size: int
-    bundle: str
-    checksum: str
-
-
-class ExportedModel(TypedDict):
-    path: Path
-    base_model: str
-    source_language: str
-    target_language: str
-    architectures: List[str]
-    score: float
-    version: str
+    model_format: str
+    voice: Optional[str]
 
 
 class ExportedBundle(TypedDict):
     path: Path
     checksum: Path
+    id: str
     base_model: str
-    bidirectional: bool
-    source_language: str
-    target_language: str
+    model_format: str
+    voice: Optional[str]
+    language: Optional[str]
     architectures: List[str]
-    score: float
+    data_packs: List[str]
     version: str
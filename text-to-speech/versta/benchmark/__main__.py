@@ -0,0 +1,112 @@
+import json
+import os
+
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import List
+
+from .benchmark import (
+    INPUT_LENGTHS,
+    benchmark_model,
+    format_table,
+    write_benchmark_metadata,
+)
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Benchmark exported Piper and Kokoro voices with onnxruntime on CPU, on a
+        fixed set of phoneme inputs of varying length. The fp32 and quantized ONNX models
+        (when the export kept its intermediates) and the final ORT model are measured per
+        thread count: real-time factor, time-to-first-sample, p50/p95 latency and peak RSS.
+        A summary is recorded in each voice's metadata.json and in a comparison table.
+        """,
+    )
+
+    parser.add_argument(
+        "--models_dir",
+        type=Path,
+        default=Path("output"),
+        help="Directory holding the exported voice folders, as written by the export "
+        "module. Defaults to 'output'.",
+    )
+
+    parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4],
+        help="Thread counts to measure. Defaults to 1, 2 and 4.",
+    )
+
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="Warm repetitions per input and thread count. Defaults to 5.",
+    )
+
+    parser.add_argument(
+        "--input_lengths",
+        type=int,
+        nargs="+",
+        default=INPUT_LENGTHS,
+        help="Phoneme sequence lengths of the benchmark inputs. Keep them fixed between "
+        "runs, so results are comparable. Defaults to 16, 64, 128 and 256.",
+    )
+
+    parser.add_argument(
+        "--output_dir",
+        type=Path,
+        default=Path("output/benchmark"),
+        help="Directory where the full results and the comparison table are written. "
+        "Defaults to 'output/benchmark'.",
+    )
+
+    return parser.parse_args()
+
+
+def main(
+    models_dir: Path,
+    output_dir: Path,
+    threads: List[int],
+    runs: int = 5,
+    input_lengths: List[int] = INPUT_LENGTHS,
+) -> Path:
+    # Step 1: Find the exported voices
+    model_dirs = sorted(path.parent for path in models_dir.glob("*/metadata.json"))
+    if not model_dirs:
+        raise FileNotFoundError(f"No exported voices found in {models_dir}")
+
+    # Step 2: Benchmark every voice, one after another
+    benchmarks = []
+    for model_dir in model_dirs:
+        print(f"Benchmarking {model_dir.name}...")
+        benchmark = benchmark_model(model_dir, threads, runs, input_lengths)
+        write_benchmark_metadata(model_dir, benchmark)
+        benchmarks.append(benchmark)
+
+    # Step 3: Write the full results and the comparison table
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(output_dir / "benchmark.json", "w", encoding="utf-8") as f:
+        json.dump(benchmarks, f, indent=4)
+
+    table = format_table(benchmarks)
+    table_file = output_dir / "benchmark.md"
+    table_file.write_text(table, encoding="utf-8")
+
+    print(table)
+    return table_file
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(
+        models_dir=args.models_dir,
+        output_dir=args.output_dir,
+        threads=args.threads,
+        runs=args.runs,
+        input_lengths=args.input_lengths,
+    )
@@ -0,0 +1,356 @@
+import json
+import os
+import platform
+import resource
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import onnxruntime
+
+from onnxruntime import InferenceSession, SessionOptions
+
+from ..export.vocabulary import Vocabulary
+from ..export.voices import VOICES_FILE, VoiceStore
+from .typing import BenchmarkVariant, ModelBenchmark, VariantResult
+
+# Phoneme sequence lengths of the fixed benchmark inputs, from a short phrase to a long
+# sentence.
+INPUT_LENGTHS = [16, 64, 128, 256]
+
+# Output sample rates, used when the voice config is no longer available.
+SAMPLE_RATES = {"VITS": 22050, "StyleTTS2": 24000}
+
+# Piper's default inference scales: noise_scale, length_scale and noise_w.
+PIPER_SCALES = [0.667, 1.0, 0.8]
+
+
+def device_name() -> str:
+    """
+    Describes the machine the benchmark runs on.
+
+    Returns:
+        str: The OS, architecture, processor and CPU count.
+    """
+    processor = platform.processor() or platform.machine()
+    return (
+        f"{platform.system()} {platform.machine()} {processor} ({os.cpu_count()} CPUs)"
+    )
+
+
+def find_variants(model_dir: Path) -> List[BenchmarkVariant]:
+    """
+    Finds the model variants of an export: the fp32 and quantized ONNX models when the
+    intermediates were kept, and the final ORT model. Split voices are measured on their
+    whole fp32 model only, as their encoder and decoder run as a pipeline.
+
+    Args:
+        model_dir (Path): The export output directory of the voice.
+
+    Returns:
+        List[BenchmarkVariant]: The variants that exist, fp32 first.
+    """
+    with open(model_dir / "metadata.json", "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    candidates = [
+        BenchmarkVariant(
+            name="fp32", path=model_dir / "intermediates" / "converted" / "model.onnx"
+        ),
+        BenchmarkVariant(
+            name="quantized",
+            path=model_dir / "intermediates" / "quantized" / "model_quantized.onnx",
+        ),
+    ]
+
+    if "model" in metadata["files"]["inference"]:
+        candidates.append(
+            BenchmarkVariant(
+                name="ort", path=model_dir / metadata["files"]["inference"]["model"]
+            )
+        )
+
+    return [variant for variant in candidates if variant["path"].exists()]
+
+
+def sample_rate(model_dir: Path) -> int:
+    """
+    Gets the output sample rate of a voice, from its config when the intermediates were
+    kept, otherwise from its architecture.
+
+    Args:
+        model_dir (Path): The export output directory of the voice.
+
+    Returns:
+        int: The sample rate in Hz.
+    """
+    config_file = model_dir / "intermediates" / "converted" / "config.json"
+    if config_file.exists():
+        with open(config_file, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        if "audio" in config:
+            return config["audio"]["sample_rate"]
+
+    with open(model_dir / "metadata.json", "r", encoding="utf-8") as f:
+        architectures = json.load(f)["architectures"]
+
+    return SAMPLE_RATES[architectures[0]]
+
+
+def token_ids(vocab_file: Path) -> List[int]:
+    """
+    Reads the token ids of an exported vocab.bin.
+
+    Args:
+        vocab_file (Path): The vocabulary file.
+
+    Returns:
+        List[int]: The sorted, unique token ids.
+    """
+    with Vocabulary(vocab_file) as vocabulary:
+        return sorted({index for _, index in vocabulary.items()})
+
+
+def benchmark_inputs(
+    model_dir: Path, input_names: List[str], lengths: List[int], seed: int = 0
+) -> List[Dict[str, np.ndarray]]:
+    """
+    Builds the fixed benchmark inputs: one random but seeded phoneme sequence per length,
+    drawn from the voice vocabulary, so every run of a voice sees the same inputs. Kokoro
+    inputs use the style of the first exported voice, or a seeded random style.
+
+    Args:
+        model_dir (Path): The export output directory of the voice.
+        input_names (List[str]): The model input names, which tell Piper and Kokoro apart.
+        lengths (List[int]): The phoneme sequence lengths.
+        seed (int): Seed of the phoneme sequences.
+
+    Returns:
+        List[Dict[str, np.ndarray]]: The model inputs, shortest first.
+    """
+    rng = np.random.default_rng(seed)
+    ids = token_ids(model_dir / "vocab.bin")
+    inputs = []
+
+    for length in sorted(lengths):
+        sequence = rng.choice(ids, size=length)
+
+        if "input_ids" in input_names:
+            voices_file = model_dir / VOICES_FILE
+            if voices_file.exists():
+                with VoiceStore(voices_file) as store:
+                    voice = store[store.names()[0]]
+                    style = np.array(voice[min(length, len(voice)) - 1]).reshape(1, -1)
+                    del voice
+            else:
+                style = rng.standard_normal((1, 256))
+            inputs.append(
+                {
+                    "input_ids": np.array([[0, *sequence, 0]], dtype=np.int64),
+                    "style": style.astype(np.float32),
+                    "speed": np.array([1.0], dtype=np.float32),
+                }
+            )
+            continue
+
+        feed = {
+            "input": np.array([sequence], dtype=np.int64),
+            "input_lengths": np.array([length], dtype=np.int64),
+            "scales": np.array(PIPER_SCALES, dtype=np.float32),
+        }
+        if "sid" in input_names:
+            feed["sid"] = np.array([0], dtype=np.int64)
+        inputs.append(feed)
+
+    return inputs
+
+
+def input_names(model_path: Path) -> List[str]:
+    """
+    Gets the input names of a model.
+
+    Args:
+        model_path (Path): The ONNX or ORT model.
+
+    Returns:
+        List[str]: The model input names.
+    """
+    session = InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+    return [model_input.name for model_input in session.get_inputs()]
+
+
+def measure_variant(
+    variant: BenchmarkVariant,
+    inputs: List[Dict[str, np.ndarray]],
+    threads: int,
+    runs: int,
+    rate: int,
+) -> VariantResult:
+    """
+    Measures a model variant in the calling process, which should be a fresh one, so the
+    peak RSS belongs to this variant alone. The time-to-first-sample is the session load
+    plus the first (cold) synthesis of the shortest input: these models produce no audio
+    before a run completes. Latency percentiles are taken over every warm run of every
+    input; the real-time factor is the total synthesis time over the audio duration.
+
+    Args:
+        variant (BenchmarkVariant): The model variant.
+        inputs (List[Dict[str, np.ndarray]]): The benchmark inputs, shortest first.
+        threads (int): Number of intra-op threads.
+        runs (int): Warm repetitions per input.
+        rate (int): Output sample rate of the voice.
+
+    Returns:
+        VariantResult: The measurements.
+    """
+    options = SessionOptions()
+    options.intra_op_num_threads = threads
+    options.inter_op_num_threads = 1
+    options.add_session_config_entry("session.enable_saved_runtime_optimizations", "1")
+
+    start = time.perf_counter()
+    session = InferenceSession(
+        str(variant["path"]), options, providers=["CPUExecutionProvider"]
+    )
+    load_ms = (time.perf_counter() - start) * 1000
+    session.run(None, inputs[0])
+    ttfs_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    audio_seconds = 0.0
+    for _ in range(runs):
+        for feed in inputs:
+            run_start = time.perf_counter()
+            waveform = session.run(None, feed)[0]
+            latencies.append(time.perf_counter() - run_start)
+            audio_seconds += waveform.size / rate
+
+    return VariantResult(
+        variant=variant["name"],
+        threads=threads,
+        load_ms=load_ms,
+        ttfs_ms=ttfs_ms,
+        p50_ms=float(np.percentile(latencies, 50)) * 1000,
+        p95_ms=float(np.percentile(latencies, 95)) * 1000,
+        rtf=sum(latencies) / audio_seconds,
+        # ru_maxrss is reported in KiB on Linux.
+        peak_rss_bytes=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    )
+
+
+def benchmark_model(
+    model_dir: Path,
+    threads: List[int],
+    runs: int,
+    lengths: List[int] = INPUT_LENGTHS,
+) -> ModelBenchmark:
+    """
+    Benchmarks every variant of an exported voice for each thread count. Each measurement
+    runs in its own freshly spawned process, one after another, so variants never share
+    memory or compete for cores.
+
+    Args:
+        model_dir (Path): The export output directory of the voice.
+        threads (List[int]): The thread counts to measure.
+        runs (int): Warm repetitions per input.
+        lengths (List[int]): The phoneme sequence lengths of the inputs.
+
+    Returns:
+        ModelBenchmark: The per variant and thread count results.
+
+    Raises:
+        FileNotFoundError: If the export holds no model to benchmark.
+    """
+    variants = find_variants(model_dir)
+    if not variants:
+        raise FileNotFoundError(f"No models to benchmark in {model_dir}")
+
+    with open(model_dir / "metadata.json", "r", encoding="utf-8") as f:
+        model = json.load(f)["base_model"]
+
+    inputs = benchmark_inputs(model_dir, input_names(variants[-1]["path"]), lengths)
+    rate = sample_rate(model_dir)
+
+    results: List[VariantResult] = []
+    for variant in variants:
+        for thread_count in threads:
+            with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+                result = executor.submit(
+                    measure_variant, variant, inputs, thread_count, runs, rate
+                ).result()
+            results.append(result)
+
+            print(
+                f"{variant['name']} @ {thread_count} threads: RTF {result['rtf']:.3f}, "
+                f"TTFS {result['ttfs_ms']:.0f} ms, p50 {result['p50_ms']:.0f} ms, "
+                f"p95 {result['p95_ms']:.0f} ms, "
+                f"peak RSS {result['peak_rss_bytes'] >> 20} MiB"
+            )
+
+    return ModelBenchmark(
+        model=model,
+        onnxruntime=onnxruntime.__version__,
+        device=device_name(),
+        input_lengths=sorted(lengths),
+        runs=runs,
+        results=results,
+    )
+
+
+def write_benchmark_metadata(model_dir: Path, benchmark: ModelBenchmark) -> Path:
+    """
+    Records the benchmark in the model metadata, so it travels with the voice into its
+    bundle.
+
+    Args:
+        model_dir (Path): The export output directory of the voice.
+        benchmark (ModelBenchmark): The benchmark results.
+
+    Returns:
+        Path: The updated metadata file.
+    """
+    metadata_file = model_dir / "metadata.json"
+
+    with open(metadata_file, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    metadata["benchmark"] = {
+        key: value for key, value in benchmark.items() if key != "model"
+    }
+
+    with open(metadata_file, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=4)
+
+    return metadata_file
+
+
+def format_table(benchmarks: List[ModelBenchmark]) -> str:
+    """
+    Formats the benchmark results as a Markdown comparison table, one row per model,
+    variant and thread count.
+
+    Args:
+        benchmarks (List[ModelBenchmark]): The benchmark results.
+
+    Returns:
+        str: The Markdown table.
+    """
+    lines = [
+        "| Model | Variant | Threads | RTF | TTFS (ms) | p50 (ms) | p95 (ms) "
+        "| Peak RSS (MiB) |",
+        "| --- | --- | ---: | ---: | ---: | ---: | ---: | ---: |",
+    ]
+    for benchmark in benchmarks:
+        for result in benchmark["results"]:
+            lines.append(
+                f"| {benchmark['model']} | {result['variant']} | {result['threads']} "
+                f"| {result['rtf']:.3f} | {result['ttfs_ms']:.0f} "
+                f"| {result['p50_ms']:.0f} | {result['p95_ms']:.0f} "
+                f"| {result['peak_rss_bytes'] / (1 << 20):.0f} |"
+            )
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,256 @@
+import json
+import os
+
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Dict, List
+
+import numpy as np
+import onnxruntime
+
+from onnxruntime import InferenceSession, SessionOptions
+
+from ..export.convert_ort import timing_inputs
+from .benchmark import device_name
+from .typing import ModelProfile, OperatorTime
+
+# Profiled passes over the inputs, after one warm-up run on the first input.
+RUNS = 3
+
+# Slowest nodes kept in the report; every operator type is kept.
+TOP_NODES = 20
+
+# Operators that only move tensors between int8 and float: their share of the time is the
+# overhead of the quantization itself.
+QUANTIZATION_OPS = ["QuantizeLinear", "DequantizeLinear", "DynamicQuantizeLinear"]
+
+
+def profile_model(
+    model_path: Path, inputs: List[Dict[str, np.ndarray]], runs: int = RUNS
+) -> ModelProfile:
+    """
+    Profiles a model with the onnxruntime profiler on a single CPU thread, and aggregates
+    the kernel time per operator type and per node. Times and calls are averaged per pass
+    over the inputs. The profiled session is warmed up with one run on the first input,
+    whose kernel events are left out of the aggregate.
+
+    Args:
+        model_path (Path): The ONNX or ORT model.
+        inputs (List[Dict[str, np.ndarray]]): The model inputs.
+        runs (int): Profiled passes over the inputs.
+
+    Returns:
+        ModelProfile: The kernel time per operator type, the slowest nodes and the time
+        spent in quantization operators.
+    """
+    with TemporaryDirectory() as temp_dir:
+        options = SessionOptions()
+        options.intra_op_num_threads = 1
+        options.add_session_config_entry(
+            "session.enable_saved_runtime_optimizations", "1"
+        )
+        options.enable_profiling = True
+        options.profile_file_prefix = str(Path(temp_dir) / "profile")
+        session = InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+
+        # Warm up the profiled session itself, so its allocations and caches are in place
+        session.run(None, inputs[0])
+        for _ in range(runs):
+            for feed in inputs:
+                session.run(None, feed)
+
+        with open(session.end_profiling(), "r", encoding="utf-8") as f:
+            events = json.load(f)
+
+    return _aggregate(model_path.name, events, runs)
+
+
+def _aggregate(model: str, events: List[Dict], runs: int) -> ModelProfile:
+    """
+    Aggregates the kernel events of an onnxruntime profile. The first kernel event of each
+    node is the warm-up run, and is left out.
+
+    Args:
+        model (str): The model file name.
+        events (List[Dict]): The events of the profile.
+        runs (int): Profiled passes over the inputs.
+
+    Returns:
+        ModelProfile: The aggregated profile.
+    """
+    nodes: Dict[str, OperatorTime] = {}
+    warmed_up = set()
+    for event in events:
+        if event.get("cat") != "Node" or not event["name"].endswith("_kernel_time"):
+            continue
+
+        name = event["name"][: -len("_kernel_time")]
+        if name not in warmed_up:
+            warmed_up.add(name)
+            continue
+
+        node = nodes.setdefault(
+            name,
+            OperatorTime(
+                name=name,
+                op_type=event["args"]["op_name"],
+                calls=0,
+                time_ms=0.0,
+                share=0.0,
+            ),
+        )
+        node["calls"] += 1
+        node["time_ms"] += event["dur"] / 1000 / runs
+
+    for node in nodes.values():
+        node["calls"] //= runs
+
+    op_types: Dict[str, OperatorTime] = {}
+    for node in nodes.values():
+        op_type = op_types.setdefault(
+            node["op_type"],
+            OperatorTime(
+                name=node["op_type"],
+                op_type=node["op_type"],
+                calls=0,
+                time_ms=0.0,
+                share=0.0,
+            ),
+        )
+        op_type["calls"] += node["calls"]
+        op_type["time_ms"] += node["time_ms"]
+
+    kernel_ms = sum(node["time_ms"] for node in nodes.values())
+    for entry in [*nodes.values(), *op_types.values()]:
+        entry["share"] = entry["time_ms"] / kernel_ms if kernel_ms else 0.0
+
+    quantization_ms = sum(
+        op_types[op]["time_ms"] for op in QUANTIZATION_OPS if op in op_types
+    )
+
+    def slowest(entries):
+        return sorted(entries, key=lambda entry: entry["time_ms"], reverse=True)
+
+    return ModelProfile(
+        model=model,
+        onnxruntime=onnxruntime.__version__,
+        device=device_name(),
+        runs=runs,
+        kernel_ms=kernel_ms,
+        quantization_ms=quantization_ms,
+        quantization_share=quantization_ms / kernel_ms if kernel_ms else 0.0,
+        op_types=slowest(op_types.values()),
+        nodes=slowest(nodes.values())[:TOP_NODES],
+    )
+
+
+def write_profile(model_path: Path, profile: ModelProfile) -> Path:
+    """
+    Writes the profile report next to the model, e.g. "model.profile.json" for
+    "model.ort".
+
+    Args:
+        model_path (Path): The profiled model.
+        profile (ModelProfile): The profile.
+
+    Returns:
+        Path: The written report.
+    """
+    report_file = model_path.with_suffix(".profile.json")
+
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=4)
+
+    return report_file
+
+
+def format_profile_table(profile: ModelProfile, limit: int = 10) -> str:
+    """
+    Formats the slowest operator types of a profile as a Markdown table, with the share of
+    the quantization operators in the heading.
+
+    Args:
+        profile (ModelProfile): The profile.
+        limit (int): Number of operator types listed.
+
+    Returns:
+        str: The Markdown table.
+    """
+    lines = [
+        f"{profile['model']}: {profile['kernel_ms']:.1f} ms kernel time per pass, "
+        f"{profile['quantization_ms']:.1f} ms ({profile['quantization_share']:.1%}) "
+        "in quantize/dequantize",
+        "",
+        "| Operator | Calls | Time (ms) | Share |",
+        "| --- | ---: | ---: | ---: |",
+    ]
+    for op_type in profile["op_types"][:limit]:
+        lines.append(
+            f"| {op_type['op_type']} | {op_type['calls']} "
+            f"| {op_type['time_ms']:.2f} | {op_type['share']:.1%} |"
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+def profile_voice(model_dir: Path, runs: int = RUNS) -> List[ModelProfile]:
+    """
+    Profiles the ORT models of an exported voice (the model, or the encoder and decoder of
+    a split voice) on the fixed benchmark inputs, and writes a report next to each.
+
+    Args:
+        model_dir (Path): The export output directory of the voice.
+        runs (int): Profiled passes over the inputs.
+
+    Returns:
+        List[ModelProfile]: The profile of every ORT model.
+    """
+    with open(model_dir / "metadata.json", "r", encoding="utf-8") as f:
+        inference = json.load(f)["files"]["inference"]
+
+    profiles = []
+    for filename in inference.values():
+        model_path = model_dir / filename
+        print(f"Profiling {model_path.name}...")
+
+        profile = profile_model(model_path, timing_inputs(model_dir, model_path), runs)
+        write_profile(model_path, profile)
+        print(format_profile_table(profile))
+        profiles.append(profile)
+
+    return profiles
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Profile the ORT models of an exported voice with the onnxruntime
+        profiler on the fixed benchmark inputs. The kernel time is aggregated per operator
+        type and per node, with the time spent in quantize/dequantize operators, and
+        written to a '<model>.profile.json' report next to each model.
+        """,
+    )
+
+    parser.add_argument(
+        "--model_dir",
+        type=Path,
+        required=True,
+        help="The export output directory of the voice, holding its metadata.json.",
+    )
+
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=RUNS,
+        help=f"Profiled passes over the inputs. Defaults to {RUNS}.",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    profile_voice(args.model_dir, args.runs)
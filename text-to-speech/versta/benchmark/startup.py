@@ -0,0 +1,204 @@
+import os
+import subprocess
+import sys
+
+from argparse import ArgumentParser
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import List
+
+from .typing import StartupResult
+
+# Commands that must start without loading a model framework: the help of every CLI, and
+# the commands that only read or write metadata.
+COMMANDS = [
+    "versta.export --help",
+    "versta.export.operators --help",
+    "versta.export.vocabulary --help",
+    "versta.bundle --help",
+    "versta.batch --help",
+]
+
+# Modules only the conversion, quantization and inference steps may import.
+HEAVY_MODULES = [
+    "torch",
+    "kokoro",
+    "optimum",
+    "transformers",
+    "paddle",
+    "onnx",
+    "onnxruntime",
+    "huggingface_hub",
+]
+
+# Wall time budget of a command, interpreter startup included.
+BUDGET_MS = 500
+
+_IMPORTED = """
+import runpy, sys
+sys.argv = sys.argv[1:]
+try:
+    runpy.run_module(sys.argv[0], run_name="__main__", alter_sys=True)
+except SystemExit:
+    pass
+print(",".join(sorted({name.split(".")[0] for name in sys.modules})), file=sys.stderr)
+"""
+
+
+def measure_startup(command: str, project_dir: Path, runs: int = 5) -> StartupResult:
+    """
+    Times a command of a module CLI in fresh interpreters, and lists the heavy modules
+    it imports.
+
+    Args:
+        command (str): The module and its arguments (e.g., "versta.export --help").
+        project_dir (Path): Directory holding the "versta" package the module runs from.
+        runs (int): Number of timed runs.
+
+    Returns:
+        StartupResult: The exit code, the median and slowest wall time, and the heavy
+        modules imported.
+    """
+    arguments = command.split()
+
+    timings, exit_code = [], 0
+    for _ in range(runs):
+        start = perf_counter()
+        exit_code = subprocess.run(
+            [sys.executable, "-m", *arguments],
+            cwd=project_dir,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        ).returncode
+        timings.append((perf_counter() - start) * 1000)
+
+    imported = (
+        subprocess.run(
+            [sys.executable, "-c", _IMPORTED, *arguments],
+            cwd=project_dir,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False,
+        )
+        .stderr.strip()
+        .splitlines()
+    )
+    modules = set(imported[-1].split(",")) if imported else set()
+
+    return StartupResult(
+        command=command,
+        exit_code=exit_code,
+        median_ms=median(timings),
+        max_ms=max(timings),
+        heavy_modules=[module for module in HEAVY_MODULES if module in modules],
+    )
+
+
+def _passed(result: StartupResult, budget_ms: float) -> bool:
+    """
+    Whether a command succeeded within budget without importing a heavy module.
+    """
+    return (
+        result["exit_code"] == 0
+        and result["median_ms"] <= budget_ms
+        and not result["heavy_modules"]
+    )
+
+
+def format_table(results: List[StartupResult], budget_ms: float) -> str:
+    """
+    Formats the startup times as a Markdown table, one row per command.
+
+    Args:
+        results (List[StartupResult]): The startup measurements.
+        budget_ms (float): The wall time budget of a command.
+
+    Returns:
+        str: The Markdown table.
+    """
+    lines = [
+        "| Command | Median (ms) | Max (ms) | Heavy imports | Status |",
+        "| --- | ---: | ---: | --- | --- |",
+    ]
+    for result in results:
+        lines.append(
+            f"| {result['command']} | {result['median_ms']:.0f} "
+            f"| {result['max_ms']:.0f} | {', '.join(result['heavy_modules']) or '-'} "
+            f"| {'ok' if _passed(result, budget_ms) else 'FAIL'} |"
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Time the startup of the Versta CLIs in fresh interpreters, and check
+        that help and metadata-only commands stay within budget without importing a model
+        framework (torch, kokoro, optimum, paddle, onnx, onnxruntime, huggingface_hub).
+        Exits with an error when a command regresses.
+        """,
+    )
+
+    parser.add_argument(
+        "--commands",
+        type=str,
+        nargs="+",
+        default=COMMANDS,
+        help="Module commands to time, each quoted with its arguments (e.g. "
+        "'versta.export --help'). Defaults to the help of every text-to-speech CLI.",
+    )
+
+    parser.add_argument(
+        "--project_dir",
+        type=Path,
+        default=Path(__file__).parent.parent.parent,
+        help="Directory holding the 'versta' package to run the commands from, e.g. "
+        "'object-character-recognition' to time the OCR export. Defaults to the "
+        "text-to-speech project.",
+    )
+
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="Timed runs per command. Defaults to 5.",
+    )
+
+    parser.add_argument(
+        "--budget_ms",
+        type=float,
+        default=BUDGET_MS,
+        help=f"Median wall time budget per command. Defaults to {BUDGET_MS} ms.",
+    )
+
+    return parser.parse_args()
+
+
+def main(
+    commands: List[str],
+    project_dir: Path,
+    runs: int = 5,
+    budget_ms: float = BUDGET_MS,
+) -> List[StartupResult]:
+    results = [measure_startup(command, project_dir, runs) for command in commands]
+    print(format_table(results, budget_ms))
+
+    failed = [result["command"] for result in results if not _passed(result, budget_ms)]
+    if failed:
+        raise SystemExit(f"Startup regressed for: {', '.join(failed)}")
+
+    return results
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(
+        commands=args.commands,
+        project_dir=args.project_dir,
+        runs=args.runs,
+        budget_ms=args.budget_ms,
+    )
@@ -0,0 +1,55 @@
+from pathlib import Path
+from typing import List, TypedDict
+
+
+class BenchmarkVariant(TypedDict):
+    name: str
+    path: Path
+
+
+class VariantResult(TypedDict):
+    variant: str
+    threads: int
+    load_ms: float
+    ttfs_ms: float
+    p50_ms: float
+    p95_ms: float
+    rtf: float
+    peak_rss_bytes: int
+
+
+class ModelBenchmark(TypedDict):
+    model: str
+    onnxruntime: str
+    device: str
+    input_lengths: List[int]
+    runs: int
+    results: List[VariantResult]
+
+
+class StartupResult(TypedDict):
+    command: str
+    exit_code: int
+    median_ms: float
+    max_ms: float
+    heavy_modules: List[str]
+
+
+class OperatorTime(TypedDict):
+    name: str
+    op_type: str
+    calls: int
+    time_ms: float
+    share: float
+
+
+class ModelProfile(TypedDict):
+    model: str
+    onnxruntime: str
+    device: str
+    runs: int
+    kernel_ms: float
+    quantization_ms: float
+    quantization_share: float
+    op_types: List[OperatorTime]
+    nodes: List[OperatorTime]
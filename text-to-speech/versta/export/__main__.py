@@ -2,14 +2,8 @@ import os
 
 from argparse import ArgumentParser
 from pathlib import Path
-from huggingface_hub.constants import default_cache_path
 
-from .quantize import quantize_model
-from .convert_onnx import convert_model_to_onnx
-from .convert_ort import convert_model_to_ort
-from .tokenizer import save_tokenizer
-from .metadata import generate_metadata, get_voices
-from .utils import remove_folder, output_folder
+from .formats import FORMATS, load_handler
 
 with open(Path(__file__).parent / ".." / "version.txt", "r") as version_file:
     version = version_file.read().strip()
@@ -46,6 +40,7 @@ def parse_args():
         "--model_format",
         type=str,
         default="kokoro",
+        choices=list(FORMATS),
         help="Specify the format of the model to convert."
         "This could be either 'kokoro' or 'piper' at the moment, defaulting to 'kokoro'.",
     )
@@ -58,6 +53,92 @@ def parse_args():
         "This parameter specifies the directory path within the Piper repository to the desired voice model.",
     )
 
+    parser.add_argument(
+        "--voice_dtype",
+        type=str,
+        default="float32",
+        choices=["float32", "float16"],
+        help="Payload type of the packed Kokoro voices. 'float16' halves the size of "
+        "voices.bin. Defaults to 'float32'.",
+    )
+
+    parser.add_argument(
+        "--quantization",
+        type=str,
+        default="dynamic",
+        choices=["dynamic", "static", "float16"],
+        help="Quantization mode for the voice. 'static' calibrates activation ranges "
+        "ahead of time on a phonemized sentence corpus, avoiding the runtime overhead of "
+        "dynamic quantization on short utterances (Piper only, requires espeak-ng). "
+        "'float16' converts the model to float16 instead of int8, trading size for "
+        "fidelity (Kokoro only). Defaults to 'dynamic'.",
+    )
+
+    parser.add_argument(
+        "--calibration_method",
+        type=str,
+        default="minmax",
+        choices=["minmax", "entropy", "percentile"],
+        help="Calibration method for static quantization. Defaults to 'minmax'.",
+    )
+
+    parser.add_argument(
+        "--calibration_corpus",
+        type=Path,
+        default=None,
+        help="Text file with one calibration sentence per line. If unspecified, the "
+        "corpus bundled for the voice language is used.",
+    )
+
+    parser.add_argument(
+        "--skip_simplification",
+        action="store_true",
+        default=False,
+        help="Whether to skip the graph simplification pass (constant folding, dead and "
+        "identity node elimination, Transpose/Reshape cancellation, initializer "
+        "deduplication) that runs before quantization. This will default to False if "
+        "not specified.",
+    )
+
+    parser.add_argument(
+        "--speakers",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Speaker ids of a multi-speaker Piper voice to export as single-speaker "
+        "voices, each with the speaker embedding baked in and the speaker table and "
+        "'sid' input removed. Each speaker is exported to its own '<output>-speaker-<id>' "
+        "directory. If unspecified, the voice is exported with all its speakers.",
+    )
+
+    parser.add_argument(
+        "--split",
+        action="store_true",
+        default=False,
+        help="Whether to split a Piper voice into an encoder (phonemes to latent frames) "
+        "and a decoder (latent frames to audio) that can vocode the latents in chunks, "
+        "for streaming synthesis. Requires dynamic quantization. This will default to "
+        "False if not specified.",
+    )
+
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="Whether to benchmark the fp32, quantized and ORT models on CPU and record "
+        "the results in metadata.json. This will default to False if not specified.",
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Whether to profile the ORT models with the onnxruntime profiler and write "
+        "the time per operator type and per node, including quantize/dequantize "
+        "overhead, to a '<model>.profile.json' report next to each model. This will "
+        "default to False if not specified.",
+    )
+
     parser.add_argument(
         "--keep_intermediates",
         action="store_true",
@@ -85,57 +166,180 @@ def main(
     clear_cache: bool = False,
     model_format: str = "kokoro",
     voice: str = None,
-):
+    voice_dtype: str = "float32",
+    quantization: str = "dynamic",
+    calibration_method: str = "minmax",
+    calibration_corpus: Path = None,
+    skip_simplification: bool = False,
+    speaker: int = None,
+    split: bool = False,
+    benchmark: bool = False,
+    profile: bool = False,
+    rename_output: bool = True,
+) -> Path:
+    # Imported here rather than at module level: the steps pull in onnx, onnxruntime and
+    # huggingface_hub, which '--help' and argument errors should not have to load.
+    from huggingface_hub.constants import default_cache_path
+
+    from .convert_onnx import convert_model_to_onnx
+    from .convert_ort import convert_model_to_ort
+    from .metadata import generate_metadata, get_voices
+    from .operators import collect_operator_config
+    from .quantize import quantize_model
+    from .simplify import simplify_model
+    from .speakers import bake_speaker, check_speaker, speaker_name
+    from .split import check_split, split_piper
+    from .tokenizer import save_tokenizer
+    from .utils import output_folder, remove_folder
+    from ..benchmark.benchmark import benchmark_model, write_benchmark_metadata
+    from ..benchmark.profiling import profile_voice
+
+    if split and (model_format != "piper" or quantization != "dynamic"):
+        raise ValueError("Only dynamically quantized Piper voices can be split.")
+    if speaker is not None and model_format != "piper":
+        raise ValueError("Only Piper voices have speakers to export.")
+
     print("Exporting the model...")
     output_dir.mkdir(parents=True, exist_ok=True)
-    output_dir = output_folder(output_dir, model, model_format, voice)
+    # The batch export names every voice folder itself, so voices of the same language
+    # family are not redirected into one shared "piper-<family>" folder
+    if rename_output:
+        output_dir = output_folder(output_dir, model, model_format, voice)
+
+    if speaker is not None:
+        output_dir = output_dir.with_name(f"{output_dir.name}-speaker-{speaker}")
+        output_dir.mkdir(parents=True, exist_ok=True)
 
     intermediates_dir = output_dir / "intermediates"
     converted_dir = intermediates_dir / "converted"
     quantization_dir = intermediates_dir / "quantized"
+    ort_dir = intermediates_dir / "ort"
 
     intermediates_dir.mkdir(parents=True, exist_ok=True)
     converted_dir.mkdir(parents=True, exist_ok=True)
     quantization_dir.mkdir(parents=True, exist_ok=True)
 
     # Step 1: Convert the model to ONNX format
-    convert_model_to_onnx(model, converted_dir, model_format, voice)
+    convert_model_to_onnx(model, converted_dir, model_format, voice, voice_dtype)
+
+    # Step 2: Bake the speaker into the model if specified
+    speaker_info = None
+    if speaker is not None:
+        original_model = converted_dir / "model_multi_speaker.onnx"
+        (converted_dir / "model.onnx").replace(original_model)
+
+        speaker_info = bake_speaker(
+            original_model,
+            speaker,
+            converted_dir / "model.onnx",
+            speaker_name(converted_dir / "config.json", speaker),
+        )
+        check_speaker(
+            original_model,
+            converted_dir / "model.onnx",
+            converted_dir / "config.json",
+            speaker,
+        )
+
+    # Step 3: Simplify the model ahead of quantization
+    simplification_info = None
+    if not skip_simplification:
+        simplification_info = simplify_model(
+            converted_dir / "model.onnx", converted_dir / "model.onnx", converted_dir
+        )
 
-    # Step 2: Quantize the model
-    quantize_model(converted_dir, "model.onnx", quantization_dir, model_format)
+    # Step 4: Split the model into an encoder and a chunkable decoder if specified
+    split_info = None
+    model_files = ["model.onnx"]
+    if split:
+        split_piper(converted_dir / "model.onnx", converted_dir)
+        split_info = check_split(converted_dir)
+        model_files = ["encoder.onnx", "decoder.onnx"]
 
-    # Step 3: Convert the quantized models to ORT format
-    ort_files = convert_model_to_ort(quantization_dir, output_dir)
+    # Step 5: Quantize the models, keeping the quantization of each by its ORT file (the
+    # quantizers write "<stem>_quantized.onnx", converted to "<stem>_quantized.ort")
+    quantization_info = {}
+    for model_file in model_files:
+        quantization_info[f"{Path(model_file).stem}_quantized.ort"] = quantize_model(
+            converted_dir,
+            model_file,
+            quantization_dir,
+            model_format,
+            quantization,
+            calibration_method,
+            calibration_corpus,
+        )
 
-    # Step 4: Save the tokenizer files
+    # Step 6: Convert the quantized models to ORT format
+    ort_files, optimization_info = convert_model_to_ort(
+        quantization_dir, output_dir, ort_dir, converted_dir
+    )
+    collect_operator_config(output_dir)
+
+    # Step 7: Save the tokenizer files
     tokenizer_files = save_tokenizer(converted_dir, output_dir)
 
-    # Step 5: Get all voices from voices directory
-    voices = get_voices(converted_dir / "voices", output_dir, model_format)
+    # Step 8: Get all voices from the voice store, and the data packs they need
+    voices = get_voices(converted_dir, output_dir, model_format)
+    data_packs = load_handler(model_format, "packs")(converted_dir, voices)
 
-    # Step 6: Create metadata file for the model
+    # Step 9: Create metadata file for the model
     generate_metadata(
-        version, output_dir, model, model_format, ort_files, tokenizer_files, voices
+        version,
+        output_dir,
+        model,
+        model_format,
+        ort_files,
+        tokenizer_files,
+        voices,
+        quantization_info,
+        optimization_info,
+        split_info,
+        speaker_info,
+        simplification_info,
+        data_packs,
     )
 
-    # Step 7: Remove intermediate files if specified
+    # Step 10: Benchmark the model variants, while the intermediates still exist
+    if benchmark:
+        write_benchmark_metadata(output_dir, benchmark_model(output_dir, [1, 2, 4], 5))
+
+    # Step 11: Profile the ORT models per operator if specified
+    if profile:
+        profile_voice(output_dir)
+
+    # Step 12: Remove intermediate files if specified
     if not keep_intermediates:
         remove_folder(intermediates_dir)
         print("Intermediates files cleaned.")
 
-    # Step 8: Clear the cache if specified
+    # Step 13: Clear the cache if specified
     if clear_cache:
         remove_folder(Path(default_cache_path) / f"models/{model}".replace("/", "--"))
         print("HuggingFace cache cleaned.")
 
+    return output_dir
+
 
 if __name__ == "__main__":
     args = parse_args()
-    main(
-        model=args.model,
-        output_dir=args.output_dir,
-        keep_intermediates=args.keep_intermediates,
-        clear_cache=args.clear_cache,
-        model_format=args.model_format,
-        voice=args.voice,
-    )
+    speakers = args.speakers or [None]
+    for speaker in speakers:
+        main(
+            model=args.model,
+            output_dir=args.output_dir,
+            keep_intermediates=args.keep_intermediates,
+            # Keep the download cached until the last speaker is exported
+            clear_cache=args.clear_cache and speaker == speakers[-1],
+            model_format=args.model_format,
+            voice=args.voice,
+            voice_dtype=args.voice_dtype,
+            quantization=args.quantization,
+            calibration_method=args.calibration_method,
+            calibration_corpus=args.calibration_corpus,
+            skip_simplification=args.skip_simplification,
+            speaker=speaker,
+            split=args.split,
+            benchmark=args.benchmark,
+            profile=args.profile,
+        )
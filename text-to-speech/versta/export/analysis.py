@@ -0,0 +1,216 @@
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from onnx import AttributeProto, GraphProto, ModelProto, NodeProto, load
+from onnxruntime.quantization import (
+    CalibrationDataReader,
+    CalibrationMethod,
+    QuantFormat,
+    QuantType,
+    quantize_dynamic,
+    quantize_static,
+)
+from onnxruntime.quantization.registry import QDQRegistry, QLinearOpsRegistry
+
+
+class GraphAnalysis:
+    """
+    Loads an ONNX model once and answers every question the quantization step asks of
+    it: the operator census, the nodes to exclude and the operators to quantize. The
+    in-memory model (with its doc strings stripped) is handed straight to the quantizer,
+    so the model is never reloaded or written back to disk in between.
+    """
+
+    def __init__(self, model_path: Path):
+        """
+        Args:
+            model_path (Path): Path to the ONNX model to analyse.
+        """
+        self.model_path = model_path
+        self.model = load(model_path)
+
+        for node in self.nodes():
+            node.doc_string = ""
+
+        self.operators = Counter(node.op_type for node in self.nodes())
+
+    def nodes(self) -> Iterator[NodeProto]:
+        """
+        Iterates over every node of the model, including the nodes of subgraphs (such as
+        the branches of If and Loop nodes).
+
+        Returns:
+            Iterator[NodeProto]: The model nodes, depth first.
+        """
+
+        def traverse_graph(graph: GraphProto):
+            for node in graph.node:
+                yield node
+                for attr in node.attribute:
+                    if attr.type == AttributeProto.GRAPH:
+                        yield from traverse_graph(attr.g)
+                    elif attr.type == AttributeProto.GRAPHS:
+                        for subgraph in attr.graphs:
+                            yield from traverse_graph(subgraph)
+
+        return traverse_graph(self.model.graph)
+
+    def excluded_nodes(self, blocked_nodes: List[str]) -> List[str]:
+        """
+        Gets a list of nodes that should be excluded from quantization.
+
+        Args:
+            blocked_nodes (List[str]): List of node name prefixes to block.
+
+        Returns:
+            List[str]: List of node names to exclude from quantization.
+        """
+        return [
+            node.name
+            for node in self.nodes()
+            if any(node.name.startswith(block) for block in blocked_nodes)
+        ]
+
+    def operators_to_quantize(
+        self, blocked_ops: List[str], registry: Dict[str, type] = QLinearOpsRegistry
+    ) -> List[str]:
+        """
+        Gets the operator types present in the model that can be quantized, excluding
+        blocked ones.
+
+        Args:
+            blocked_ops (List[str]): List of operator types to exclude.
+            registry (Dict[str, type]): The quantizable operators of the quantization
+                format (QOperator by default, or ``QDQRegistry``).
+
+        Returns:
+            List[str]: Sorted, unique list of operator types to quantize.
+        """
+        return sorted(
+            op_type
+            for op_type in self.operators
+            if op_type in registry and op_type not in blocked_ops
+        )
+
+    def input_names(self) -> List[str]:
+        """
+        Gets the names of the model inputs, excluding initializers.
+
+        Returns:
+            List[str]: The model input names.
+        """
+        initializers = {
+            initializer.name for initializer in self.model.graph.initializer
+        }
+        return [
+            graph_input.name
+            for graph_input in self.model.graph.input
+            if graph_input.name not in initializers
+        ]
+
+    def copy(self) -> ModelProto:
+        """
+        Copies the in-memory model for the quantizer, which moves the weights of the model
+        it is given to temporary external data files and would leave this one unusable.
+
+        Returns:
+            ModelProto: A copy of the analysed model.
+        """
+        model = ModelProto()
+        model.CopyFrom(self.model)
+        return model
+
+    def summary(self) -> str:
+        """
+        Formats the operator census, most frequent operators first.
+
+        Returns:
+            str: One "op_type: count" entry per operator type.
+        """
+        return ", ".join(
+            f"{op_type}: {count}" for op_type, count in self.operators.most_common()
+        )
+
+    def quantize(
+        self,
+        output_path: Path,
+        blocked_nodes: List[str],
+        blocked_ops: List[str],
+    ) -> Path:
+        """
+        Dynamically quantizes the in-memory model for ARM64 (uint8 activations,
+        symmetric per-channel int8 weights), matching optimum's ARM64 dynamic quantization
+        config.
+
+        Args:
+            output_path (Path): Path of the quantized model to write.
+            blocked_nodes (List[str]): List of node name prefixes to keep in float.
+            blocked_ops (List[str]): List of operator types to keep in float.
+
+        Returns:
+            Path: The quantized model path.
+        """
+        quantize_dynamic(
+            self.copy(),
+            output_path,
+            op_types_to_quantize=self.operators_to_quantize(blocked_ops),
+            nodes_to_exclude=self.excluded_nodes(blocked_nodes),
+            per_channel=True,
+            reduce_range=False,
+            weight_type=QuantType.QInt8,
+            extra_options={
+                "ActivationSymmetric": False,
+                "WeightSymmetric": True,
+                "EnableSubgraph": True,
+                "MatMulConstBOnly": False,
+            },
+        )
+
+        return output_path
+
+    def quantize_static(
+        self,
+        output_path: Path,
+        blocked_nodes: List[str],
+        blocked_ops: List[str],
+        calibration_reader: CalibrationDataReader,
+        calibration_method: CalibrationMethod = CalibrationMethod.MinMax,
+    ) -> Path:
+        """
+        Statically quantizes the in-memory model to QDQ format (uint8 activations,
+        symmetric per-channel int8 weights). Activation ranges are calibrated ahead of
+        time on the inputs of ``calibration_reader``, so no activation is quantized at
+        inference time.
+
+        Args:
+            output_path (Path): Path of the quantized model to write.
+            blocked_nodes (List[str]): List of node name prefixes to keep in float.
+            blocked_ops (List[str]): List of operator types to keep in float.
+            calibration_reader (CalibrationDataReader): Representative model inputs.
+            calibration_method (CalibrationMethod): How activation ranges are derived
+                from the calibration inputs.
+
+        Returns:
+            Path: The quantized model path.
+        """
+        quantize_static(
+            self.copy(),
+            output_path,
+            calibration_reader,
+            quant_format=QuantFormat.QDQ,
+            op_types_to_quantize=self.operators_to_quantize(blocked_ops, QDQRegistry),
+            nodes_to_exclude=self.excluded_nodes(blocked_nodes),
+            per_channel=True,
+            reduce_range=False,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            calibrate_method=calibration_method,
+            extra_options={
+                "ActivationSymmetric": False,
+                "WeightSymmetric": True,
+                "EnableSubgraph": True,
+            },
+        )
+
+        return output_path
@@ -0,0 +1,145 @@
+import json
+import subprocess
+import unicodedata
+
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+from onnxruntime.quantization import CalibrationDataReader, CalibrationMethod
+
+CORPUS_DIR = Path(__file__).parent / "calibration"
+DEFAULT_CORPUS_LANGUAGE = "en"
+
+CALIBRATION_METHODS = {
+    "minmax": CalibrationMethod.MinMax,
+    "entropy": CalibrationMethod.Entropy,
+    "percentile": CalibrationMethod.Percentile,
+}
+
+# Piper's special phonemes: padding between phonemes, begin and end of sentence.
+PAD = "_"
+BOS = "^"
+EOS = "$"
+
+
+def load_corpus(language: str, corpus: Path = None) -> List[str]:
+    """
+    Loads the calibration sentences for a language: the given corpus file, or the corpus
+    bundled for the language family, falling back to English when none is bundled.
+
+    Args:
+        language (str): Language family of the voice (e.g. "nl").
+        corpus (Path): Text file with one sentence per line, overriding the bundled one.
+
+    Returns:
+        List[str]: The non-empty sentences.
+    """
+    if corpus is None:
+        corpus = CORPUS_DIR / f"{language}.txt"
+        if not corpus.exists():
+            print(f"No calibration corpus for '{language}', using English.")
+            corpus = CORPUS_DIR / f"{DEFAULT_CORPUS_LANGUAGE}.txt"
+
+    with open(corpus, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def phonemize(sentence: str, espeak_voice: str) -> str:
+    """
+    Phonemizes a sentence to IPA with espeak-ng, like Piper does at inference time.
+
+    Args:
+        sentence (str): The sentence to phonemize.
+        espeak_voice (str): The espeak-ng voice of the Piper model (e.g. "en-us").
+
+    Returns:
+        str: The IPA phonemes, clauses joined by spaces.
+    """
+    result = subprocess.run(
+        ["espeak-ng", "-q", "--ipa", "-v", espeak_voice, sentence],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return " ".join(result.stdout.split())
+
+
+def phoneme_ids(phonemes: str, phoneme_id_map: Dict[str, List[int]]) -> List[int]:
+    """
+    Maps phonemes to Piper input ids: the begin marker, every phoneme followed by the
+    padding id, then the end marker. Phonemes missing from the map are skipped.
+
+    Args:
+        phonemes (str): The IPA phonemes.
+        phoneme_id_map (Dict[str, List[int]]): The voice's phoneme_id_map.
+
+    Returns:
+        List[int]: The phoneme ids.
+    """
+    ids = [*phoneme_id_map[BOS], *phoneme_id_map[PAD]]
+    for phoneme in unicodedata.normalize("NFD", phonemes):
+        if phoneme not in phoneme_id_map:
+            continue
+        ids.extend(phoneme_id_map[phoneme])
+        ids.extend(phoneme_id_map[PAD])
+    ids.extend(phoneme_id_map[EOS])
+
+    return ids
+
+
+class PiperCalibrationReader(CalibrationDataReader):
+    """
+    Feeds representative inputs to the quantization calibrator: the bundled sentence
+    corpus, phonemized with the voice's espeak-ng voice and mapped through its
+    phoneme_id_map, with the voice's default inference scales. Multi-speaker voices cycle
+    through their speakers.
+    """
+
+    def __init__(self, config_file: Path, input_names: List[str], corpus: Path = None):
+        """
+        Args:
+            config_file (Path): The Piper voice config.json.
+            input_names (List[str]): The model input names (detects the "sid" input).
+            corpus (Path): Text file with one sentence per line, overriding the bundled
+                corpus of the voice language.
+        """
+        with open(config_file, "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+        language = config.get("language", {}).get("family", DEFAULT_CORPUS_LANGUAGE)
+        espeak_voice = config.get("espeak", {}).get("voice", language)
+        inference = config.get("inference", {})
+
+        self.sentences = [
+            phoneme_ids(phonemize(sentence, espeak_voice), config["phoneme_id_map"])
+            for sentence in load_corpus(language, corpus)
+        ]
+        self.scales = np.array(
+            [
+                inference.get("noise_scale", 0.667),
+                inference.get("length_scale", 1.0),
+                inference.get("noise_w", 0.8),
+            ],
+            dtype=np.float32,
+        )
+        self.speakers = config.get("num_speakers", 1) if "sid" in input_names else 0
+        self.inputs = self._inputs()
+
+    def _inputs(self) -> Iterator[Dict[str, np.ndarray]]:
+        for index, ids in enumerate(self.sentences):
+            inputs = {
+                "input": np.array([ids], dtype=np.int64),
+                "input_lengths": np.array([len(ids)], dtype=np.int64),
+                "scales": self.scales,
+            }
+            if self.speakers:
+                inputs["sid"] = np.array([index % self.speakers], dtype=np.int64)
+            yield inputs
+
+    def get_next(self) -> Dict[str, np.ndarray]:
+        return next(self.inputs, None)
+
+    def rewind(self):
+        self.inputs = self._inputs()
@@ -1,17 +1,25 @@
 import torch
 import json
 
+from contextlib import contextmanager
 from huggingface_hub import hf_hub_download, snapshot_download
 from kokoro import KModel
 from pathlib import Path
+from typing import Tuple
 from shutil import copyfile
-from struct import pack
-from io import BytesIO
-from numpy import save
 from onnx import load
 from onnx.checker import check_model
 from torch import randint, LongTensor, FloatTensor, randn, onnx
 
+from .reference import (
+    REFERENCE_FILE,
+    check_references,
+    reference_inputs,
+    save_references,
+)
+from .vocabulary import write_vocabulary
+from .voices import VOICES_FILE, check_voices, load_source_voices, write_voices
+
 VOICES = [
     "af_heart",
     "am_puck",
@@ -31,13 +39,16 @@ VOICES = [
 ]
 
 
-def convert_kokoro_to_onnx(model_name: str, export_path: Path) -> Path:
+def convert_kokoro_to_onnx(
+    model_name: str, export_path: Path, voice_dtype: str = "float32"
+) -> Path:
     """
     Exports the specified pre-trained model to ONNX format and saves it in the export directory.
 
     Args:
         model_name (str): Name of the pre-trained model.
         export_path (Path): Path to the directory where the ONNX model will be saved.
+        voice_dtype (str): Payload type of the packed voices, "float32" or "float16".
     Returns:
         Path: The path to the exported ONNX model.
     """
@@ -54,10 +65,12 @@ def convert_kokoro_to_onnx(model_name: str, export_path: Path) -> Path:
 
     copyfile(model_config, config_file)
 
-    model_file = _convert_model(kmodel, model_file)
-
     _extract_vocab(export_path, config_file)
-    _convert_voices(export_path / "voices", Path(model_path))
+    _convert_voices(export_path, Path(model_path), voice_dtype)
+
+    model_file = _convert_model(kmodel, model_file)
+    _save_references(kmodel, export_path)
+    check_references(model_file, export_path / REFERENCE_FILE, "float32")
 
     _set_model_type(config_file, "albert")
 
@@ -72,41 +85,84 @@ def _convert_model(kmodel: KModel, export_path: Path) -> Path:
         kmodel (KModel): The Kokoro model to convert.
         export_path (Path): Path to the file where the ONNX model will be saved.
     Returns:
+        Path: The path to the exported ONNX model.
     """
-    print(
-        "Skipping Kokoro model conversion, as it is currently broken for unknown reasons."
-    )
-    return export_path
-
     model = KModelForONNX(kmodel).eval()
 
     input_ids = randint(1, 100, (48,)).numpy()
     input_ids = LongTensor([[0, *input_ids, 0]])
     style = randn(1, 256)
-    speed = randint(1, 10, (1,)).numpy()
-    speed = FloatTensor([*speed])
-
-    onnx.export(
-        model,
-        args=(input_ids, style, speed),
-        f=export_path,
-        export_params=True,
-        verbose=True,
-        input_names=["input_ids", "style", "speed"],
-        output_names=["waveform"],
-        opset_version=17,
-        dynamic_axes={
-            "input_ids": {1: "sequence_length"},
-            "waveform": {1: "num_samples"},
-        },
-        do_constant_folding=True,
-    )
+    speed = FloatTensor([1.0])
+
+    with _without_sequence_packing():
+        onnx.export(
+            model,
+            args=(input_ids, style, speed),
+            f=export_path,
+            export_params=True,
+            input_names=["input_ids", "style", "speed"],
+            output_names=["waveform", "duration"],
+            opset_version=17,
+            dynamic_axes={
+                "input_ids": {1: "sequence_length"},
+                "waveform": {0: "num_samples"},
+                "duration": {0: "sequence_length"},
+            },
+            do_constant_folding=True,
+        )
 
     check_model(model=load(export_path), full_check=True, check_custom_domain=True)
 
     return export_path
 
 
+@contextmanager
+def _without_sequence_packing():
+    """
+    Bypasses the packing of the LSTM inputs in Kokoro's text and duration encoders while
+    exporting. Tracing records the lengths passed to ``pack_padded_sequence`` as
+    constants, which ties the exported model to the sequence length of the dummy input.
+    The app always synthesizes a single, unpadded sequence, for which packing changes
+    nothing.
+    """
+    rnn = torch.nn.utils.rnn
+    pack, pad = rnn.pack_padded_sequence, rnn.pad_packed_sequence
+
+    rnn.pack_padded_sequence = lambda sequence, *args, **kwargs: sequence
+    rnn.pad_packed_sequence = lambda sequence, *args, **kwargs: (sequence, None)
+    try:
+        yield
+    finally:
+        rnn.pack_padded_sequence, rnn.pad_packed_sequence = pack, pad
+
+
+def _save_references(kmodel: KModel, export_dir: Path) -> Path:
+    """
+    Synthesizes the reference inputs with the source model, to check the exported
+    variants against.
+
+    Args:
+        kmodel (KModel): The Kokoro model.
+        export_dir (Path): Path to the converted model directory.
+
+    Returns:
+        Path: The reference file.
+    """
+    inputs = reference_inputs(export_dir)
+    outputs = []
+
+    with torch.no_grad():
+        for feed in inputs:
+            waveform, duration = kmodel.forward_with_tokens(
+                torch.from_numpy(feed["input_ids"]),
+                torch.from_numpy(feed["style"]),
+                float(feed["speed"][0]),
+            )
+            outputs.append((waveform.numpy(), duration.numpy()))
+
+    return save_references(export_dir / REFERENCE_FILE, inputs, outputs)
+
+
 def _set_model_type(config_file: Path, model_type: str):
     """
     Sets the model type in the configuration file.
@@ -141,14 +197,7 @@ def _extract_vocab(export_dir: Path, config_file: Path) -> Path:
     source_vocabulary = _load_vocabulary(config_file)
     optimized_vocabulary = export_dir / "vocab.bin"
 
-    with open(optimized_vocabulary, "wb") as f:
-        for word, index in source_vocabulary.items():
-            # Write the word as a null-terminated byte string
-            f.write(word.encode("utf-8") + b"\0")
-            # Write the index as a 4-byte little-endian integer
-            f.write(pack("<I", index))
-
-    return optimized_vocabulary
+    return write_vocabulary(source_vocabulary, optimized_vocabulary)
 
 
 def _load_vocabulary(config_file: Path) -> dict:
@@ -166,34 +215,27 @@ def _load_vocabulary(config_file: Path) -> dict:
         return config.get("vocab", {})
 
 
-def _convert_voices(export_dir: Path, model_path: Path):
+def _convert_voices(export_dir: Path, model_path: Path, dtype: str):
     """
-    Converts the voices from the Kokoro model to the export directory.
+    Packs the voices of the Kokoro model into a single voice store in the export
+    directory, and checks it against the source voices.
 
     Args:
-        export_dir (Path): Path to the directory where the voices will be saved.
+        export_dir (Path): Path to the directory where the voice store will be saved.
+        model_path (Path): Path to the downloaded Kokoro model.
+        dtype (str): Payload type of the voice store, "float32" or "float16".
     """
 
     voices_path = model_path / "voices"
     if not voices_path.exists():
         raise FileNotFoundError(f"Voices directory not found at {voices_path}.")
 
-    for file in voices_path.glob("*.pt"):
-        if file.stem not in VOICES:
-            continue
-
-        voice_file = export_dir / f"{file.stem}.npy"
-
-        if not voice_file.exists():
-            export_dir.mkdir(parents=True, exist_ok=True)
-
-        with open(file, "rb") as f:
-            content = BytesIO(f.read())
-
-        data = torch.load(content, weights_only=True).numpy()
+    names = [name for name in VOICES if (voices_path / f"{name}.pt").exists()]
+    sources = load_source_voices(voices_path, names)
 
-        with open(voice_file, "wb") as f:
-            save(f, data)
+    voices_file = export_dir / VOICES_FILE
+    write_voices(sources, voices_file, dtype)
+    check_voices(voices_file, sources)
 
 
 class KModelForONNX(torch.nn.Module):
@@ -203,6 +245,6 @@ class KModelForONNX(torch.nn.Module):
 
     def forward(
         self, input_ids: torch.LongTensor, ref_s: torch.FloatTensor, speed: float = 1
-    ) -> torch.Tensor:
+    ) -> Tuple[torch.Tensor, torch.LongTensor]:
         waveform, duration = self.kmodel.forward_with_tokens(input_ids, ref_s, speed)
-        return waveform.unsqueeze(0)
+        return waveform, duration
@@ -1,11 +1,14 @@
 from pathlib import Path
 
-from .convert_kokoro_to_onnx import convert_kokoro_to_onnx as convert_kokoro
-from .convert_piper_to_onnx import convert_piper_to_onnx as convert_piper
+from .formats import load_handler
 
 
 def convert_model_to_onnx(
-    model_name: str, export_dir: Path, model_format: str, voice: str
+    model_name: str,
+    export_dir: Path,
+    model_format: str,
+    voice: str,
+    voice_dtype: str = "float32",
 ) -> Path:
     """
     Exports the specified pre-trained model to ONNX format and saves it in the export directory.
@@ -15,14 +18,13 @@ def convert_model_to_onnx(
         export_dir (Path): Path to the directory where the ONNX model will be saved.
         model_format (str): Type of the pre-trained model to convert (e.g., "kokoro", "piper").
         voice (str): Voice path specification for Piper models (e.g., "nl/nl_NL/mls/medium").
+        voice_dtype (str): Payload type of the packed Kokoro voices, "float32" or "float16".
     Returns:
         Path: The path to the exported ONNX model.
     """
+    convert = load_handler(model_format, "convert")
     print(f"Exporting {model_name} to ONNX format...")
 
     if model_format == "kokoro":
-        return convert_kokoro(model_name, export_dir)
-    elif model_format == "piper":
-        return convert_piper(model_name, export_dir, voice)
-    else:
-        raise ValueError(f"Unsupported model format: {model_format}")
+        return convert(model_name, export_dir, voice_dtype)
+    return convert(model_name, export_dir, voice)
@@ -1,35 +1,243 @@
+import time
+
+from contextlib import contextmanager
 from pathlib import Path
+from shutil import copyfile
+from statistics import median
+from typing import Dict, List, Tuple
+
+import numpy as np
 
+from onnxruntime import InferenceSession, SessionOptions
 from onnxruntime.tools.convert_onnx_models_to_ort import (
     OptimizationStyle,
     convert_onnx_models_to_ort,
 )
 
-from .typing import ORTFiles
+from ..benchmark.benchmark import INPUT_LENGTHS, benchmark_inputs, input_names
+from .operators import OPERATORS_CONFIG, merge_operator_configs, write_operator_config
+from .typing import OptimizationInfo, ORTFiles
+
+# File name suffixes the ORT converter gives each optimization style.
+STYLE_SUFFIXES = {
+    OptimizationStyle.Fixed: "",
+    OptimizationStyle.Runtime: ".with_runtime_opt",
+}
+
+RUNS = 5
 
+# Serializes the timings of voices exported in parallel by the batch, so they do not
+# compete with each other for the CPU. Installed in each worker by set_timing_lock.
+_timing_lock = None
 
-def convert_model_to_ort(input_dir: Path, output_dir: Path) -> ORTFiles:
+
+def convert_model_to_ort(
+    input_dir: Path, output_dir: Path, work_dir: Path, inputs_dir: Path
+) -> Tuple[ORTFiles, Dict[str, OptimizationInfo]]:
     """
     Converts the model from ONNX format to ORT format.
 
+    Every model is converted with both the Fixed and the Runtime optimization style. Fixed
+    applies all optimizations for the conversion host ahead of time; Runtime only saves
+    them for replay when the model is loaded, which can suit the target CPU better. Both
+    are timed on CPU with representative inputs and the faster one is kept.
+
     Args:
         input_dir (Path): Path to the directory where the ONNX model are imported from.
         output_dir (Path): Path to the directory where the ORT model will be saved.
+        work_dir (Path): Path to the directory where both styles are converted to.
+        inputs_dir (Path): Path to the converted model directory, whose vocabulary (and
+            voices) the representative inputs are built from.
 
     Returns:
-        ORTFiles: Dictionary containing the file paths for the encoder and decoder ORT files.
+        Tuple[ORTFiles, Dict[str, OptimizationInfo]]: Dictionary containing the file
+        paths for the ORT files, and the chosen optimization style per ORT file.
+
+    Raises:
+        FileNotFoundError: If the converter did not produce an expected ORT file.
     """
+    work_dir.mkdir(parents=True, exist_ok=True)
+
     convert_onnx_models_to_ort(
         input_dir,
-        output_dir,
-        optimization_styles=[OptimizationStyle.Fixed],
+        work_dir,
+        optimization_styles=list(STYLE_SUFFIXES),
         target_platform="arm",
         enable_type_reduction=True,
-        allow_conversion_failures=True,
+        allow_conversion_failures=False,
+    )
+
+    optimization = {}
+    styles = set()
+
+    for model_file in sorted(input_dir.glob("*.onnx")):
+        candidates = {
+            style: work_dir / f"{model_file.stem}{suffix}.ort"
+            for style, suffix in STYLE_SUFFIXES.items()
+        }
+
+        missing_files = [path.name for path in candidates.values() if not path.exists()]
+        if missing_files:
+            raise FileNotFoundError(
+                f"ORT conversion of {model_file.name} did not produce: "
+                f"{', '.join(missing_files)}"
+            )
+
+        print(f"Timing optimization styles for {model_file.name}...")
+        inputs = timing_inputs(inputs_dir, candidates[OptimizationStyle.Fixed])
+        with exclusive_timing():
+            latencies = {
+                style: latency_ms(path, inputs) for style, path in candidates.items()
+            }
+
+        style = min(latencies, key=latencies.get)
+        slowest = max(latencies.values())
+        ort_file = f"{model_file.stem}.ort"
+
+        copyfile(candidates[style], output_dir / ort_file)
+        styles.add(style)
+
+        optimization[ort_file] = OptimizationInfo(
+            style=style.name.lower(),
+            fixed_ms=latencies[OptimizationStyle.Fixed],
+            runtime_ms=latencies[OptimizationStyle.Runtime],
+            gain=(slowest - latencies[style]) / slowest,
+        )
+        print(
+            f"Using the {style.name} optimization style for {ort_file} "
+            f"({optimization[ort_file]['gain']:.1%} faster)"
+        )
+
+    # Each style has its own operators config; models that chose different styles (the
+    # encoder and decoder of a split voice) need the operators of both.
+    config_files = [
+        work_dir / f"{Path(OPERATORS_CONFIG).stem}{STYLE_SUFFIXES[style]}.config"
+        for style in styles
+    ]
+    write_operator_config(
+        merge_operator_configs(config_files), output_dir / OPERATORS_CONFIG
     )
 
     # Get the file paths for the encoder and decoder ORT files
-    return _get_files_from_output(output_dir)
+    return _get_files_from_output(output_dir), optimization
+
+
+def timing_inputs(inputs_dir: Path, model_path: Path) -> List[Dict[str, np.ndarray]]:
+    """
+    Builds the representative inputs of the benchmark, with Piper's noise disabled so the
+    output durations, and with them the timings, are the same for both styles. The decoder
+    of a split Piper voice gets seeded latent frames instead, as many as the encoder
+    yields for the benchmark lengths at Piper's usual rate of about four frames per
+    phoneme.
+
+    Args:
+        inputs_dir (Path): Path to the converted model directory.
+        model_path (Path): The ONNX or ORT model to build the inputs for.
+
+    Returns:
+        List[Dict[str, np.ndarray]]: The model inputs.
+    """
+    names = input_names(model_path)
+    if "input" not in names and "input_ids" not in names:
+        return _latent_inputs(model_path, [length * 4 for length in INPUT_LENGTHS])
+
+    inputs = benchmark_inputs(inputs_dir, names, INPUT_LENGTHS)
+    for feed in inputs:
+        if "scales" in feed:
+            feed["scales"] = np.array([0.0, feed["scales"][1], 0.0], dtype=np.float32)
+
+    return inputs
+
+
+def _latent_inputs(
+    model_path: Path, frames: List[int], seed: int = 0
+) -> List[Dict[str, np.ndarray]]:
+    """
+    Builds seeded latent inputs for a split Piper decoder: the mask is all ones, the other
+    inputs are normally distributed, and dynamic dimensions are the frame count.
+
+    Args:
+        model_path (Path): The decoder model.
+        frames (List[int]): The frame counts, one input per count.
+        seed (int): Seed of the latents.
+
+    Returns:
+        List[Dict[str, np.ndarray]]: The decoder inputs.
+    """
+    rng = np.random.default_rng(seed)
+    session = InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+    inputs = []
+
+    for count in frames:
+        feed = {}
+        for model_input in session.get_inputs():
+            shape = [
+                dim if isinstance(dim, int) else count for dim in model_input.shape
+            ]
+            if model_input.name == "y_mask":
+                feed[model_input.name] = np.ones(shape, dtype=np.float32)
+            else:
+                feed[model_input.name] = rng.standard_normal(shape).astype(np.float32)
+        inputs.append(feed)
+
+    return inputs
+
+
+def set_timing_lock(lock) -> None:
+    """
+    Installs the lock that serializes timings across the processes of a batch export, as
+    the initializer of each worker.
+
+    Args:
+        lock: A lock shared by the worker processes.
+    """
+    global _timing_lock
+    _timing_lock = lock
+
+
+@contextmanager
+def exclusive_timing():
+    """
+    Holds the batch timing lock, when one is installed, for a group of timings that are
+    compared with each other, so they are all measured under the same load.
+    """
+    if _timing_lock is None:
+        yield
+        return
+
+    with _timing_lock:
+        yield
+
+
+def latency_ms(model_path: Path, inputs: List[Dict[str, np.ndarray]]) -> float:
+    """
+    Times a model on a single CPU thread, as the median over several runs of the time it
+    takes to synthesize every input.
+
+    Args:
+        model_path (Path): The ONNX or ORT model.
+        inputs (List[Dict[str, np.ndarray]]): The model inputs.
+
+    Returns:
+        float: The median time in milliseconds.
+    """
+    options = SessionOptions()
+    options.intra_op_num_threads = 1
+    # Runtime style models only replay their saved optimizations when asked to.
+    options.add_session_config_entry("session.enable_saved_runtime_optimizations", "1")
+    session = InferenceSession(
+        str(model_path), options, providers=["CPUExecutionProvider"]
+    )
+    session.run(None, inputs[0])
+
+    totals = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        for feed in inputs:
+            session.run(None, feed)
+        totals.append(time.perf_counter() - start)
+
+    return median(totals) * 1000
 
 
 def _get_files_from_output(output_dir: Path) -> ORTFiles:
@@ -47,17 +255,23 @@ def _get_files_from_output(output_dir: Path) -> ORTFiles:
         raise FileNotFoundError(f"The directory {output_dir} does not exist.")
 
     # List to hold matching files
-    ort_files = ORTFiles(model=None)
+    ort_files = ORTFiles()
 
     # Iterate over all files in the directory
-    for path in output_dir.glob("*"):
+    for path in output_dir.glob("*.ort"):
         file = Path(path).name
 
-        if "model" in file:
+        if "encoder" in file:
+            ort_files["encoder"] = file
+        elif "decoder" in file:
+            ort_files["decoder"] = file
+        elif "model" in file:
             ort_files["model"] = file
 
-    # Check if any required file is still None, raise an error if it is
-    missing_files = [key for key, value in ort_files.items() if value is None]
+    # A voice is either a single model, or a split encoder and decoder
+    split = "encoder" in ort_files or "decoder" in ort_files
+    required = ["encoder", "decoder"] if split else ["model"]
+    missing_files = [key for key in required if ort_files.get(key) is None]
 
     if missing_files:
         raise FileNotFoundError(
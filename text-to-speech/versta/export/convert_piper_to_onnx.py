@@ -1,9 +1,10 @@
 import json
 from pathlib import Path
 from shutil import copyfile
-from struct import pack
 from huggingface_hub import hf_hub_download
 
+from .vocabulary import write_vocabulary
+
 
 def convert_piper_to_onnx(repo_name: str, export_path: Path, voice: str = None) -> Path:
     """
@@ -24,7 +25,7 @@ def convert_piper_to_onnx(repo_name: str, export_path: Path, voice: str = None)
 
     print(f"Downloading Piper model from {repo_name} with voice path {voice}...")
 
-    model_name = _get_model_name(voice)
+    model_name = get_model_name(voice)
 
     model_file_path = hf_hub_download(
         repo_id=repo_name,
@@ -49,7 +50,7 @@ def convert_piper_to_onnx(repo_name: str, export_path: Path, voice: str = None)
     return model_output
 
 
-def _get_model_name(voice: str) -> str:
+def get_model_name(voice: str) -> str:
     """
     Extracts the model name from the voice path.
 
@@ -89,14 +90,7 @@ def _extract_vocab(export_dir: Path, config_file: Path) -> Path:
     source_vocabulary = _load_vocabulary(config_file)
     optimized_vocabulary = export_dir / "vocab.bin"
 
-    with open(optimized_vocabulary, "wb") as f:
-        for word, index in source_vocabulary.items():
-            # Write the word as a null-terminated byte string
-            f.write(word.encode("utf-8") + b"\0")
-            # Write the index as a 4-byte little-endian integer
-            f.write(pack("<I", index))
-
-    return optimized_vocabulary
+    return write_vocabulary(source_vocabulary, optimized_vocabulary)
 
 
 def _load_vocabulary(config_file: Path) -> dict:
@@ -148,7 +142,7 @@ def get_language_from_config(model: str, voice: str = None) -> dict:
             "Voice path must be specified for Piper models. Use --sub_voice parameter."
         )
 
-    model_name = _get_model_name(voice)
+    model_name = get_model_name(voice)
 
     config_file = hf_hub_download(
         repo_id=model,
@@ -0,0 +1,141 @@
+import json
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .typing import VoiceInfo
+
+# The data catalog written by the data module, listing the languages every pack provides.
+DATA_JSON = Path(__file__).parent.parent.parent.parent / "data" / "data.json"
+
+# The phonemizer and language of each Kokoro language, by the first letter of the voice
+# names. Japanese is phonemized with open-jtalk instead of espeak-ng.
+KOKORO_LANGUAGES = {
+    "a": ("espeak", "en-us"),
+    "b": ("espeak", "en-gb"),
+    "e": ("espeak", "es"),
+    "f": ("espeak", "fr-fr"),
+    "h": ("espeak", "hi"),
+    "i": ("espeak", "it"),
+    "j": ("open_jtalk", "ja"),
+    "p": ("espeak", "pt-br"),
+    "z": ("espeak", "cmn"),
+}
+
+
+def load_language_index(data_file: Path) -> Dict[Tuple[str, str], List[str]]:
+    """
+    Loads the language index of the data packs from the data catalog.
+
+    Args:
+        data_file (Path): Path to the data.json catalog.
+
+    Returns:
+        Dict[Tuple[str, str], List[str]]: The packs needed per phonemizer and language:
+        the packs the providing pack requires, followed by the providing pack.
+    """
+    with open(data_file, "r", encoding="utf-8") as f:
+        catalog = json.load(f)
+
+    index = {}
+    for entry in catalog:
+        for language in entry.get("languages", []):
+            index[(entry["phonemizer"], language)] = [*entry["requires"], entry["id"]]
+
+    return index
+
+
+def language_packs(
+    index: Dict[Tuple[str, str], List[str]], phonemizer: str, language: str
+) -> List[str]:
+    """
+    Gets the packs needed for a language, falling back to the language without its last
+    subtag as espeak-ng does (e.g. "en-gb" for "en-gb-x-rp").
+
+    Args:
+        index (Dict[Tuple[str, str], List[str]]): The language index of the data packs.
+        phonemizer (str): The phonemizer ("espeak" or "open_jtalk").
+        language (str): The language code (e.g., "nl", "en-us").
+
+    Returns:
+        List[str]: The packs needed for the language (e.g., ["espeak-ng-core",
+        "espeak-ng-nl"]).
+
+    Raises:
+        ValueError: If no data pack provides the language.
+    """
+    subtags = language.lower().split("-")
+    while subtags:
+        packs = index.get((phonemizer, "-".join(subtags)))
+        if packs:
+            return packs
+        subtags.pop()
+
+    raise ValueError(
+        f"No data pack in {DATA_JSON} provides the {phonemizer} language '{language}'."
+    )
+
+
+def resolve_packs(languages: List[Tuple[str, str]]) -> List[str]:
+    """
+    Resolves the data packs needed for a set of languages through the data catalog.
+
+    Args:
+        languages (List[Tuple[str, str]]): The phonemizer and language code pairs.
+
+    Returns:
+        List[str]: The needed packs, without duplicates. Empty when the catalog lists no
+        packs yet, in which case the voice relies on the full data bundle.
+    """
+    index = load_language_index(DATA_JSON)
+    if not index:
+        print(f"{DATA_JSON} lists no data packs yet; no data packs are declared.")
+        return []
+
+    packs = []
+    for phonemizer, language in sorted(set(languages)):
+        packs.extend(language_packs(index, phonemizer, language))
+
+    return list(dict.fromkeys(packs))
+
+
+def piper_packs(converted_dir: Path, voices: List[VoiceInfo]) -> List[str]:
+    """
+    Gets the data packs a Piper voice needs, from the espeak-ng voice in its config.
+
+    Args:
+        converted_dir (Path): Path to the converted model directory, holding the
+            config.json.
+        voices (List[VoiceInfo]): The packed voices, unused for Piper.
+
+    Returns:
+        List[str]: The core pack and the language pack of the voice.
+    """
+    with open(converted_dir / "config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    espeak_voice = config.get("espeak", {}).get(
+        "voice", config.get("language", {}).get("family", "en")
+    )
+    return resolve_packs([("espeak", espeak_voice)])
+
+
+def kokoro_packs(converted_dir: Path, voices: List[VoiceInfo]) -> List[str]:
+    """
+    Gets the data packs a Kokoro model needs, from the languages of its packed voices.
+
+    Args:
+        converted_dir (Path): Path to the converted model directory, unused for Kokoro.
+        voices (List[VoiceInfo]): The packed voices.
+
+    Returns:
+        List[str]: The packs of the voice languages: the core and language packs for the
+        espeak-ng languages, and the open-jtalk pack for Japanese voices.
+    """
+    return resolve_packs(
+        [
+            KOKORO_LANGUAGES[voice["name"][0]]
+            for voice in voices
+            if voice["name"][0] in KOKORO_LANGUAGES
+        ]
+    )
@@ -0,0 +1,59 @@
+from importlib import import_module
+from typing import Callable, Dict
+
+from .typing import FormatHandler
+
+# The export steps of each model format, as "module:function" paths within this package.
+# The modules are imported when a step first runs, so torch and kokoro only load when a
+# Kokoro model is converted, and huggingface_hub only when a model is downloaded.
+FORMATS: Dict[str, FormatHandler] = {
+    "kokoro": FormatHandler(
+        architecture="StyleTTS2",
+        convert="convert_kokoro_to_onnx:convert_kokoro_to_onnx",
+        quantize="quantize_kokoro:quantize_kokoro",
+        packs="data_packs:kokoro_packs",
+        quantization=["dynamic", "float16"],
+    ),
+    "piper": FormatHandler(
+        architecture="VITS",
+        convert="convert_piper_to_onnx:convert_piper_to_onnx",
+        quantize="quantize_piper:quantize_piper",
+        packs="data_packs:piper_packs",
+        quantization=["dynamic", "static"],
+    ),
+}
+
+
+def get_format(model_format: str) -> FormatHandler:
+    """
+    Gets the handlers of a model format.
+
+    Args:
+        model_format (str): Format of the model ("kokoro" or "piper").
+
+    Returns:
+        FormatHandler: The architecture, step handlers and quantization modes of the
+        format.
+
+    Raises:
+        ValueError: If the format is not registered.
+    """
+    if model_format not in FORMATS:
+        raise ValueError(f"Unsupported model format: {model_format}")
+
+    return FORMATS[model_format]
+
+
+def load_handler(model_format: str, step: str) -> Callable:
+    """
+    Imports the handler of an export step for a model format.
+
+    Args:
+        model_format (str): Format of the model ("kokoro" or "piper").
+        step (str): The export step, "convert", "quantize" or "packs".
+
+    Returns:
+        Callable: The handler function.
+    """
+    module, function = get_format(model_format)[step].split(":")
+    return getattr(import_module(f".{module}", __package__), function)
@@ -1,11 +1,22 @@
 import json
 
 from pathlib import Path
-from typing import List
-from os import listdir, path
-
-from .utils import copy_folder
-from .typing import ORTFiles, TokenizerFiles
+from typing import Dict, List
+from shutil import copyfile
+
+from .formats import get_format
+from .vocabulary import VOCABULARY_VERSION
+from .voices import VOICES_FILE, VoiceStore
+from .typing import (
+    OptimizationInfo,
+    ORTFiles,
+    QuantizationInfo,
+    SimplificationInfo,
+    SpeakerInfo,
+    SplitInfo,
+    TokenizerFiles,
+    VoiceInfo,
+)
 
 
 def generate_metadata(
@@ -15,7 +26,13 @@ def generate_metadata(
     model_format: str,
     ort_files: ORTFiles,
     tokenizer_files: TokenizerFiles,
-    voices: List[str],
+    voices: List[VoiceInfo],
+    quantization: Dict[str, QuantizationInfo] = None,
+    optimization: Dict[str, OptimizationInfo] = None,
+    split: SplitInfo = None,
+    speaker: SpeakerInfo = None,
+    simplification: SimplificationInfo = None,
+    data_packs: List[str] = None,
 ) -> Path:
     """
     Generates a metadata file for the model conversion process.
@@ -27,7 +44,17 @@ def generate_metadata(
         output_dir (Path): Path to the directory where the metadata file will be saved.
         ort_files (ORTFiles): Dictionary containing the file paths for the encoder and decoder ORT files.
         tokenizer_files (TokenizerFiles): Dictionary containing the file paths for the tokenizer files.
-        voices (List[str]): List of voices available for the model.
+        voices (List[VoiceInfo]): Voices packed in the model's voice store, by index.
+        quantization (Dict[str, QuantizationInfo]): Quantization mode and calibration,
+            per ORT file.
+        optimization (Dict[str, OptimizationInfo]): Chosen ORT optimization style and its
+            measured gain, per ORT file.
+        split (SplitInfo): Decoder interface and chunking of a split Piper voice.
+        speaker (SpeakerInfo): The speaker baked into a single-speaker Piper voice.
+        simplification (SimplificationInfo): Graph size and latency before and after
+            the simplification pass.
+        data_packs (List[str]): The runtime data packs (espeak-ng core and language
+            dictionaries, open-jtalk) the voice needs.
     """
     architectures = _get_model_architectures(model_format)
 
@@ -38,10 +65,32 @@ def generate_metadata(
         "files": {
             "inference": ort_files or {},
             "tokenizer": tokenizer_files or {},
-            "voices": voices or [],
         },
+        "vocabulary_version": VOCABULARY_VERSION,
+        "voices": voices or [],
     }
 
+    if voices:
+        metadata["files"]["voices"] = VOICES_FILE
+
+    if quantization is not None:
+        metadata["quantization"] = quantization
+
+    if optimization is not None:
+        metadata["optimization"] = optimization
+
+    if split is not None:
+        metadata["split"] = split
+
+    if speaker is not None:
+        metadata["speaker"] = speaker
+
+    if simplification is not None:
+        metadata["simplification"] = simplification
+
+    if data_packs is not None:
+        metadata["data_packs"] = data_packs
+
     # Define the path for the metadata.json file
     metadata_file = output_dir / "metadata.json"
 
@@ -54,24 +103,20 @@ def generate_metadata(
 
 def get_voices(
     input_path: Path, export_path: Path, model_format: str = "kokoro"
-) -> List[str]:
+) -> List[VoiceInfo]:
     """
-    Get all voices from voices directory
+    Get all voices from the packed voice store
 
     Args:
-        input_path (Path): Path to the voices directory
-        export_path (Path): Path to the directory where the voices will be exported
+        input_path (Path): Path to the directory holding the voices.bin voice store
+        export_path (Path): Path to the directory where the voice store will be exported
         model_format (str): Format of the model ("kokoro" or "piper")
     """
     if model_format == "kokoro":
-        folder_name = input_path.name
-        copy_folder(input_path, export_path)
-
-        files = listdir(export_path / folder_name)
-        voices = [
-            f for f in files if path.isfile(path.join(export_path / folder_name, f))
-        ]
-        return [path.join("voices", f) for f in voices]
+        copyfile(input_path / VOICES_FILE, export_path / VOICES_FILE)
+
+        with VoiceStore(export_path / VOICES_FILE) as store:
+            return store.voices
     elif model_format == "piper":
         return []
     else:
@@ -88,9 +133,4 @@ def _get_model_architectures(model_format: str) -> List[str]:
     Returns:
         List[str]: List of architectures used in the model.
     """
-    if model_format == "kokoro":
-        return ["StyleTTS2"]
-    elif model_format == "piper":
-        return ["VITS"]
-    else:
-        raise ValueError(f"Unsupported model format: {model_format}")
+    return [get_format(model_format)["architecture"]]
@@ -0,0 +1,248 @@
+import json
+import os
+
+from argparse import ArgumentParser
+from pathlib import Path
+from shutil import copyfile
+from typing import Dict, List, Optional, Tuple
+
+OPERATORS_CONFIG = "required_operators_and_types.config"
+OPERATORS_DIR = "operators"
+
+# Required operators per (domain, opset): operator type to its type reduction info, or
+# None when every type of the operator is needed.
+OperatorConfig = Dict[Tuple[str, int], Dict[str, Optional[dict]]]
+
+
+def collect_operator_config(model_dir: Path) -> Path:
+    """
+    Collects the required operators config the ORT conversion wrote for a voice into the
+    shared operators directory next to the voice, so it survives bundling (which removes
+    the voice directory) and can be aggregated with the configs of the other voices.
+
+    Args:
+        model_dir (Path): The export output directory of the voice.
+
+    Returns:
+        Path: The collected config file.
+
+    Raises:
+        FileNotFoundError: If the voice has no required operators config.
+    """
+    config_file = model_dir / OPERATORS_CONFIG
+    if not config_file.exists():
+        raise FileNotFoundError(
+            f"Required operators config not found at {config_file}."
+        )
+
+    operators_dir = model_dir.parent / OPERATORS_DIR
+    operators_dir.mkdir(parents=True, exist_ok=True)
+
+    return copyfile(config_file, operators_dir / f"{model_dir.name}.config")
+
+
+def read_operator_config(config_file: Path) -> OperatorConfig:
+    """
+    Reads an onnxruntime required operators and types config. Each line holds a domain, an
+    opset and a comma separated list of operators, each optionally followed by the JSON
+    type reduction info of the operator.
+
+    Args:
+        config_file (Path): The config file.
+
+    Returns:
+        OperatorConfig: The required operators.
+    """
+    config: OperatorConfig = {}
+
+    with open(config_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            domain, opset, operators = line.split(";", 2)
+            entry = config.setdefault((domain, int(opset)), {})
+
+            for operator, types in _split_operators(operators):
+                entry[operator] = _merge_types(entry.get(operator, types), types)
+
+    return config
+
+
+def _split_operators(operators: str) -> List[Tuple[str, Optional[dict]]]:
+    """
+    Splits the operator list of a config line, minding the commas inside the JSON type
+    reduction info.
+
+    Args:
+        operators (str): The operator list.
+
+    Returns:
+        List[Tuple[str, Optional[dict]]]: The operators and their type reduction info.
+    """
+    result = []
+    index = 0
+    while index < len(operators):
+        end = index
+        while end < len(operators) and operators[end] not in ",{":
+            end += 1
+        operator = operators[index:end]
+
+        types = None
+        if end < len(operators) and operators[end] == "{":
+            types, end = json.JSONDecoder().raw_decode(operators, end)
+
+        result.append((operator, types))
+        index = end + 1
+
+    return result
+
+
+def _merge_types(first: Optional[dict], second: Optional[dict]) -> Optional[dict]:
+    """
+    Merges the type reduction info of an operator used by two models: the union of the
+    types per input and output. An operator without type info needs every type, and so
+    does the merged one.
+
+    Args:
+        first (Optional[dict]): The type info of the first model.
+        second (Optional[dict]): The type info of the second model.
+
+    Returns:
+        Optional[dict]: The merged type info.
+    """
+    if first is None or second is None:
+        return None
+
+    merged = {}
+    for key in first.keys() | second.keys():
+        if key not in first or key not in second:
+            merged[key] = first.get(key, second.get(key))
+        elif isinstance(first[key], dict):
+            merged[key] = _merge_types(first[key], second[key])
+        else:
+            merged[key] = sorted(set(first[key]) | set(second[key]))
+
+    return merged
+
+
+def merge_operator_configs(config_files: List[Path]) -> OperatorConfig:
+    """
+    Merges the required operators configs of several voices into one, which covers every
+    operator and type any of them needs.
+
+    Args:
+        config_files (List[Path]): The config files.
+
+    Returns:
+        OperatorConfig: The merged required operators.
+    """
+    merged: OperatorConfig = {}
+
+    for config_file in config_files:
+        for key, operators in read_operator_config(config_file).items():
+            entry = merged.setdefault(key, {})
+            for operator, types in operators.items():
+                entry[operator] = _merge_types(entry.get(operator, types), types)
+
+    return merged
+
+
+def write_operator_config(
+    config: OperatorConfig,
+    output_file: Path,
+    version: str = None,
+    sources: List[str] = None,
+) -> Path:
+    """
+    Writes a required operators and types config, in the format accepted by the
+    onnxruntime reduced build (``build.py --include_ops_by_config``).
+
+    Args:
+        config (OperatorConfig): The required operators.
+        output_file (Path): The config file to write.
+        version (str): The catalog version the config belongs to, for the header.
+        sources (List[str]): The voices the config was aggregated from, for the header.
+
+    Returns:
+        Path: The written config file.
+    """
+    lines = []
+    if version is not None:
+        lines = [f"# Versta text-to-speech {version}", "# Aggregated from voices:"]
+        lines += [f"# - {source}" for source in sources or []]
+
+    for (domain, opset), operators in sorted(config.items()):
+        entries = [
+            operator
+            if types is None
+            else f"{operator}{json.dumps(types, sort_keys=True)}"
+            for operator, types in sorted(operators.items())
+        ]
+        lines.append(f"{domain};{opset};{','.join(entries)}")
+
+    output_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    return output_file
+
+
+def aggregate_operator_configs(output_dir: Path, version: str) -> Path:
+    """
+    Aggregates the required operators configs collected from every exported voice into
+    one config for the minimal onnxruntime build of the app, versioned with the catalog.
+
+    Args:
+        output_dir (Path): The export output directory holding the operators directory.
+        version (str): The catalog version.
+
+    Returns:
+        Path: The aggregated config file.
+
+    Raises:
+        FileNotFoundError: If no voice config was collected.
+    """
+    config_files = sorted((output_dir / OPERATORS_DIR).glob("*.config"))
+    if not config_files:
+        raise FileNotFoundError(
+            f"No required operators configs found in {output_dir / OPERATORS_DIR}."
+        )
+
+    output_file = output_dir / f"{Path(OPERATORS_CONFIG).stem}-{version}.config"
+    write_operator_config(
+        merge_operator_configs(config_files),
+        output_file,
+        version,
+        [config_file.stem for config_file in config_files],
+    )
+    print(f"Aggregated {len(config_files)} operator configs into {output_file}")
+
+    return output_file
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Aggregate the required operators and types configs of every exported
+        voice into one config for a minimal onnxruntime build of the app.
+        """,
+    )
+
+    parser.add_argument(
+        "--output_dir",
+        type=Path,
+        default=Path("output"),
+        help="Export output directory holding the collected operator configs. "
+        "Defaults to 'output'.",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    with open(Path(__file__).parent / ".." / "version.txt", "r") as version_file:
+        version = version_file.read().strip()
+
+    aggregate_operator_configs(args.output_dir, version)
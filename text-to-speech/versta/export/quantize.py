@@ -1,15 +1,21 @@
 from pathlib import Path
 
-from .quantize_kokoro import quantize_kokoro
-from .quantize_piper import quantize_piper
+from .formats import get_format, load_handler
+from .typing import QuantizationInfo
 
 BLOCKED_NODES = []
 BLOCKED_OPS = []
 
 
 def quantize_model(
-    export_dir: Path, model_filename: str, quantization_dir: Path, model_format: str
-):
+    export_dir: Path,
+    model_filename: str,
+    quantization_dir: Path,
+    model_format: str,
+    quantization: str = "dynamic",
+    calibration_method: str = "minmax",
+    calibration_corpus: Path = None,
+) -> QuantizationInfo:
     """
     Quantizes a specific ONNX model file and saves the quantized model to the given directory.
 
@@ -18,10 +24,29 @@ def quantize_model(
         model_filename (str): Name of the ONNX model file to quantize (e.g., "encoder_model.onnx").
         quantization_dir (Path): Path to the directory where the quantized model will be saved.
         model_format (str): Type of the pre-trained model to convert (e.g., "kokoro", "piper").
+        quantization (str): Quantization mode, "dynamic", "static" (Piper only) or
+            "float16" (Kokoro only).
+        calibration_method (str): Static calibration method: "minmax", "entropy" or "percentile".
+        calibration_corpus (Path): Calibration sentences overriding the bundled corpus.
+
+    Returns:
+        QuantizationInfo: The quantization mode and calibration, for the metadata.
     """
+    modes = get_format(model_format)["quantization"]
+    if quantization not in modes:
+        raise ValueError(
+            f"{model_format.capitalize()} models only support "
+            f"{' and '.join(modes)} quantization."
+        )
+
+    quantize = load_handler(model_format, "quantize")
     if model_format == "kokoro":
-        return quantize_kokoro(export_dir, model_filename, quantization_dir)
-    elif model_format == "piper":
-        return quantize_piper(export_dir, model_filename, quantization_dir)
-    else:
-        raise ValueError(f"Unsupported model format: {model_format}")
+        return quantize(export_dir, model_filename, quantization_dir, quantization)
+    return quantize(
+        export_dir,
+        model_filename,
+        quantization_dir,
+        quantization,
+        calibration_method,
+        calibration_corpus,
+    )
@@ -1,91 +1,85 @@
-from shutil import copyfile
+from pathlib import Path
 
-from huggingface_hub import hf_hub_download
+from onnx import load, save
+from onnxruntime.transformers.float16 import (
+    DEFAULT_OP_BLOCK_LIST,
+    convert_float_to_float16,
+)
 
-from optimum.onnxruntime import ORTQuantizer, AutoQuantizationConfig
-from onnxruntime.quantization.registry import QLinearOpsRegistry
-from onnx import load, save, AttributeProto
-from pathlib import Path
+from .analysis import GraphAnalysis
+from .reference import REFERENCE_FILE, check_references
+from .typing import QuantizationInfo
 
 BLOCKED_NODES = []
 BLOCKED_OPS = []
 
+# The harmonic source of the iSTFTNet decoder accumulates phase over the whole utterance,
+# which float16 cannot represent precisely; it stays in float32 in the float16 variant.
+FLOAT16_BLOCKED_NODES = ["/m_source/"]
 
-def quantize_kokoro(export_dir: Path, model_filename: str, quantization_dir: Path):
+
+def quantize_kokoro(
+    export_dir: Path,
+    model_filename: str,
+    quantization_dir: Path,
+    quantization: str = "dynamic",
+) -> QuantizationInfo:
     """
     Quantizes a specific ONNX model file and saves the quantized model to the given directory.
 
+    The "dynamic" variant is dynamically quantized to int8, the "float16" variant has its
+    weights and activations converted to float16 (with float32 inputs and outputs). Both
+    are checked against the reference synthesis of the source model when the export saved
+    one.
+
     Args:
         export_dir (Path): Path to the directory where the ONNX model is stored.
         model_filename (str): Name of the ONNX model file to quantize (e.g., "encoder_model.onnx").
         quantization_dir (Path): Path to the directory where the quantized model will be saved.
-    """
-    print(
-        "Skipping quantization for kokoro model as it is not supported. Downloading the quantized model instead."
-    )
-    model_file = hf_hub_download(
-        repo_id="onnx-community/Kokoro-82M-v1.0-ONNX-timestamped",
-        filename="model_uint8.onnx",
-        subfolder="onnx",
-    )
-    copyfile(model_file, quantization_dir / "model_quantized.onnx")
-    return
-
-    print(f"Cleaning {model_filename}...")
-    _clear_descriptions(export_dir / model_filename, export_dir / model_filename)
-
-    print(f"Quantizing {model_filename}...")
-
-    nodes_to_exclude = _get_excluded_nodes(export_dir / model_filename, BLOCKED_NODES)
-    operators_to_quantize = _get_operators(export_dir / model_filename, BLOCKED_OPS)
-
-    config = AutoQuantizationConfig.arm64(
-        is_static=False,
-        nodes_to_exclude=nodes_to_exclude,
-        operators_to_quantize=operators_to_quantize,
-    )
-
-    quantizer = ORTQuantizer.from_pretrained(export_dir, model_filename)
-    quantizer.quantize(config, quantization_dir)
-
-
-def _clear_descriptions(model_path: Path, output_path: Path):
-    model = load(model_path)
-
-    for node in model.graph.node:
-        node.doc_string = ""
+        quantization (str): Quantization mode, "dynamic" or "float16".
 
-    save(model, output_path)
-
-
-def _get_excluded_nodes(model_path: Path, blocked_nodes: list[str]) -> list[str]:
-    model = load(model_path)
-
-    excluded_nodes = list()
-    for node in model.graph.node:
-        if any(node.name.startswith(block) for block in blocked_nodes):
-            excluded_nodes.append(node.name)
-
-    return excluded_nodes
-
-
-def _get_operators(model_path: Path, blocked_ops: list[str]) -> list[str]:
-    model = load(model_path)
-
-    operators = list()
-
-    def traverse_graph(graph):
-        for node in graph.node:
-            if node.op_type not in QLinearOpsRegistry:
-                continue
-
-            if node.op_type in blocked_ops:
-                continue
-
-            operators.append(node.op_type)
-            for attr in node.attribute:
-                if attr.type == AttributeProto.GRAPH:
-                    traverse_graph(attr.g)
-
-    traverse_graph(model.graph)
-    return operators
+    Returns:
+        QuantizationInfo: The quantization mode, and the parity and latency of the
+        variant, for the metadata.
+    """
+    output_path = quantization_dir / f"{Path(model_filename).stem}_quantized.onnx"
+
+    if quantization == "dynamic":
+        print(f"Preparing Kokoro model for quantization: {model_filename}")
+
+        analysis = GraphAnalysis(export_dir / model_filename)
+        print(f"Operators: {analysis.summary()}")
+
+        print(f"Quantizing {model_filename}...")
+
+        analysis.quantize(output_path, BLOCKED_NODES, BLOCKED_OPS)
+    elif quantization == "float16":
+        print(f"Converting {model_filename} to float16...")
+
+        model = load(export_dir / model_filename)
+        blocked_nodes = [
+            node.name
+            for node in model.graph.node
+            if any(prefix in node.name for prefix in FLOAT16_BLOCKED_NODES)
+        ]
+        save(
+            convert_float_to_float16(
+                model,
+                keep_io_types=True,
+                op_block_list=DEFAULT_OP_BLOCK_LIST,
+                node_block_list=blocked_nodes,
+            ),
+            output_path,
+        )
+    else:
+        raise ValueError(f"Unsupported Kokoro quantization mode: {quantization}")
+
+    quantization_info = QuantizationInfo(mode=quantization)
+
+    reference_file = export_dir / REFERENCE_FILE
+    if reference_file.exists():
+        quantization_info.update(
+            check_references(output_path, reference_file, quantization)
+        )
+
+    return quantization_info
@@ -1,105 +1,149 @@
+import json
+
 from pathlib import Path
-from optimum.onnxruntime import ORTQuantizer, AutoQuantizationConfig
-from onnxruntime.quantization.registry import QLinearOpsRegistry
-from onnx import load, save, AttributeProto
+from typing import List, Optional, Tuple
+
+from .analysis import GraphAnalysis
+from .calibration import CALIBRATION_METHODS, PiperCalibrationReader
+from .typing import QuantizationInfo
 
 BLOCKED_NODES = []
 BLOCKED_OPS = ["Transpose"]
 
+# Exclusions chosen by the sensitivity sweep (see ``sensitivity.py``), per voice and
+# quantization mode. They replace the hand-picked defaults above for the voice they were
+# measured on.
+EXCLUSIONS_FILE = Path(__file__).parent / "exclusions" / "piper.json"
 
-def quantize_piper(export_dir: Path, model_filename: str, quantization_dir: Path):
-    """
-    Quantizes a Piper ONNX model for mobile deployment.
 
-    Args:
-        export_dir (Path): Path to the directory where the ONNX model is stored.
-        model_filename (str): Name of the ONNX model file to quantize.
-        quantization_dir (Path): Path to the directory where the quantized model will be saved.
+def voice_key(config_file: Path) -> Optional[str]:
     """
-    print(f"Preparing Piper model for quantization: {model_filename}")
-
-    # Clear model descriptions to reduce file size
-    _clear_descriptions(export_dir / model_filename, export_dir / model_filename)
+    Gets the key of a Piper voice in the exclusions file: the Piper voice name built from
+    its config (e.g. "nl_NL-mls-medium").
 
-    print(f"Quantizing {model_filename}...")
+    Args:
+        config_file (Path): The config.json of the voice.
 
-    nodes_to_exclude = _get_excluded_nodes(export_dir / model_filename, BLOCKED_NODES)
-    operators_to_quantize = _get_operators(export_dir / model_filename, BLOCKED_OPS)
+    Returns:
+        Optional[str]: The voice key, or None when the config lacks the language code,
+        dataset or quality.
+    """
+    with open(config_file, "r", encoding="utf-8") as f:
+        config = json.load(f)
 
-    config = AutoQuantizationConfig.arm64(
-        is_static=False,
-        nodes_to_exclude=nodes_to_exclude,
-        operators_to_quantize=operators_to_quantize,
-    )
+    parts = [
+        config.get("language", {}).get("code"),
+        config.get("dataset"),
+        config.get("audio", {}).get("quality"),
+    ]
+    if not all(parts):
+        return None
 
-    quantizer = ORTQuantizer.from_pretrained(export_dir, model_filename)
-    quantizer.quantize(config, quantization_dir)
+    return "-".join(parts)
 
 
-def _clear_descriptions(model_path: Path, output_path: Path):
+def load_exclusions(
+    quantization: str, voice: Optional[str], exclusions_file: Path = EXCLUSIONS_FILE
+) -> Tuple[List[str], List[str]]:
     """
-    Clears node descriptions from the ONNX model to reduce file size.
+    Loads the node prefixes and operator types to keep in float for a voice and
+    quantization mode.
 
     Args:
-        model_path (Path): Path to the input ONNX model.
-        output_path (Path): Path to save the modified model.
-    """
-    model = load(model_path)
+        quantization (str): Quantization mode, "dynamic" or "static".
+        voice (Optional[str]): The voice key (see ``voice_key``).
+        exclusions_file (Path): The exclusions file written by the sensitivity sweep.
 
-    for node in model.graph.node:
-        node.doc_string = ""
+    Returns:
+        Tuple[List[str], List[str]]: The blocked node prefixes and operator types; the
+        defaults when the sweep has not recorded any for the voice and mode.
+    """
+    if voice is None or not exclusions_file.exists():
+        return BLOCKED_NODES, BLOCKED_OPS
 
-    save(model, output_path)
+    with open(exclusions_file, "r", encoding="utf-8") as f:
+        exclusions = json.load(f).get(voice, {}).get(quantization)
 
+    if exclusions is None:
+        return BLOCKED_NODES, BLOCKED_OPS
 
-def _get_excluded_nodes(model_path: Path, blocked_nodes: list[str]) -> list[str]:
-    """
-    Gets a list of nodes that should be excluded from quantization.
+    return exclusions["blocked_nodes"], exclusions["blocked_ops"]
 
-    Args:
-        model_path (Path): Path to the ONNX model.
-        blocked_nodes (list[str]): List of node name prefixes to block.
 
-    Returns:
-        list[str]: List of node names to exclude from quantization.
+def quantize_piper(
+    export_dir: Path,
+    model_filename: str,
+    quantization_dir: Path,
+    quantization: str = "dynamic",
+    calibration_method: str = "minmax",
+    calibration_corpus: Path = None,
+) -> QuantizationInfo:
     """
-    model = load(model_path)
-
-    excluded_nodes = list()
-    for node in model.graph.node:
-        if any(node.name.startswith(block) for block in blocked_nodes):
-            excluded_nodes.append(node.name)
+    Quantizes a Piper ONNX model for mobile deployment.
 
-    return excluded_nodes
+    The model is loaded once: doc strings are stripped in memory, the operator census and
+    exclusions are computed from the same graph, and the in-memory model is quantized.
 
+    Dynamic quantization computes activation ranges on every inference, which dominates on
+    short utterances. Static quantization calibrates them ahead of time by running the
+    voice on a phonemized sentence corpus (see ``PiperCalibrationReader``).
 
-def _get_operators(model_path: Path, blocked_ops: list[str]) -> list[str]:
-    """
-    Gets a list of operators that can be quantized, excluding blocked ones.
+    Nodes and operators kept in float come from the sensitivity sweep when it has recorded
+    exclusions for the voice and mode (see ``load_exclusions``).
 
     Args:
-        model_path (Path): Path to the ONNX model.
-        blocked_ops (list[str]): List of operator types to exclude.
+        export_dir (Path): Path to the directory where the ONNX model and config.json are stored.
+        model_filename (str): Name of the ONNX model file to quantize.
+        quantization_dir (Path): Path to the directory where the quantized model will be saved.
+        quantization (str): Quantization mode, "dynamic" or "static".
+        calibration_method (str): Static calibration method: "minmax", "entropy" or "percentile".
+        calibration_corpus (Path): Text file with one sentence per line, overriding the
+            bundled corpus of the voice language.
 
     Returns:
-        list[str]: List of operator types to quantize.
+        QuantizationInfo: The quantization mode and calibration, for the metadata.
     """
-    model = load(model_path)
+    print(f"Preparing Piper model for quantization: {model_filename}")
 
-    operators = list()
+    analysis = GraphAnalysis(export_dir / model_filename)
+    print(f"Operators: {analysis.summary()}")
 
-    def traverse_graph(graph):
-        for node in graph.node:
-            if node.op_type not in QLinearOpsRegistry:
-                continue
+    output_path = quantization_dir / f"{Path(model_filename).stem}_quantized.onnx"
 
-            if node.op_type in blocked_ops:
-                continue
+    if quantization not in ("dynamic", "static"):
+        raise ValueError(f"Unsupported quantization mode: {quantization}")
 
-            operators.append(node.op_type)
-            for attr in node.attribute:
-                if attr.type == AttributeProto.GRAPH:
-                    traverse_graph(attr.g)
+    blocked_nodes, blocked_ops = load_exclusions(
+        quantization, voice_key(export_dir / "config.json")
+    )
+    print(f"Keeping in float: ops={blocked_ops} nodes={blocked_nodes}")
 
-    traverse_graph(model.graph)
-    return operators
+    if quantization == "dynamic":
+        print(f"Quantizing {model_filename} (dynamic)...")
+        analysis.quantize(output_path, blocked_nodes, blocked_ops)
+        return QuantizationInfo(mode="dynamic")
+
+    if calibration_method not in CALIBRATION_METHODS:
+        raise ValueError(f"Unsupported calibration method: {calibration_method}")
+
+    reader = PiperCalibrationReader(
+        export_dir / "config.json", analysis.input_names(), calibration_corpus
+    )
+
+    print(
+        f"Quantizing {model_filename} (static, {calibration_method} calibration on "
+        f"{len(reader.sentences)} sentences)..."
+    )
+    analysis.quantize_static(
+        output_path,
+        blocked_nodes,
+        blocked_ops,
+        reader,
+        CALIBRATION_METHODS[calibration_method],
+    )
+
+    return QuantizationInfo(
+        mode="static",
+        calibration=calibration_method,
+        samples=len(reader.sentences),
+    )
@@ -0,0 +1,195 @@
+import os
+
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from onnxruntime import InferenceSession, SessionOptions
+
+from ..benchmark.benchmark import benchmark_inputs
+from .convert_ort import exclusive_timing, latency_ms
+from .sensitivity import mel_distance, mel_filterbank
+from .typing import QuantizationInfo
+
+# Reference synthesis of the source Kokoro model, saved next to the export so every
+# variant can be checked against it without torch.
+REFERENCE_FILE = "reference.npz"
+REFERENCE_LENGTHS = [16, 64, 128]
+SAMPLE_RATE = 24000
+
+# Kokoro's sine source adds random noise, so waveforms never match sample for sample: the
+# variants are compared on their log-mel spectrograms and predicted durations instead,
+# with limits per precision.
+MAX_MEL_DISTANCE = {"float32": 0.1, "float16": 0.2, "dynamic": 0.5}
+MIN_DURATION_AGREEMENT = {"float32": 0.98, "float16": 0.95, "dynamic": 0.8}
+
+
+def reference_inputs(model_dir: Path) -> List[Dict[str, np.ndarray]]:
+    """
+    Builds the sample token sequences of the reference synthesis: the seeded benchmark
+    inputs, styled with the first packed voice.
+
+    Args:
+        model_dir (Path): Path to the converted model directory, holding the vocab.bin and
+            voices.bin.
+
+    Returns:
+        List[Dict[str, np.ndarray]]: The model inputs, shortest first.
+    """
+    return benchmark_inputs(model_dir, ["input_ids"], REFERENCE_LENGTHS)
+
+
+def save_references(
+    output_file: Path,
+    inputs: List[Dict[str, np.ndarray]],
+    outputs: List[Tuple[np.ndarray, np.ndarray]],
+) -> Path:
+    """
+    Saves the reference inputs and the waveforms and durations synthesized from them.
+
+    Args:
+        output_file (Path): The reference.npz file to write.
+        inputs (List[Dict[str, np.ndarray]]): The model inputs.
+        outputs (List[Tuple[np.ndarray, np.ndarray]]): The waveform and durations per
+            input.
+
+    Returns:
+        Path: The written reference file.
+    """
+    arrays = {}
+    for index, (feed, (waveform, duration)) in enumerate(zip(inputs, outputs)):
+        arrays.update({f"{name}_{index}": value for name, value in feed.items()})
+        arrays[f"waveform_{index}"] = waveform.reshape(-1)
+        arrays[f"duration_{index}"] = duration.reshape(-1)
+
+    np.savez(output_file, **arrays)
+    return output_file
+
+
+def load_references(
+    reference_file: Path,
+) -> Tuple[List[Dict[str, np.ndarray]], List[np.ndarray], List[np.ndarray]]:
+    """
+    Loads a reference synthesis.
+
+    Args:
+        reference_file (Path): The reference.npz file.
+
+    Returns:
+        Tuple[List[Dict[str, np.ndarray]], List[np.ndarray], List[np.ndarray]]: The model
+        inputs, the reference waveforms and the reference durations.
+    """
+    arrays = np.load(reference_file)
+    count = len([key for key in arrays.files if key.startswith("waveform_")])
+
+    inputs = [
+        {name: arrays[f"{name}_{index}"] for name in ("input_ids", "style", "speed")}
+        for index in range(count)
+    ]
+    waveforms = [arrays[f"waveform_{index}"] for index in range(count)]
+    durations = [arrays[f"duration_{index}"] for index in range(count)]
+
+    return inputs, waveforms, durations
+
+
+def check_references(
+    model_path: Path, reference_file: Path, precision: str
+) -> QuantizationInfo:
+    """
+    Checks a Kokoro variant against the reference synthesis of the source model: the
+    share of tokens given the same duration, and the log-mel distance of the waveforms.
+    The variant is also timed on a single CPU thread.
+
+    Args:
+        model_path (Path): The ONNX model of the variant.
+        reference_file (Path): The reference.npz file.
+        precision (str): The variant precision, "float32", "float16" or "dynamic", which
+            selects the limits.
+
+    Returns:
+        QuantizationInfo: The parity and latency of the variant, for the metadata.
+
+    Raises:
+        ValueError: If the variant exceeds the limits of its precision.
+    """
+    inputs, reference_waveforms, reference_durations = load_references(reference_file)
+
+    options = SessionOptions()
+    options.intra_op_num_threads = 1
+    session = InferenceSession(
+        str(model_path), options, providers=["CPUExecutionProvider"]
+    )
+
+    waveforms, agreeing = [], 0
+    for feed, expected in zip(inputs, reference_durations):
+        waveform, duration = session.run(None, feed)[:2]
+        waveforms.append(waveform.reshape(-1))
+        agreeing += int(np.sum(duration.reshape(-1) == expected))
+
+    agreement = agreeing / sum(len(duration) for duration in reference_durations)
+    distance, _ = mel_distance(
+        reference_waveforms, waveforms, mel_filterbank(SAMPLE_RATE)
+    )
+
+    with exclusive_timing():
+        latency = latency_ms(model_path, inputs)
+    print(
+        f"{model_path.name} ({precision}): mel distance {distance:.4f}, "
+        f"duration agreement {agreement:.1%}, latency {latency:.0f} ms"
+    )
+
+    if distance > MAX_MEL_DISTANCE[precision]:
+        raise ValueError(
+            f"{model_path.name} mel distance {distance:.4f} exceeds "
+            f"{MAX_MEL_DISTANCE[precision]} for {precision}."
+        )
+    if agreement < MIN_DURATION_AGREEMENT[precision]:
+        raise ValueError(
+            f"{model_path.name} duration agreement {agreement:.1%} is below "
+            f"{MIN_DURATION_AGREEMENT[precision]:.0%} for {precision}."
+        )
+
+    return QuantizationInfo(
+        mel_distance=distance, duration_agreement=agreement, latency_ms=latency
+    )
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Check a Kokoro ONNX variant against the reference synthesis of the
+        source model saved by the export, and time it on CPU.
+        """,
+    )
+
+    parser.add_argument(
+        "--model",
+        type=Path,
+        required=True,
+        help="The ONNX model of the variant.",
+    )
+
+    parser.add_argument(
+        "--reference",
+        type=Path,
+        required=True,
+        help=f"The {REFERENCE_FILE} file written by the export.",
+    )
+
+    parser.add_argument(
+        "--precision",
+        type=str,
+        default="float32",
+        choices=list(MAX_MEL_DISTANCE),
+        help="Precision of the variant, which selects the limits. Defaults to "
+        "'float32'.",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    check_references(args.model, args.reference, args.precision)
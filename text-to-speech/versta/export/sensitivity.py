@@ -0,0 +1,504 @@
+import json
+import os
+import time
+
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Tuple, TypedDict
+
+import numpy as np
+
+from onnxruntime import InferenceSession, SessionOptions
+
+from .analysis import GraphAnalysis
+from .calibration import CALIBRATION_METHODS, PiperCalibrationReader
+from .quantize_piper import EXCLUSIONS_FILE, voice_key
+
+# Log-mel spectrogram settings used to compare synthesized audio.
+N_FFT = 1024
+HOP_LENGTH = 256
+N_MELS = 80
+
+
+class Evaluation(TypedDict):
+    blocked_ops: List[str]
+    blocked_nodes: List[str]
+    mel_distance: float
+    duration_ratio: float
+    latency_ms: float
+    size: int
+
+
+def mel_filterbank(sample_rate: int) -> np.ndarray:
+    """
+    Builds a triangular mel filterbank (HTK mel scale) for the comparison spectrograms.
+
+    Args:
+        sample_rate (int): The audio sample rate of the voice.
+
+    Returns:
+        np.ndarray: Filterbank of shape (N_MELS, N_FFT // 2 + 1).
+    """
+    to_mel = lambda hz: 2595.0 * np.log10(1.0 + hz / 700.0)  # noqa: E731
+    to_hz = lambda mel: 700.0 * (10.0 ** (mel / 2595.0) - 1.0)  # noqa: E731
+
+    bins = np.linspace(0, sample_rate / 2, N_FFT // 2 + 1)
+    edges = to_hz(np.linspace(0, to_mel(sample_rate / 2), N_MELS + 2))
+
+    lower = (bins[None, :] - edges[:-2, None]) / (edges[1:-1, None] - edges[:-2, None])
+    upper = (edges[2:, None] - bins[None, :]) / (edges[2:, None] - edges[1:-1, None])
+    return np.maximum(0.0, np.minimum(lower, upper))
+
+
+def log_mel(audio: np.ndarray, filterbank: np.ndarray) -> np.ndarray:
+    """
+    Computes the log10 mel spectrogram of a waveform.
+
+    Args:
+        audio (np.ndarray): The waveform.
+        filterbank (np.ndarray): The mel filterbank from ``mel_filterbank``.
+
+    Returns:
+        np.ndarray: Log mel spectrogram of shape (frames, N_MELS).
+    """
+    audio = np.pad(audio.astype(np.float32), (0, max(0, N_FFT - len(audio))))
+    frames = 1 + (len(audio) - N_FFT) // HOP_LENGTH
+    index = np.arange(N_FFT)[None, :] + HOP_LENGTH * np.arange(frames)[:, None]
+    spectrum = np.abs(np.fft.rfft(audio[index] * np.hanning(N_FFT), axis=1)) ** 2
+    return np.log10(np.maximum(spectrum @ filterbank.T, 1e-5))
+
+
+def mel_distance(
+    reference: List[np.ndarray], candidate: List[np.ndarray], filterbank: np.ndarray
+) -> Tuple[float, float]:
+    """
+    Compares synthesized waveforms with the fp32 reference: the mean absolute log-mel
+    difference over the overlapping frames, and the total duration ratio (quantizing the
+    duration predictor can change the length of the audio).
+
+    Args:
+        reference (List[np.ndarray]): The fp32 waveforms.
+        candidate (List[np.ndarray]): The quantized waveforms, in the same order.
+        filterbank (np.ndarray): The mel filterbank from ``mel_filterbank``.
+
+    Returns:
+        Tuple[float, float]: The mean log-mel distance and the duration ratio.
+    """
+    distances = []
+    for expected, actual in zip(reference, candidate):
+        expected, actual = log_mel(expected, filterbank), log_mel(actual, filterbank)
+        frames = min(len(expected), len(actual))
+        distances.append(float(np.abs(expected[:frames] - actual[:frames]).mean()))
+
+    duration = sum(len(audio) for audio in candidate)
+    return float(np.mean(distances)), duration / sum(len(audio) for audio in reference)
+
+
+def synthesize(
+    model_path: Path, inputs: List[Dict[str, np.ndarray]], threads: int
+) -> Tuple[List[np.ndarray], float]:
+    """
+    Synthesizes every input with onnxruntime on CPU.
+
+    Args:
+        model_path (Path): The ONNX model.
+        inputs (List[Dict[str, np.ndarray]]): The model inputs.
+        threads (int): Number of intra-op threads.
+
+    Returns:
+        Tuple[List[np.ndarray], float]: The waveforms and the mean latency in ms.
+    """
+    options = SessionOptions()
+    options.intra_op_num_threads = threads
+    session = InferenceSession(
+        str(model_path), options, providers=["CPUExecutionProvider"]
+    )
+
+    # Warm up once, so lazy initialization is not measured.
+    session.run(None, inputs[0])
+
+    waveforms = []
+    start = time.perf_counter()
+    for feed in inputs:
+        waveforms.append(session.run(None, feed)[0].reshape(-1))
+    latency = (time.perf_counter() - start) * 1000 / len(inputs)
+
+    return waveforms, latency
+
+
+def node_groups(analysis: GraphAnalysis) -> List[str]:
+    """
+    Groups the model nodes by their top-level module (e.g. "/enc_p/", "/dp/", "/flow/",
+    "/dec/" in Piper exports), as node name prefixes for ``BLOCKED_NODES``.
+
+    Args:
+        analysis (GraphAnalysis): The analysed model.
+
+    Returns:
+        List[str]: The sorted node name prefixes.
+    """
+    groups = set()
+    for node in analysis.nodes():
+        parts = node.name.split("/")
+        if node.name.startswith("/") and len(parts) > 2:
+            groups.add(f"/{parts[1]}/")
+    return sorted(groups)
+
+
+class Sweep:
+    """
+    Quantizes a Piper model with different exclusion sets and scores each against the
+    fp32 model on a fixed phoneme set.
+    """
+
+    def __init__(
+        self,
+        input_dir: Path,
+        quantization: str,
+        calibration_method: str,
+        sentences: int,
+        threads: int,
+        work_dir: Path,
+    ):
+        self.analysis = GraphAnalysis(input_dir / "model.onnx")
+        self.quantization = quantization
+        self.calibration_method = calibration_method
+        self.threads = threads
+        self.work_dir = work_dir
+        self.config_file = input_dir / "config.json"
+
+        with open(self.config_file, "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+        # Evaluate without noise, so the fp32 and quantized outputs are deterministic and
+        # comparable; calibration keeps the default scales.
+        reader = PiperCalibrationReader(self.config_file, self.analysis.input_names())
+        self.inputs = []
+        for feed in list(iter(reader.get_next, None))[:sentences]:
+            feed["scales"] = np.array([0.0, feed["scales"][1], 0.0], dtype=np.float32)
+            self.inputs.append(feed)
+
+        self.filterbank = mel_filterbank(config["audio"]["sample_rate"])
+        self.reference, self.reference_latency = synthesize(
+            input_dir / "model.onnx", self.inputs, threads
+        )
+
+    def evaluate(self, blocked_ops: List[str], blocked_nodes: List[str]) -> Evaluation:
+        """
+        Quantizes the model with the given exclusions and scores it.
+
+        Args:
+            blocked_ops (List[str]): Operator types kept in float.
+            blocked_nodes (List[str]): Node name prefixes kept in float.
+
+        Returns:
+            Evaluation: The distance to the fp32 model, latency and model size.
+        """
+        output_path = self.work_dir / "candidate.onnx"
+
+        if self.quantization == "static":
+            reader = PiperCalibrationReader(
+                self.config_file, self.analysis.input_names()
+            )
+            self.analysis.quantize_static(
+                output_path,
+                blocked_nodes,
+                blocked_ops,
+                reader,
+                CALIBRATION_METHODS[self.calibration_method],
+            )
+        else:
+            self.analysis.quantize(output_path, blocked_nodes, blocked_ops)
+
+        waveforms, latency = synthesize(output_path, self.inputs, self.threads)
+        distance, duration_ratio = mel_distance(
+            self.reference, waveforms, self.filterbank
+        )
+
+        evaluation = Evaluation(
+            blocked_ops=blocked_ops,
+            blocked_nodes=blocked_nodes,
+            mel_distance=distance,
+            duration_ratio=duration_ratio,
+            latency_ms=latency,
+            size=output_path.stat().st_size,
+        )
+        print(
+            f"ops={blocked_ops} nodes={blocked_nodes}: mel distance {distance:.4f}, "
+            f"duration x{duration_ratio:.3f}, {latency:.1f} ms"
+        )
+
+        return evaluation
+
+
+def _meets(evaluation: Evaluation, threshold: float) -> bool:
+    return evaluation["mel_distance"] <= threshold
+
+
+def find_exclusions(
+    sweep: Sweep, include_node_groups: bool, threshold: float
+) -> Tuple[Evaluation, List[Evaluation], bool]:
+    """
+    Finds a small exclusion set meeting the quality threshold. Each candidate (operator
+    type, and optionally node group) is first excluded on its own; candidates are then
+    excluded greedily, most helpful first, until the threshold is met, after which every
+    exclusion that is not needed to stay under the threshold is dropped again.
+
+    Args:
+        sweep (Sweep): The sweep over the model.
+        include_node_groups (bool): Whether node groups are candidates too.
+        threshold (float): Maximum mean log-mel distance to the fp32 model.
+
+    Returns:
+        Tuple[Evaluation, List[Evaluation], bool]: The chosen exclusions, every
+        evaluation made, and whether the threshold was met.
+    """
+    candidates = [("op", op) for op in sweep.analysis.operators_to_quantize([])]
+    if include_node_groups:
+        candidates += [("node", group) for group in node_groups(sweep.analysis)]
+
+    def evaluate(selection: List[Tuple[str, str]]) -> Evaluation:
+        ops = [name for kind, name in selection if kind == "op"]
+        nodes = [name for kind, name in selection if kind == "node"]
+        evaluation = sweep.evaluate(ops, nodes)
+        evaluations.append(evaluation)
+        return evaluation
+
+    evaluations: List[Evaluation] = []
+
+    # Step 1: Everything quantized
+    best = evaluate([])
+    if _meets(best, threshold):
+        return best, evaluations, True
+
+    # Step 2: Exclude each candidate on its own
+    scores = {
+        candidate: evaluate([candidate])["mel_distance"] for candidate in candidates
+    }
+    ranked = [
+        candidate
+        for candidate in sorted(candidates, key=scores.get)
+        if scores[candidate] < best["mel_distance"]
+    ]
+
+    # Step 3: Exclude greedily, most helpful first, until the threshold is met
+    selection: List[Tuple[str, str]] = []
+    for candidate in ranked:
+        selection.append(candidate)
+        best = evaluate(selection)
+        if _meets(best, threshold):
+            break
+    else:
+        return best, evaluations, False
+
+    # Step 4: Drop exclusions that are not needed to meet the threshold
+    for candidate in list(selection[:-1]):
+        trial = [entry for entry in selection if entry != candidate]
+        evaluation = evaluate(trial)
+        if _meets(evaluation, threshold):
+            selection, best = trial, evaluation
+
+    return best, evaluations, True
+
+
+def save_exclusions(
+    voice: str,
+    quantization: str,
+    result: Evaluation,
+    threshold: float,
+    exclusions_file: Path,
+) -> Path:
+    """
+    Records the chosen exclusions for a voice and quantization mode in the exclusions file
+    read by ``quantize_piper``, keeping the entries of the other voices and modes.
+
+    Args:
+        voice (str): The key of the voice the exclusions were measured on.
+        quantization (str): The quantization mode the exclusions apply to.
+        result (Evaluation): The chosen exclusions and their score.
+        threshold (float): The quality threshold they meet.
+        exclusions_file (Path): The exclusions file to update.
+
+    Returns:
+        Path: The updated exclusions file.
+    """
+    exclusions = {}
+    if exclusions_file.exists():
+        with open(exclusions_file, "r", encoding="utf-8") as f:
+            exclusions = json.load(f)
+
+    exclusions.setdefault(voice, {})[quantization] = {
+        "blocked_ops": result["blocked_ops"],
+        "blocked_nodes": result["blocked_nodes"],
+        "threshold": threshold,
+        "mel_distance": result["mel_distance"],
+    }
+
+    exclusions_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(exclusions_file, "w", encoding="utf-8") as f:
+        json.dump(exclusions, f, indent=4)
+
+    return exclusions_file
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Sweep the quantization sensitivity of a Piper voice. Every quantizable
+        operator type (and optionally node group) is excluded from quantization in turn,
+        the results are synthesized with onnxruntime on CPU and compared with the fp32 model
+        (log-mel distance and latency), and the smallest exclusion set meeting the quality
+        threshold is written to the exclusions file used by the export quantization, for
+        this voice only.
+        """,
+    )
+
+    parser.add_argument(
+        "--input_dir",
+        type=Path,
+        required=True,
+        help="Directory holding the fp32 'model.onnx' and 'config.json' of the voice, "
+        "e.g. the 'intermediates/converted' directory of an export run with "
+        "--keep_intermediates.",
+    )
+
+    parser.add_argument(
+        "--quantization",
+        type=str,
+        default="dynamic",
+        choices=["dynamic", "static"],
+        help="Quantization mode to sweep. Defaults to 'dynamic'.",
+    )
+
+    parser.add_argument(
+        "--calibration_method",
+        type=str,
+        default="minmax",
+        choices=list(CALIBRATION_METHODS),
+        help="Calibration method for static quantization. Defaults to 'minmax'.",
+    )
+
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Maximum mean log10-mel distance to the fp32 model. Defaults to 0.1.",
+    )
+
+    parser.add_argument(
+        "--node_groups",
+        action="store_true",
+        default=False,
+        help="Also try excluding top-level node groups (e.g. '/dec/'), not only operator "
+        "types.",
+    )
+
+    parser.add_argument(
+        "--sentences",
+        type=int,
+        default=8,
+        help="Number of corpus sentences synthesized per evaluation. Defaults to 8.",
+    )
+
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="Number of inference threads for the latency measurement. Defaults to 1.",
+    )
+
+    parser.add_argument(
+        "--exclusions_file",
+        type=Path,
+        default=EXCLUSIONS_FILE,
+        help="Exclusions file to update. Defaults to the file read by the export module.",
+    )
+
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="Optional path to write every evaluation as JSON.",
+    )
+
+    return parser.parse_args()
+
+
+def main(
+    input_dir: Path,
+    quantization: str = "dynamic",
+    calibration_method: str = "minmax",
+    threshold: float = 0.1,
+    include_node_groups: bool = False,
+    sentences: int = 8,
+    threads: int = 1,
+    exclusions_file: Path = EXCLUSIONS_FILE,
+    report: Path = None,
+) -> Evaluation:
+    voice = voice_key(input_dir / "config.json")
+    if voice is None:
+        raise ValueError(
+            f"Cannot name the voice in {input_dir / 'config.json'}: the exclusions are "
+            "recorded per voice, which needs its language code, dataset and quality."
+        )
+
+    with TemporaryDirectory() as work_dir:
+        # Step 1: Synthesize the fp32 reference
+        sweep = Sweep(
+            input_dir,
+            quantization,
+            calibration_method,
+            sentences,
+            threads,
+            Path(work_dir),
+        )
+        print(f"fp32 reference: {sweep.reference_latency:.1f} ms")
+
+        # Step 2: Search for the smallest exclusion set meeting the threshold
+        result, evaluations, met = find_exclusions(
+            sweep, include_node_groups, threshold
+        )
+
+    if report is not None:
+        with open(report, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "reference_latency_ms": sweep.reference_latency,
+                    "evaluations": evaluations,
+                },
+                f,
+                indent=4,
+            )
+
+    if not met:
+        print(
+            f"No exclusion set meets the threshold {threshold}; the exclusions file is "
+            "left unchanged."
+        )
+        return result
+
+    # Step 3: Feed the exclusions back into the export quantization
+    save_exclusions(voice, quantization, result, threshold, exclusions_file)
+    print(
+        f"Exclusions for {voice} ({quantization} quantization): ops={result['blocked_ops']} "
+        f"nodes={result['blocked_nodes']} (mel distance {result['mel_distance']:.4f}) "
+        f"written to {exclusions_file}"
+    )
+
+    return result
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    main(
+        input_dir=args.input_dir,
+        quantization=args.quantization,
+        calibration_method=args.calibration_method,
+        threshold=args.threshold,
+        include_node_groups=args.node_groups,
+        sentences=args.sentences,
+        threads=args.threads,
+        exclusions_file=args.exclusions_file,
+        report=args.report,
+    )
@@ -0,0 +1,581 @@
+import os
+import zlib
+
+from argparse import ArgumentParser
+from collections import defaultdict
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Dict, List, Set
+
+import numpy as np
+
+from onnx import AttributeProto, ModelProto, NodeProto, helper, load, numpy_helper, save
+from onnx import shape_inference
+from onnxruntime import GraphOptimizationLevel, InferenceSession, SessionOptions
+
+from .convert_ort import exclusive_timing, latency_ms, timing_inputs
+from .typing import SimplificationInfo
+
+# Operators whose outputs are not a function of their inputs, and so are never folded.
+NONDETERMINISTIC_OPS = {
+    "RandomNormal",
+    "RandomNormalLike",
+    "RandomUniform",
+    "RandomUniformLike",
+    "Multinomial",
+    "Bernoulli",
+}
+
+# Folded tensors may always take this many bytes; larger ones only when they are no larger
+# than the constants they are computed from, so folding never inflates the model (e.g. by
+# materializing a ConstantOfShape or an Expand).
+FOLD_LIMIT = 1 << 20
+
+MAX_PASSES = 8
+
+# Maximum absolute output difference accepted by the parity check.
+TOLERANCE = 1e-4
+
+
+def _consumers(model: ModelProto) -> Dict[str, list]:
+    consumers = defaultdict(list)
+    for node in model.graph.node:
+        for name in node.input:
+            consumers[name].append(node)
+    return consumers
+
+
+def _replace_input(model: ModelProto, old: str, new: str):
+    for node in model.graph.node:
+        for i, name in enumerate(node.input):
+            if name == old:
+                node.input[i] = new
+
+
+def _static_shapes(model: ModelProto) -> Dict[str, List[int]]:
+    """
+    Gets the fully known tensor shapes of a shape-inferred model.
+    """
+    shapes = {}
+    for value in [*model.graph.value_info, *model.graph.input, *model.graph.output]:
+        shape = value.type.tensor_type.shape
+        if value.type.tensor_type.HasField("shape") and all(
+            dim.HasField("dim_value") for dim in shape.dim
+        ):
+            shapes[value.name] = [dim.dim_value for dim in shape.dim]
+    return shapes
+
+
+def _shape_value(node: NodeProto, static_shapes: Dict[str, List[int]]) -> List[int]:
+    """
+    Evaluates a Shape node on an input with a fully known shape, honouring the "start"
+    and "end" attributes (opset 15) that select a slice of the dimensions. Out of range
+    and negative bounds are clamped and counted from the back, as ONNX specifies, which
+    is what Python slicing does.
+
+    Args:
+        node (NodeProto): The Shape node.
+        static_shapes (Dict[str, List[int]]): The fully known shapes, by tensor name.
+
+    Returns:
+        List[int]: The output of the node.
+    """
+    attributes = {
+        attribute.name: helper.get_attribute_value(attribute)
+        for attribute in node.attribute
+    }
+    return static_shapes[node.input[0]][
+        attributes.get("start", 0) : attributes.get("end")
+    ]
+
+
+def fold_constants(model: ModelProto) -> int:
+    """
+    Folds every node computed from constants alone (initializers, Constant nodes, and the
+    Shape of tensors with a fully known shape) into initializers. The foldable nodes are
+    evaluated together in a single onnxruntime session.
+
+    Args:
+        model (ModelProto): The shape-inferred model, modified in place.
+
+    Returns:
+        int: The number of folded tensors.
+    """
+    graph = model.graph
+    graph_inputs = {value.name for value in graph.input}
+    sizes = {
+        initializer.name: numpy_helper.to_array(initializer).nbytes
+        for initializer in graph.initializer
+        if initializer.name not in graph_inputs
+    }
+    static_shapes = _static_shapes(model)
+
+    # Propagate constness through the (topologically sorted) nodes
+    constant_nodes = []
+    for node in graph.node:
+        if node.op_type == "Shape" and node.input[0] in static_shapes:
+            sizes[node.output[0]] = 8 * len(_shape_value(node, static_shapes))
+            constant_nodes.append(node)
+            continue
+
+        if (
+            node.domain not in ("", "ai.onnx")
+            or node.op_type in NONDETERMINISTIC_OPS
+            or any(
+                attribute.type == AttributeProto.GRAPH for attribute in node.attribute
+            )
+            or not all(name in sizes for name in node.input if name)
+        ):
+            continue
+
+        source = sum(sizes[name] for name in node.input if name)
+        if node.op_type == "Constant":
+            source = FOLD_LIMIT
+        for output in node.output:
+            sizes[output] = source
+        constant_nodes.append(node)
+
+    constant_ids = {id(node) for node in constant_nodes}
+    consumers = _consumers(model)
+    graph_outputs = {value.name for value in graph.output}
+
+    # Only the constants used by the rest of the graph are materialized
+    boundary = [
+        output
+        for node in constant_nodes
+        for output in node.output
+        if output in graph_outputs
+        or any(id(consumer) not in constant_ids for consumer in consumers[output])
+    ]
+    if not boundary:
+        return 0
+
+    # Shapes known ahead of time are evaluated as constants
+    evaluation_nodes = [
+        helper.make_node(
+            "Constant",
+            [],
+            [node.output[0]],
+            value=numpy_helper.from_array(
+                np.array(_shape_value(node, static_shapes), dtype=np.int64)
+            ),
+        )
+        if node.op_type == "Shape"
+        else node
+        for node in constant_nodes
+    ]
+    used = {name for node in evaluation_nodes for name in node.input}
+
+    evaluation = helper.make_graph(
+        evaluation_nodes,
+        "fold_constants",
+        [],
+        [helper.make_empty_tensor_value_info(name) for name in boundary],
+        [initializer for initializer in graph.initializer if initializer.name in used],
+    )
+    evaluation_model = helper.make_model(evaluation, opset_imports=model.opset_import)
+    evaluation_model.ir_version = model.ir_version
+
+    options = SessionOptions()
+    options.graph_optimization_level = GraphOptimizationLevel.ORT_DISABLE_ALL
+    session = InferenceSession(
+        evaluation_model.SerializeToString(),
+        options,
+        providers=["CPUExecutionProvider"],
+    )
+    values = dict(zip(boundary, session.run(boundary, {})))
+
+    folded = {
+        name
+        for name, value in values.items()
+        if value.nbytes <= max(FOLD_LIMIT, sizes[name]) and name not in graph_outputs
+    }
+
+    # Replace the producers whose used outputs were all folded
+    replaced = 0
+    for node in constant_nodes:
+        outputs = [output for output in node.output if output in values]
+        if outputs and all(output in folded for output in outputs):
+            graph.node.remove(node)
+            for output in outputs:
+                graph.initializer.append(
+                    numpy_helper.from_array(values[output], output)
+                )
+            replaced += len(outputs)
+
+    return replaced
+
+
+def eliminate_identities(model: ModelProto) -> int:
+    """
+    Removes Identity nodes, and Dropout nodes whose mask is unused (inference is never in
+    training mode), by connecting their consumers to their input.
+
+    Args:
+        model (ModelProto): The model, modified in place.
+
+    Returns:
+        int: The number of removed nodes.
+    """
+    graph = model.graph
+    graph_outputs = {value.name for value in graph.output}
+    consumers = _consumers(model)
+    removed = 0
+
+    for node in list(graph.node):
+        is_identity = node.op_type == "Identity" or (
+            node.op_type == "Dropout"
+            and (len(node.output) < 2 or not consumers[node.output[1]])
+            and len(node.input) < 3
+        )
+        if not is_identity or node.output[0] in graph_outputs:
+            continue
+
+        _replace_input(model, node.output[0], node.input[0])
+        graph.node.remove(node)
+        removed += 1
+
+    return removed
+
+
+def cancel_transposes_and_reshapes(model: ModelProto) -> int:
+    """
+    Merges chains of two Transposes into one, removing it entirely when the permutations
+    cancel out, bypasses Reshapes feeding another Reshape with an explicit target shape,
+    and removes Reshapes that keep the (fully known) shape of their input.
+
+    Args:
+        model (ModelProto): The shape-inferred model, modified in place.
+
+    Returns:
+        int: The number of rewritten nodes.
+    """
+    graph = model.graph
+    graph_outputs = {value.name for value in graph.output}
+    producers = {output: node for node in graph.node for output in node.output}
+    initializers = {initializer.name: initializer for initializer in graph.initializer}
+    static_shapes = _static_shapes(model)
+    rewritten = 0
+
+    for node in list(graph.node):
+        previous = producers.get(node.input[0]) if node.input else None
+
+        if (
+            node.op_type == "Transpose"
+            and previous is not None
+            and previous.op_type == "Transpose"
+            and node.attribute
+            and previous.attribute
+        ):
+            first = helper.get_attribute_value(previous.attribute[0])
+            second = helper.get_attribute_value(node.attribute[0])
+            composed = [first[axis] for axis in second]
+
+            if composed == sorted(composed) and node.output[0] not in graph_outputs:
+                _replace_input(model, node.output[0], previous.input[0])
+                graph.node.remove(node)
+            else:
+                node.input[0] = previous.input[0]
+                del node.attribute[:]
+                node.attribute.append(helper.make_attribute("perm", composed))
+            rewritten += 1
+
+        elif node.op_type == "Reshape":
+            shape = initializers.get(node.input[1])
+            input_shape = static_shapes.get(node.input[0])
+
+            if (
+                input_shape is not None
+                and input_shape == static_shapes.get(node.output[0])
+                and node.output[0] not in graph_outputs
+            ):
+                _replace_input(model, node.output[0], node.input[0])
+                graph.node.remove(node)
+                rewritten += 1
+            elif (
+                previous is not None
+                and previous.op_type == "Reshape"
+                and shape is not None
+                and 0 not in numpy_helper.to_array(shape)
+            ):
+                node.input[0] = previous.input[0]
+                rewritten += 1
+
+    return rewritten
+
+
+def eliminate_dead_nodes(model: ModelProto) -> int:
+    """
+    Removes the nodes the graph outputs do not depend on, and unused initializers.
+
+    Args:
+        model (ModelProto): The model, modified in place.
+
+    Returns:
+        int: The number of removed nodes and initializers.
+    """
+    graph = model.graph
+    producers = {output: node for node in graph.node for output in node.output}
+    needed: Set[str] = set()
+    live: Set[int] = set()
+    stack = [value.name for value in graph.output]
+
+    while stack:
+        name = stack.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        node = producers.get(name)
+        if node is not None and id(node) not in live:
+            live.add(id(node))
+            stack.extend(node.input)
+            # Subgraphs may use outer scope values without listing them as inputs
+            for attribute in node.attribute:
+                if attribute.type == AttributeProto.GRAPH:
+                    stack.extend(
+                        name for inner in attribute.g.node for name in inner.input
+                    )
+
+    removed = 0
+    for node in list(graph.node):
+        if id(node) not in live:
+            graph.node.remove(node)
+            removed += 1
+
+    for initializer in list(graph.initializer):
+        if initializer.name not in needed:
+            graph.initializer.remove(initializer)
+            removed += 1
+
+    return removed
+
+
+def deduplicate_initializers(model: ModelProto) -> int:
+    """
+    Replaces initializers holding the same values, type and shape as an earlier one by
+    that initializer.
+
+    Args:
+        model (ModelProto): The model, modified in place.
+
+    Returns:
+        int: The number of removed initializers.
+    """
+    graph = model.graph
+    graph_inputs = {value.name for value in graph.input}
+    seen = {}
+    removed = 0
+
+    for initializer in list(graph.initializer):
+        if initializer.name in graph_inputs:
+            continue
+
+        value = numpy_helper.to_array(initializer)
+        key = (initializer.data_type, tuple(initializer.dims), value.tobytes())
+        if key not in seen:
+            seen[key] = initializer.name
+            continue
+
+        _replace_input(model, initializer.name, seen[key])
+        graph.initializer.remove(initializer)
+        removed += 1
+
+    return removed
+
+
+def simplify(model: ModelProto) -> ModelProto:
+    """
+    Simplifies a model until no pass finds anything left to do: shape inference, constant
+    folding, identity and dead node elimination, Transpose and Reshape cancellation, and
+    initializer deduplication.
+
+    Args:
+        model (ModelProto): The model.
+
+    Returns:
+        ModelProto: The simplified, shape-inferred model.
+    """
+    for _ in range(MAX_PASSES):
+        del model.graph.value_info[:]
+        model = shape_inference.infer_shapes(model)
+
+        changes = (
+            fold_constants(model)
+            + eliminate_identities(model)
+            + cancel_transposes_and_reshapes(model)
+            + eliminate_dead_nodes(model)
+            + deduplicate_initializers(model)
+        )
+        if not changes:
+            break
+
+    del model.graph.value_info[:]
+    return shape_inference.infer_shapes(model)
+
+
+def _initializer_bytes(model: ModelProto) -> int:
+    return sum(
+        numpy_helper.to_array(initializer).nbytes
+        for initializer in model.graph.initializer
+    )
+
+
+def _seeded(model_path: Path, output_path: Path) -> Path:
+    """
+    Copies a model with a fixed seed, derived from the node name, on every random node,
+    so a model and its simplified version draw the same noise.
+    """
+    model = load(model_path)
+    for node in model.graph.node:
+        seeded = any(attribute.name == "seed" for attribute in node.attribute)
+        if node.op_type in NONDETERMINISTIC_OPS and not seeded:
+            node.attribute.extend(
+                [helper.make_attribute("seed", float(zlib.crc32(node.name.encode())))]
+            )
+
+    save(model, output_path)
+    return output_path
+
+
+def check_parity(
+    model_path: Path,
+    simplified_path: Path,
+    inputs: List[Dict[str, np.ndarray]],
+    tolerance: float = TOLERANCE,
+) -> float:
+    """
+    Checks that a simplified model computes the same outputs as the original one on
+    sample inputs, with the random nodes of both seeded alike.
+
+    Args:
+        model_path (Path): The original model.
+        simplified_path (Path): The simplified model.
+        inputs (List[Dict[str, np.ndarray]]): The sample inputs.
+        tolerance (float): Maximum absolute output difference.
+
+    Returns:
+        float: The largest absolute output difference.
+
+    Raises:
+        ValueError: If the outputs differ in shape or by more than ``tolerance``.
+    """
+    with TemporaryDirectory() as temp_dir:
+        sessions = [
+            InferenceSession(
+                str(_seeded(path, Path(temp_dir) / f"{index}.onnx")),
+                providers=["CPUExecutionProvider"],
+            )
+            for index, path in enumerate([model_path, simplified_path])
+        ]
+
+    largest = 0.0
+    for feed in inputs:
+        expected, actual = [session.run(None, feed) for session in sessions]
+        for expected_output, actual_output in zip(expected, actual):
+            if expected_output.shape != actual_output.shape:
+                raise ValueError(f"{simplified_path.name} output shapes differ.")
+            difference = np.abs(
+                actual_output.astype(np.float64) - expected_output.astype(np.float64)
+            ).max(initial=0.0)
+            largest = max(largest, float(difference))
+
+    if largest > tolerance:
+        raise ValueError(
+            f"{simplified_path.name} outputs differ by {largest:.2e} from the original."
+        )
+
+    return largest
+
+
+def simplify_model(
+    model_path: Path, output_path: Path, inputs_dir: Path
+) -> SimplificationInfo:
+    """
+    Simplifies an ONNX model ahead of quantization, checks that it still computes the same
+    outputs, and reports the node count, initializer size and CPU latency before and
+    after.
+
+    Args:
+        model_path (Path): The ONNX model.
+        output_path (Path): Path of the simplified model to write; may be the input.
+        inputs_dir (Path): Path to the converted model directory, whose vocabulary (and
+            voices) the sample inputs are built from.
+
+    Returns:
+        SimplificationInfo: The measurements before and after, for the metadata.
+    """
+    print(f"Simplifying {model_path.name}...")
+    model = load(model_path)
+    nodes_before, bytes_before = len(model.graph.node), _initializer_bytes(model)
+
+    simplified = simplify(model)
+
+    with TemporaryDirectory() as temp_dir:
+        simplified_path = Path(temp_dir) / model_path.name
+        save(simplified, simplified_path)
+
+        inputs = timing_inputs(inputs_dir, model_path)
+        difference = check_parity(model_path, simplified_path, inputs)
+        with exclusive_timing():
+            latency_before = latency_ms(model_path, inputs)
+            latency_after = latency_ms(simplified_path, inputs)
+
+        save(simplified, output_path)
+
+    info = SimplificationInfo(
+        nodes_before=nodes_before,
+        nodes_after=len(simplified.graph.node),
+        initializer_bytes_before=bytes_before,
+        initializer_bytes_after=_initializer_bytes(simplified),
+        latency_before_ms=latency_before,
+        latency_after_ms=latency_after,
+        max_difference=difference,
+    )
+    print(
+        f"Simplified {model_path.name}: {info['nodes_before']} -> {info['nodes_after']} "
+        f"nodes, {info['initializer_bytes_before'] >> 10} -> "
+        f"{info['initializer_bytes_after'] >> 10} KiB of initializers, "
+        f"{latency_before:.1f} -> {latency_after:.1f} ms, "
+        f"largest difference {difference:.2e}"
+    )
+
+    return info
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Simplify an exported ONNX voice before quantization: shape
+        inference, constant folding, identity and dead node elimination, Transpose and
+        Reshape cancellation, and initializer deduplication. Reports the node count,
+        initializer size and CPU latency before and after, and checks output parity.
+        """,
+    )
+
+    parser.add_argument(
+        "--input_dir",
+        type=Path,
+        required=True,
+        help="Converted model directory holding the ONNX model and its vocab.bin.",
+    )
+
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="model.onnx",
+        help="File name of the ONNX model to simplify. Defaults to 'model.onnx'.",
+    )
+
+    parser.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="Path of the simplified model to write.",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    simplify_model(args.input_dir / args.model, args.output, args.input_dir)
@@ -0,0 +1,221 @@
+import json
+import os
+
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from onnx import load, numpy_helper, save
+from onnxruntime import GraphOptimizationLevel, InferenceSession, SessionOptions
+
+from .typing import SpeakerInfo
+
+SPEAKER_INPUT = "sid"
+
+# Maximum absolute sample difference accepted by the parity check.
+TOLERANCE = 1e-4
+
+
+def speaker_name(config_file: Path, speaker: int) -> str:
+    """
+    Gets the name of a speaker from the speaker_id_map of a Piper config.
+
+    Args:
+        config_file (Path): The config.json of the voice.
+        speaker (int): The speaker id.
+
+    Returns:
+        str: The speaker name, or the id when the config does not name it.
+    """
+    with open(config_file, "r", encoding="utf-8") as f:
+        speakers = json.load(f).get("speaker_id_map", {})
+
+    names = {index: name for name, index in speakers.items()}
+    return names.get(speaker, str(speaker))
+
+
+def bake_speaker(
+    model_path: Path, speaker: int, output_path: Path, name: str = None
+) -> SpeakerInfo:
+    """
+    Bakes one speaker of a multi-speaker Piper model into the graph. The speaker embedding
+    lookup is replaced by the embedding of the chosen speaker as a constant, the embedding
+    table and the "sid" input are dropped, and the graph is constant folded, so everything
+    computed from the embedding alone (the speaker conditioning of the duration predictor,
+    the flow and the decoder) is folded into constants as well.
+
+    Args:
+        model_path (Path): The multi-speaker Piper ONNX model.
+        speaker (int): The speaker id to bake in.
+        output_path (Path): Path of the single-speaker model to write.
+        name (str): The speaker name, defaulting to its id.
+
+    Returns:
+        SpeakerInfo: The baked speaker and the model sizes, for the metadata.
+
+    Raises:
+        ValueError: If the model has no speaker input, uses it for anything but one
+            embedding lookup, or has no such speaker.
+    """
+    model = load(model_path)
+    graph = model.graph
+
+    consumers = [node for node in graph.node if SPEAKER_INPUT in node.input]
+    if SPEAKER_INPUT not in {value.name for value in graph.input}:
+        raise ValueError(f"{model_path.name} is not a multi-speaker model.")
+    if len(consumers) != 1 or consumers[0].op_type != "Gather":
+        raise ValueError(f"Unexpected use of '{SPEAKER_INPUT}' in {model_path.name}.")
+
+    lookup = consumers[0]
+    initializers = {initializer.name: initializer for initializer in graph.initializer}
+    table = numpy_helper.to_array(initializers[lookup.input[0]])
+
+    if not 0 <= speaker < table.shape[0]:
+        raise ValueError(
+            f"Speaker {speaker} does not exist; the model has {table.shape[0]} speakers."
+        )
+
+    # The lookup output becomes a constant holding the embedding of the speaker
+    graph.node.remove(lookup)
+    graph.initializer.append(
+        numpy_helper.from_array(table[[speaker]], lookup.output[0])
+    )
+
+    if not any(lookup.input[0] in node.input for node in graph.node):
+        graph.initializer.remove(initializers[lookup.input[0]])
+
+    graph.input.remove(
+        next(value for value in graph.input if value.name == SPEAKER_INPUT)
+    )
+
+    with TemporaryDirectory() as temp_dir:
+        baked_path = Path(temp_dir) / "baked.onnx"
+        save(model, baked_path)
+
+        # Basic optimizations only rewrite the graph with standard ONNX operators:
+        # constant folding, redundant node elimination and simple fusions.
+        options = SessionOptions()
+        options.graph_optimization_level = GraphOptimizationLevel.ORT_ENABLE_BASIC
+        options.optimized_model_filepath = str(output_path)
+        InferenceSession(str(baked_path), options, providers=["CPUExecutionProvider"])
+
+    original_size, size = model_path.stat().st_size, output_path.stat().st_size
+    print(
+        f"Baked speaker {speaker} into {output_path.name}: "
+        f"{original_size >> 10} KiB -> {size >> 10} KiB"
+    )
+
+    return SpeakerInfo(
+        id=speaker,
+        name=name or str(speaker),
+        original_size=original_size,
+        size=size,
+    )
+
+
+def check_speaker(
+    model_path: Path,
+    baked_path: Path,
+    config_file: Path,
+    speaker: int,
+    tolerance: float = TOLERANCE,
+    phonemes: int = 64,
+) -> float:
+    """
+    Checks that a single-speaker model synthesizes the same audio as the multi-speaker
+    model it was baked from does for that speaker, on a seeded phoneme sequence with
+    noise disabled so the synthesis is deterministic.
+
+    Args:
+        model_path (Path): The multi-speaker Piper ONNX model.
+        baked_path (Path): The single-speaker model.
+        config_file (Path): The config.json of the voice.
+        speaker (int): The baked speaker id.
+        tolerance (float): Maximum absolute sample difference.
+        phonemes (int): Length of the phoneme sequence.
+
+    Returns:
+        float: The largest absolute sample difference.
+
+    Raises:
+        ValueError: If the outputs differ by more than ``tolerance``.
+    """
+    with open(config_file, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    ids = sorted({ids[0] for ids in config["phoneme_id_map"].values()})
+    sequence = np.random.default_rng(0).choice(ids, size=phonemes)
+
+    feed = {
+        "input": np.array([sequence], dtype=np.int64),
+        "input_lengths": np.array([phonemes], dtype=np.int64),
+        "scales": np.array([0.0, 1.0, 0.0], dtype=np.float32),
+    }
+
+    baked = InferenceSession(str(baked_path), providers=["CPUExecutionProvider"])
+    original = InferenceSession(str(model_path), providers=["CPUExecutionProvider"])
+
+    actual = baked.run(None, feed)[0]
+    feed[SPEAKER_INPUT] = np.array([speaker], dtype=np.int64)
+    expected = original.run(None, feed)[0]
+
+    if actual.shape != expected.shape:
+        raise ValueError(f"Speaker {speaker} output length differs from the original.")
+
+    difference = float(np.abs(actual - expected).max())
+    print(f"Speaker {speaker} parity: {difference:.2e} (tolerance {tolerance:.0e})")
+
+    if difference > tolerance:
+        raise ValueError(f"Speaker {speaker} output differs from the original model.")
+
+    return difference
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Bake one speaker of a multi-speaker Piper voice into a smaller
+        single-speaker model, and check it against the original for that speaker.
+        """,
+    )
+
+    parser.add_argument(
+        "--input_dir",
+        type=Path,
+        required=True,
+        help="Directory holding the Piper 'model.onnx' and 'config.json'.",
+    )
+
+    parser.add_argument(
+        "--speaker",
+        type=int,
+        required=True,
+        help="The speaker id to bake in.",
+    )
+
+    parser.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="Path of the single-speaker model to write.",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    bake_speaker(
+        args.input_dir / "model.onnx",
+        args.speaker,
+        args.output,
+        speaker_name(args.input_dir / "config.json", args.speaker),
+    )
+    check_speaker(
+        args.input_dir / "model.onnx",
+        args.output,
+        args.input_dir / "config.json",
+        args.speaker,
+    )
@@ -0,0 +1,434 @@
+import json
+import os
+
+from argparse import ArgumentParser
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Set
+
+import numpy as np
+
+from onnx import ModelProto, TensorProto, helper, load, save, shape_inference
+from onnxruntime import InferenceSession
+
+from .typing import SplitInfo
+
+# The decoder part starts at the flow: every node downstream of a "/flow/" node (the flow
+# and the HiFi-GAN decoder of Piper's VITS graph) goes to the decoder, everything else
+# (text encoder, duration predictor, alignment and prior sampling) to the encoder.
+DECODER_PREFIX = "/flow/"
+
+# Default decoder chunking: latent frames per chunk, and frames of context added on both
+# sides of a chunk, which must cover the receptive field of the flow and the decoder.
+CHUNK_FRAMES = 64
+CONTEXT_FRAMES = 48
+
+# Maximum absolute sample difference accepted by the parity check.
+TOLERANCE = 1e-3
+
+
+def _decoder_nodes(model: ModelProto) -> Set[int]:
+    """
+    Selects the decoder nodes: every node reachable from a flow node, together with the
+    constants and integer (shape) computations they consume, so the decoder only takes
+    float latents as inputs and works for any chunk length.
+
+    Args:
+        model (ModelProto): The shape-inferred Piper model.
+
+    Returns:
+        Set[int]: Indices of the decoder nodes in the graph.
+
+    Raises:
+        ValueError: If the graph has no flow nodes.
+    """
+    graph = model.graph
+    producers = {
+        output: i for i, node in enumerate(graph.node) for output in node.output
+    }
+    consumers = defaultdict(list)
+    for i, node in enumerate(graph.node):
+        for name in node.input:
+            consumers[name].append(i)
+
+    stack = [
+        i for i, node in enumerate(graph.node) if node.name.startswith(DECODER_PREFIX)
+    ]
+    if not stack:
+        raise ValueError(f"No '{DECODER_PREFIX}' nodes found; not a Piper VITS graph.")
+
+    selected = set()
+    while stack:
+        i = stack.pop()
+        if i in selected:
+            continue
+        selected.add(i)
+        for output in graph.node[i].output:
+            stack.extend(consumers[output])
+
+    float_tensors = _float_tensors(model)
+
+    # Pull in producers of non-float boundary tensors until only float latents remain.
+    changed = True
+    while changed:
+        changed = False
+        for i in list(selected):
+            for name in graph.node[i].input:
+                producer = producers.get(name)
+                if producer is None or producer in selected:
+                    continue
+                if (
+                    graph.node[producer].op_type == "Constant"
+                    or name not in float_tensors
+                ):
+                    selected.add(producer)
+                    changed = True
+
+    return selected
+
+
+def _float_tensors(model: ModelProto) -> Set[str]:
+    return {
+        value.name
+        for value in [*model.graph.value_info, *model.graph.input, *model.graph.output]
+        if value.type.tensor_type.elem_type == TensorProto.FLOAT
+    }
+
+
+def _boundary(model: ModelProto, selected: Set[int]) -> List[str]:
+    """
+    Gets the tensors the decoder consumes from the encoder, in graph order.
+    """
+    graph = model.graph
+    produced = {output for i in selected for output in graph.node[i].output}
+    initializers = {initializer.name for initializer in graph.initializer}
+
+    boundary = []
+    for i in sorted(selected):
+        for name in graph.node[i].input:
+            if name and name not in produced and name not in initializers:
+                if name not in boundary:
+                    boundary.append(name)
+
+    return boundary
+
+
+def _boundary_names(model: ModelProto, boundary: List[str]) -> Dict[str, str]:
+    """
+    Names the boundary tensors after what they hold in Piper's VITS graph, by their
+    inferred shapes: the [1, 1, frames] mask "y_mask", the [1, channels, 1] speaker
+    embedding "g" and the [1, channels, frames] prior sample "z_p". Tensors that cannot
+    be told apart keep a positional "latent_<n>" name.
+    """
+    shapes = {
+        value.name: [
+            dim.dim_value if dim.HasField("dim_value") else None
+            for dim in value.type.tensor_type.shape.dim
+        ]
+        for value in [*model.graph.value_info, *model.graph.input]
+    }
+
+    names = {}
+    for position, tensor in enumerate(boundary):
+        shape = shapes.get(tensor, [])
+        if tensor in {value.name for value in model.graph.input}:
+            names[tensor] = tensor
+        elif len(shape) == 3 and shape[1] == 1:
+            names[tensor] = "y_mask"
+        elif len(shape) == 3 and shape[2] == 1:
+            names[tensor] = "g"
+        elif len(shape) == 3:
+            names[tensor] = "z_p"
+        else:
+            names[tensor] = f"latent_{position}"
+
+    if len(set(names.values())) != len(names):
+        names = {tensor: f"latent_{i}" for i, tensor in enumerate(boundary)}
+
+    return names
+
+
+def _subgraph(
+    model: ModelProto,
+    nodes: List[int],
+    inputs: List[str],
+    outputs: List[str],
+    names: Dict[str, str],
+    graph_name: str,
+) -> ModelProto:
+    """
+    Builds a standalone model from a subset of the graph nodes, keeping only the nodes the
+    outputs depend on and the initializers they use, and renaming the boundary tensors.
+    """
+    graph = model.graph
+    producers = {output: i for i in nodes for output in graph.node[i].output if output}
+
+    # Keep the nodes the outputs depend on, stopping at the subgraph inputs
+    needed = set()
+    stack = [producers[name] for name in outputs if name in producers]
+    while stack:
+        i = stack.pop()
+        if i in needed:
+            continue
+        needed.add(i)
+        stack.extend(
+            producers[name]
+            for name in graph.node[i].input
+            if name in producers and name not in inputs
+        )
+
+    values = {
+        value.name: value for value in [*graph.value_info, *graph.input, *graph.output]
+    }
+
+    def value_info(name: str):
+        value = values.get(name)
+        if value is None:
+            return helper.make_tensor_value_info(
+                names.get(name, name), TensorProto.FLOAT, None
+            )
+        renamed = type(value)()
+        renamed.CopyFrom(value)
+        renamed.name = names.get(name, name)
+        return renamed
+
+    new_nodes = []
+    for i in sorted(needed):
+        node = type(graph.node[i])()
+        node.CopyFrom(graph.node[i])
+        node.input[:] = [names.get(name, name) for name in node.input]
+        node.output[:] = [names.get(name, name) for name in node.output]
+        new_nodes.append(node)
+
+    used = {name for node in new_nodes for name in node.input}
+    subgraph = helper.make_graph(
+        new_nodes,
+        graph_name,
+        [value_info(name) for name in inputs],
+        [value_info(name) for name in outputs],
+        [initializer for initializer in graph.initializer if initializer.name in used],
+    )
+
+    result = helper.make_model(subgraph, opset_imports=model.opset_import)
+    result.ir_version = model.ir_version
+    return result
+
+
+def split_piper(model_path: Path, output_dir: Path) -> List[str]:
+    """
+    Splits a Piper VITS model into an encoder (text encoder, duration predictor and
+    prior sampling: phonemes to latent frames) and a decoder (flow and HiFi-GAN vocoder:
+    latent frames to audio), written as "encoder.onnx" and "decoder.onnx". The decoder is
+    convolutional over the frames, so it can vocode the latents in chunks.
+
+    Args:
+        model_path (Path): The Piper ONNX model.
+        output_dir (Path): Directory where the encoder and decoder are written.
+
+    Returns:
+        List[str]: The decoder input names.
+    """
+    model = shape_inference.infer_shapes(load(model_path))
+    graph = model.graph
+
+    decoder = _decoder_nodes(model)
+    boundary = _boundary(model, decoder)
+    names = _boundary_names(model, boundary)
+
+    model_inputs = [value.name for value in graph.input]
+    model_outputs = [value.name for value in graph.output]
+    latents = [name for name in boundary if name not in model_inputs]
+
+    encoder_model = _subgraph(
+        model,
+        [i for i in range(len(graph.node)) if i not in decoder],
+        model_inputs,
+        latents,
+        names,
+        "piper_encoder",
+    )
+    decoder_model = _subgraph(
+        model, sorted(decoder), boundary, model_outputs, names, "piper_decoder"
+    )
+
+    save(encoder_model, output_dir / "encoder.onnx")
+    save(decoder_model, output_dir / "decoder.onnx")
+
+    decoder_inputs = [names[name] for name in boundary]
+    print(f"Split {model_path.name}: decoder inputs {decoder_inputs}")
+
+    return decoder_inputs
+
+
+def decode_chunked(
+    decoder: InferenceSession,
+    latents: Dict[str, np.ndarray],
+    chunk_frames: int = CHUNK_FRAMES,
+    context_frames: int = CONTEXT_FRAMES,
+) -> np.ndarray:
+    """
+    Vocodes latent frames chunk by chunk, as the app does while streaming. Each chunk is
+    decoded with ``context_frames`` of surrounding frames on both sides, whose audio is
+    then dropped, so the chunks join up seamlessly.
+
+    Args:
+        decoder (InferenceSession): The decoder session.
+        latents (Dict[str, np.ndarray]): The decoder inputs from the encoder.
+        chunk_frames (int): Latent frames per chunk.
+        context_frames (int): Context frames on both sides of a chunk.
+
+    Returns:
+        np.ndarray: The audio samples.
+    """
+    timed = [
+        model_input.name
+        for model_input in decoder.get_inputs()
+        if not isinstance(model_input.shape[-1], int)
+    ]
+    frames = latents[timed[0]].shape[-1]
+
+    audio = []
+    for start in range(0, frames, chunk_frames):
+        end = min(start + chunk_frames, frames)
+        low, high = max(0, start - context_frames), min(frames, end + context_frames)
+
+        feed = {
+            name: value[..., low:high] if name in timed else value
+            for name, value in latents.items()
+        }
+        samples = decoder.run(None, feed)[0].reshape(-1)
+        hop = samples.size // (high - low)
+        audio.append(samples[(start - low) * hop : (end - low) * hop])
+
+    return np.concatenate(audio)
+
+
+def check_split(
+    model_dir: Path,
+    chunk_frames: int = CHUNK_FRAMES,
+    context_frames: int = CONTEXT_FRAMES,
+    tolerance: float = TOLERANCE,
+    phonemes: int = 200,
+) -> SplitInfo:
+    """
+    Checks that the split model synthesizes the same audio as the whole model: the
+    single-shot decoder output must match the whole model, and the chunked decoder output
+    must match the single-shot one, within ``tolerance``. A long, seeded phoneme sequence
+    is used, with noise disabled so the synthesis is deterministic.
+
+    Args:
+        model_dir (Path): Directory holding model.onnx, encoder.onnx, decoder.onnx and
+            config.json.
+        chunk_frames (int): Latent frames per chunk.
+        context_frames (int): Context frames on both sides of a chunk.
+        tolerance (float): Maximum absolute sample difference.
+        phonemes (int): Length of the phoneme sequence.
+
+    Returns:
+        SplitInfo: The decoder interface and chunking, for the metadata.
+
+    Raises:
+        ValueError: If the outputs differ by more than ``tolerance``.
+    """
+    with open(model_dir / "config.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    ids = sorted({ids[0] for ids in config["phoneme_id_map"].values()})
+    sequence = np.random.default_rng(0).choice(ids, size=phonemes)
+
+    model = InferenceSession(str(model_dir / "model.onnx"))
+    encoder = InferenceSession(str(model_dir / "encoder.onnx"))
+    decoder = InferenceSession(str(model_dir / "decoder.onnx"))
+
+    feed = {
+        "input": np.array([sequence], dtype=np.int64),
+        "input_lengths": np.array([phonemes], dtype=np.int64),
+        "scales": np.array([0.0, 1.0, 0.0], dtype=np.float32),
+    }
+    if "sid" in {model_input.name for model_input in model.get_inputs()}:
+        feed["sid"] = np.array([0], dtype=np.int64)
+
+    expected = model.run(None, feed)[0].reshape(-1)
+
+    encoder_outputs = [output.name for output in encoder.get_outputs()]
+    latents = dict(zip(encoder_outputs, encoder.run(None, feed)))
+    for model_input in decoder.get_inputs():
+        if model_input.name in feed:
+            latents[model_input.name] = feed[model_input.name]
+
+    single = decoder.run(None, latents)[0].reshape(-1)
+    chunked = decode_chunked(decoder, latents, chunk_frames, context_frames)
+
+    split_difference = float(np.abs(single - expected).max())
+    chunk_difference = float(np.abs(chunked - single).max())
+    print(
+        f"Split parity: single-shot {split_difference:.2e}, "
+        f"chunked {chunk_difference:.2e} (tolerance {tolerance:.0e})"
+    )
+
+    if chunked.shape != single.shape or single.shape != expected.shape:
+        raise ValueError("Split model output lengths differ from the whole model.")
+    if max(split_difference, chunk_difference) > tolerance:
+        raise ValueError("Split model output differs from the whole model.")
+
+    timed = [
+        model_input.name
+        for model_input in decoder.get_inputs()
+        if not isinstance(model_input.shape[-1], int)
+    ]
+
+    return SplitInfo(
+        decoder_inputs=[model_input.name for model_input in decoder.get_inputs()],
+        chunked_inputs=timed,
+        hop_length=single.size // latents[timed[0]].shape[-1],
+        chunk_frames=chunk_frames,
+        context_frames=context_frames,
+    )
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Split a Piper voice into an encoder (phonemes to latent frames) and a
+        chunkable decoder (latent frames to audio), and check that whole, single-shot and
+        chunked synthesis match.
+        """,
+    )
+
+    parser.add_argument(
+        "--input_dir",
+        type=Path,
+        required=True,
+        help="Directory holding the Piper 'model.onnx' and 'config.json'; the encoder "
+        "and decoder are written next to them.",
+    )
+
+    parser.add_argument(
+        "--chunk_frames",
+        type=int,
+        default=CHUNK_FRAMES,
+        help=f"Latent frames per decoder chunk. Defaults to {CHUNK_FRAMES}.",
+    )
+
+    parser.add_argument(
+        "--context_frames",
+        type=int,
+        default=CONTEXT_FRAMES,
+        help="Context frames decoded on both sides of a chunk. "
+        f"Defaults to {CONTEXT_FRAMES}.",
+    )
+
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=TOLERANCE,
+        help=f"Maximum absolute sample difference. Defaults to {TOLERANCE}.",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    split_piper(args.input_dir / "model.onnx", args.input_dir)
+    check_split(args.input_dir, args.chunk_frames, args.context_frames, args.tolerance)
@@ -1,9 +1,67 @@
-from typing import TypedDict
+from typing import List, TypedDict
 
 
-class ORTFiles(TypedDict):
+class ORTFiles(TypedDict, total=False):
     model: str
+    encoder: str
+    decoder: str
 
 
 class TokenizerFiles(TypedDict):
     vocabulary: str
+
+
+class QuantizationInfo(TypedDict, total=False):
+    mode: str
+    calibration: str
+    samples: int
+    mel_distance: float
+    duration_agreement: float
+    latency_ms: float
+
+
+class OptimizationInfo(TypedDict):
+    style: str
+    fixed_ms: float
+    runtime_ms: float
+    gain: float
+
+
+class VoiceInfo(TypedDict):
+    index: int
+    name: str
+    dtype: str
+    shape: List[int]
+
+
+class SplitInfo(TypedDict):
+    decoder_inputs: List[str]
+    chunked_inputs: List[str]
+    hop_length: int
+    chunk_frames: int
+    context_frames: int
+
+
+class SpeakerInfo(TypedDict):
+    id: int
+    name: str
+    original_size: int
+    size: int
+
+
+class SimplificationInfo(TypedDict):
+    nodes_before: int
+    nodes_after: int
+    initializer_bytes_before: int
+    initializer_bytes_after: int
+    latency_before_ms: float
+    latency_after_ms: float
+    max_difference: float
+
+
+class FormatHandler(TypedDict):
+    architecture: str
+    convert: str
+    quantize: str
+    packs: str
+    quantization: List[str]
@@ -1,8 +1,6 @@
 from shutil import rmtree, copy2
 from pathlib import Path
 
-from .convert_piper_to_onnx import get_language_from_config
-
 
 def copy_folder(src: Path, dest: Path):
     """
@@ -47,6 +45,9 @@ def output_folder(output_dir: Path, model: str, model_format: str, voice: str) -
     if model_format != "piper":
         return output_dir
 
+    # Imported here: huggingface_hub is only needed to look up Piper voice configs
+    from .convert_piper_to_onnx import get_language_from_config
+
     language_info = get_language_from_config(model, voice)
     if language_info and "family" in language_info:
         language_family = language_info["family"]
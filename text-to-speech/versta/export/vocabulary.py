@@ -0,0 +1,252 @@
+import json
+import mmap
+import os
+
+from argparse import ArgumentParser
+from pathlib import Path
+from struct import Struct
+from typing import Dict, Iterator, Optional, Tuple
+
+# Indexed vocabulary format, all integers little-endian:
+#   header  magic "VVOC", uint32 version, uint32 token count, uint32 string pool size
+#   table   per token, sorted by its UTF-8 bytes: uint32 pool offset, uint32 byte length,
+#           uint32 id
+#   pool    the UTF-8 encoded tokens, back to back
+# Lookups binary search the table, comparing against the pool, straight from an mmap.
+VOCABULARY_MAGIC = b"VVOC"
+VOCABULARY_VERSION = 1
+
+HEADER = Struct("<4sIII")
+ENTRY = Struct("<III")
+
+
+def write_vocabulary(vocabulary: Dict[str, int], output_file: Path) -> Path:
+    """
+    Writes a vocabulary in the indexed format.
+
+    Args:
+        vocabulary (Dict[str, int]): Token to id mapping.
+        output_file (Path): Path of the vocab.bin file to write.
+
+    Returns:
+        Path: The written vocabulary file.
+    """
+    tokens = sorted(
+        (token.encode("utf-8"), index) for token, index in vocabulary.items()
+    )
+
+    table = bytearray()
+    pool = bytearray()
+    for token, index in tokens:
+        table += ENTRY.pack(len(pool), len(token), index)
+        pool += token
+
+    with open(output_file, "wb") as f:
+        f.write(
+            HEADER.pack(VOCABULARY_MAGIC, VOCABULARY_VERSION, len(tokens), len(pool))
+        )
+        f.write(table)
+        f.write(pool)
+
+    return output_file
+
+
+class Vocabulary:
+    """
+    Reads an indexed vocab.bin through an mmap, without parsing it into a map: tokens are
+    looked up by binary search over the sorted offset table, as the app does.
+    """
+
+    def __init__(self, vocab_file: Path):
+        """
+        Args:
+            vocab_file (Path): The vocab.bin file.
+
+        Raises:
+            ValueError: If the file is not an indexed vocabulary of a supported version,
+                or is truncated.
+        """
+        with open(vocab_file, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.data) < HEADER.size:
+            raise ValueError(f"{vocab_file} is too small to be a vocabulary.")
+
+        magic, self.version, self.count, pool_size = HEADER.unpack_from(self.data)
+        if magic != VOCABULARY_MAGIC:
+            raise ValueError(f"{vocab_file} is not an indexed vocabulary.")
+        if self.version != VOCABULARY_VERSION:
+            raise ValueError(
+                f"Unsupported vocabulary version {self.version} in {vocab_file}."
+            )
+
+        self.pool_offset = HEADER.size + self.count * ENTRY.size
+        if len(self.data) != self.pool_offset + pool_size:
+            raise ValueError(f"{vocab_file} is truncated or has trailing data.")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self) -> "Vocabulary":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.data.close()
+
+    def _entry(self, position: int) -> Tuple[bytes, int]:
+        offset, length, index = ENTRY.unpack_from(
+            self.data, HEADER.size + position * ENTRY.size
+        )
+        start = self.pool_offset + offset
+        return self.data[start : start + length], index
+
+    def lookup(self, token: str) -> Optional[int]:
+        """
+        Looks up the id of a token.
+
+        Args:
+            token (str): The token.
+
+        Returns:
+            Optional[int]: The token id, or None when the token is not in the vocabulary.
+        """
+        key = token.encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            candidate, index = self._entry(middle)
+            if candidate == key:
+                return index
+            if candidate < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        return None
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        """
+        Iterates over the tokens and their ids, in table order.
+
+        Returns:
+            Iterator[Tuple[str, int]]: The tokens and ids.
+        """
+        for position in range(self.count):
+            token, index = self._entry(position)
+            yield token.decode("utf-8"), index
+
+
+def check_vocabulary(
+    vocab_file: Path, expected: Dict[str, int] = None
+) -> Dict[str, int]:
+    """
+    Checks an indexed vocabulary: the table must be strictly sorted, every entry must
+    point inside the string pool and hold valid UTF-8, every token must be found again by
+    lookup, and, when given, the tokens must round-trip the source vocabulary exactly.
+
+    Args:
+        vocab_file (Path): The vocab.bin file.
+        expected (Dict[str, int]): The source vocabulary, or None.
+
+    Returns:
+        Dict[str, int]: The vocabulary read back.
+
+    Raises:
+        ValueError: If any of the checks fails.
+    """
+    with Vocabulary(vocab_file) as vocabulary:
+        pool_size = len(vocabulary.data) - vocabulary.pool_offset
+        previous = None
+
+        for position in range(len(vocabulary)):
+            offset, length, _ = ENTRY.unpack_from(
+                vocabulary.data, HEADER.size + position * ENTRY.size
+            )
+            if offset + length > pool_size:
+                raise ValueError(f"Entry {position} points outside the string pool.")
+
+            token, _ = vocabulary._entry(position)
+            if previous is not None and token <= previous:
+                raise ValueError(f"Entry {position} is out of order or duplicated.")
+            previous = token
+
+        tokens = dict(vocabulary.items())
+
+        for token, index in tokens.items():
+            if vocabulary.lookup(token) != index:
+                raise ValueError(f"Lookup of {token!r} does not return its id {index}.")
+
+    if expected is not None and tokens != expected:
+        missing = expected.keys() - tokens.keys()
+        changed = {
+            token
+            for token in expected.keys() & tokens.keys()
+            if expected[token] != tokens[token]
+        }
+        raise ValueError(
+            f"Vocabulary does not round-trip: {len(missing)} tokens missing, "
+            f"{len(tokens.keys() - expected.keys())} unexpected, {len(changed)} changed."
+        )
+
+    return tokens
+
+
+def load_source_vocabulary(config_file: Path) -> Dict[str, int]:
+    """
+    Loads the source vocabulary of a voice from its config.json: the Kokoro "vocab", or
+    the first id of every Piper "phoneme_id_map" entry.
+
+    Args:
+        config_file (Path): The config.json of the voice.
+
+    Returns:
+        Dict[str, int]: Token to id mapping.
+    """
+    with open(config_file, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    if "phoneme_id_map" in config:
+        return {phoneme: ids[0] for phoneme, ids in config["phoneme_id_map"].items()}
+
+    return config.get("vocab", {})
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Check an indexed vocab.bin: the header, the sorted offset table, the
+        string pool and the lookup of every token. Given the config.json of the voice, also
+        check that the vocabulary round-trips its source vocabulary.
+        """,
+    )
+
+    parser.add_argument(
+        "--input",
+        type=Path,
+        required=True,
+        help="The vocab.bin file to check.",
+    )
+
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=None,
+        help="The config.json of the voice, to check the round-trip against.",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    expected = None if args.config is None else load_source_vocabulary(args.config)
+    tokens = check_vocabulary(args.input, expected)
+
+    print(
+        f"{args.input}: version {VOCABULARY_VERSION}, {len(tokens)} tokens, all checks "
+        "passed."
+    )
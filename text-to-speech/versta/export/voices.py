@@ -0,0 +1,263 @@
+import mmap
+import os
+
+from argparse import ArgumentParser
+from pathlib import Path
+from struct import Struct
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .typing import VoiceInfo
+
+# Packed voice store format, all integers little-endian:
+#   header   magic "VVOX", uint32 version, uint32 voice count, uint32 payload alignment
+#   index    per voice: 32-byte null-padded UTF-8 name, uint32 dtype (0 = float32,
+#            1 = float16), uint32 rank, uint32[4] shape (unused dimensions 0), uint64
+#            payload offset from the start of the file, uint64 payload size in bytes
+#   payload  the row-major voice tensors, each starting at a 64-byte aligned offset
+# Every voice can be used straight from an mmap of the file, without copying.
+VOICES_FILE = "voices.bin"
+VOICES_MAGIC = b"VVOX"
+VOICES_VERSION = 1
+ALIGNMENT = 64
+MAX_RANK = 4
+NAME_SIZE = 32
+
+HEADER = Struct("<4sIII")
+ENTRY = Struct(f"<{NAME_SIZE}sII{MAX_RANK}IQQ")
+
+DTYPES = {"float32": 0, "float16": 1}
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_voices(
+    voices: Dict[str, np.ndarray], output_file: Path, dtype: str = "float32"
+) -> List[VoiceInfo]:
+    """
+    Packs voice embeddings into a single voice store.
+
+    Args:
+        voices (Dict[str, np.ndarray]): Voice name to embedding, in index order.
+        output_file (Path): Path of the voices.bin file to write.
+        dtype (str): Payload type, "float32" or "float16".
+
+    Returns:
+        List[VoiceInfo]: The packed voices, by index.
+
+    Raises:
+        ValueError: If the dtype is unsupported, or a name or shape does not fit the index.
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"Unsupported voice dtype: {dtype}")
+
+    offset = _align(HEADER.size + len(voices) * ENTRY.size)
+    index = bytearray(HEADER.pack(VOICES_MAGIC, VOICES_VERSION, len(voices), ALIGNMENT))
+    payloads: List[Tuple[int, bytes]] = []
+    packed: List[VoiceInfo] = []
+
+    for position, (name, embedding) in enumerate(voices.items()):
+        encoded = name.encode("utf-8")
+        if len(encoded) >= NAME_SIZE or embedding.ndim > MAX_RANK:
+            raise ValueError(f"Voice {name} does not fit the voice store index.")
+
+        payload = np.ascontiguousarray(embedding, dtype=dtype).tobytes()
+        shape = [*embedding.shape, *[0] * (MAX_RANK - embedding.ndim)]
+        index += ENTRY.pack(
+            encoded, DTYPES[dtype], embedding.ndim, *shape, offset, len(payload)
+        )
+
+        payloads.append((offset, payload))
+        packed.append(
+            VoiceInfo(
+                index=position, name=name, dtype=dtype, shape=list(embedding.shape)
+            )
+        )
+        offset = _align(offset + len(payload))
+
+    with open(output_file, "wb") as f:
+        f.write(index)
+        for payload_offset, payload in payloads:
+            f.write(b"\0" * (payload_offset - f.tell()))
+            f.write(payload)
+
+    return packed
+
+
+class VoiceStore:
+    """
+    Reads a packed voices.bin through an mmap: the index is parsed on open and every
+    voice is a zero-copy, read-only view of its payload.
+    """
+
+    def __init__(self, voices_file: Path):
+        """
+        Args:
+            voices_file (Path): The voices.bin file.
+
+        Raises:
+            ValueError: If the file is not a voice store of a supported version, or a
+                payload lies outside the file or is misaligned.
+        """
+        with open(voices_file, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, alignment = HEADER.unpack_from(self.data)
+        if magic != VOICES_MAGIC:
+            raise ValueError(f"{voices_file} is not a voice store.")
+        if version != VOICES_VERSION:
+            raise ValueError(f"Unsupported voice store version {version}.")
+
+        dtypes = {code: name for name, code in DTYPES.items()}
+        self.voices: List[VoiceInfo] = []
+        self.payloads: Dict[str, Tuple[int, int, int]] = {}
+
+        for position in range(count):
+            name, dtype, rank, *rest = ENTRY.unpack_from(
+                self.data, HEADER.size + position * ENTRY.size
+            )
+            shape, (offset, size) = rest[:rank], rest[MAX_RANK:]
+
+            if offset % alignment or offset + size > len(self.data):
+                raise ValueError(f"Voice {position} has an invalid payload.")
+
+            name = name.rstrip(b"\0").decode("utf-8")
+            self.voices.append(
+                VoiceInfo(index=position, name=name, dtype=dtypes[dtype], shape=shape)
+            )
+            self.payloads[name] = (position, offset, size)
+
+    def __len__(self) -> int:
+        return len(self.voices)
+
+    def __enter__(self) -> "VoiceStore":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.data.close()
+
+    def names(self) -> List[str]:
+        """
+        Gets the voice names, by index.
+
+        Returns:
+            List[str]: The voice names.
+        """
+        return [voice["name"] for voice in self.voices]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        position, offset, size = self.payloads[name]
+        voice = self.voices[position]
+        dtype = np.dtype(voice["dtype"])
+
+        return np.frombuffer(
+            self.data, dtype=dtype, count=size // dtype.itemsize, offset=offset
+        ).reshape(voice["shape"])
+
+
+def check_voices(voices_file: Path, sources: Dict[str, np.ndarray]) -> float:
+    """
+    Checks a voice store against its source embeddings: the same voices in the same
+    order, with the same shapes. Float32 payloads must match exactly, float16 payloads
+    must equal the sources rounded to float16.
+
+    Args:
+        voices_file (Path): The voices.bin file.
+        sources (Dict[str, np.ndarray]): Voice name to source embedding, in index order.
+
+    Returns:
+        float: The largest absolute difference with the float32 sources.
+
+    Raises:
+        ValueError: If any voice does not match its source.
+    """
+    largest = 0.0
+
+    with VoiceStore(voices_file) as store:
+        if store.names() != list(sources):
+            raise ValueError(f"Voices {store.names()} do not match {list(sources)}.")
+
+        for name, source in sources.items():
+            packed = np.array(store[name])
+            if packed.shape != source.shape:
+                raise ValueError(f"Voice {name} has shape {packed.shape}.")
+            if not np.array_equal(packed, source.astype(packed.dtype)):
+                raise ValueError(f"Voice {name} does not match its source.")
+
+            difference = np.abs(packed.astype(np.float32) - source).max(initial=0.0)
+            largest = max(largest, float(difference))
+
+    return largest
+
+
+def load_source_voices(voices_dir: Path, names: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Loads the source voice embeddings of a Kokoro checkpoint.
+
+    Args:
+        voices_dir (Path): The "voices" directory of the checkpoint, holding ``.pt`` files.
+        names (List[str]): The voices to load, in index order.
+
+    Returns:
+        Dict[str, np.ndarray]: Voice name to float32 embedding.
+    """
+    # Imported here: only the conversion and the parity check need torch.
+    import torch
+
+    return {
+        name: torch.load(voices_dir / f"{name}.pt", weights_only=True)
+        .numpy()
+        .astype(np.float32)
+        for name in names
+    }
+
+
+def parse_args():
+    parser = ArgumentParser(
+        os.path.basename(__file__),
+        description="""Check a packed voices.bin against the .pt voice sources of its
+        Kokoro checkpoint: voice order, shapes and values (exact for float32, float16
+        rounding for float16).
+        """,
+    )
+
+    parser.add_argument(
+        "--input",
+        type=Path,
+        required=True,
+        help="The voices.bin file to check.",
+    )
+
+    parser.add_argument(
+        "--model",
+        type=str,
+        default="hexgrad/Kokoro-82M",
+        help="HuggingFace model whose voices were packed. Defaults to "
+        "'hexgrad/Kokoro-82M'.",
+    )
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    from huggingface_hub import snapshot_download
+
+    args = parse_args()
+
+    with VoiceStore(args.input) as store:
+        names = store.names()
+
+    voices_dir = Path(snapshot_download(args.model, allow_patterns=["voices/*.pt"]))
+    sources = load_source_voices(voices_dir / "voices", names)
+    difference = check_voices(args.input, sources)
+
+    print(
+        f"{args.input}: {len(names)} voices match their sources "
+        f"(largest difference {difference:.2e})."
+    )